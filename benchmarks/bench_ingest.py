@@ -0,0 +1,186 @@
+"""
+End-to-end ingest throughput: BaseBankParser.parse against the database, with
+the offline fake LLM provider in place of the inference API.
+
+Every statement mixes recurring merchants with merchants never seen before, so
+each run exercises rules, LLM result reuse and fresh LLM calls. Everything the
+run writes (benchmark user, transactions, global rules, LLM results) is tagged
+and deleted at the end unless --keep is given.
+
+Usage:
+    python -m benchmarks.bench_ingest [--statements 20] [--rows 2000]
+        [--new-merchants 0.2] [--concurrency 1] [--latency-ms 300]
+        [--error-rate 0] [--drop-rate 0]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+import uuid
+
+SYLLABLES = ["KA", "LO", "MI", "RA", "TE", "NU", "SO", "VI", "DE", "PA", "GO", "ZE"]
+
+
+def _word(rnd: random.Random) -> str:
+    return "".join(rnd.choice(SYLLABLES) for _ in range(4))
+
+
+def make_statement_csv(
+    rows: int, tag: str, recurring: list, new_ratio: float, rnd: random.Random
+) -> str:
+    """TD-style CSV, new_ratio of the rows go to merchants unique to this statement."""
+    fresh = [f"{tag} {_word(rnd)} {_word(rnd)}" for _ in range(max(1, rows // 20))]
+    lines = []
+    for _ in range(rows):
+        pool = fresh if rnd.random() < new_ratio else recurring
+        merchant = f"{rnd.choice(pool)} #{rnd.randint(1, 999)}"
+        amount = f"{rnd.randint(100, 99999) / 100:.2f}"
+        day = f"{rnd.randint(1, 12):02d}/{rnd.randint(1, 28):02d}/2025"
+        lines.append(f'{day},{merchant},"{amount}",,1000.00')
+    return "\n".join(lines) + "\n"
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _run_sequential(parser, user_id, jobs):
+    timings = []
+    for stmt_id, path in jobs:
+        start = time.perf_counter()
+        parser.parse(user_id, stmt_id, "CAD", path)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def _run_concurrent(parser, user_id, jobs, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(stmt_id, path):
+        async with semaphore:
+            start = time.perf_counter()
+            await parser.parse_async(user_id, stmt_id, "CAD", path)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(one(stmt_id, path) for stmt_id, path in jobs))
+
+
+def _cleanup(user_id, stmt_ids, tag: str) -> None:
+    from sqlalchemy import delete
+
+    from src.core.db import SessionLocal
+    from src.models import GlobalRule, LLMCategorizeResult, Transaction, User
+
+    with SessionLocal() as db:
+        db.execute(delete(Transaction).where(Transaction.statement_id.in_(stmt_ids)))
+        db.execute(delete(GlobalRule).where(GlobalRule.norm_desc.like(f"{tag} %")))
+        db.execute(
+            delete(LLMCategorizeResult).where(
+                LLMCategorizeResult.norm_desc.like(f"{tag} %")
+            )
+        )
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--statements", type=int, default=20)
+    ap.add_argument("--rows", type=int, default=2000, help="rows per statement")
+    ap.add_argument("--merchants", type=int, default=300, help="recurring merchants")
+    ap.add_argument(
+        "--new-merchants",
+        type=float,
+        default=0.2,
+        help="share of rows from merchants unseen before",
+    )
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="1: sequential parse, more: parse_async on one event loop",
+    )
+    ap.add_argument("--latency-ms", type=float, default=300)
+    ap.add_argument("--error-rate", type=float, default=0)
+    ap.add_argument("--drop-rate", type=float, default=0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--keep", action="store_true", help="keep the data written")
+    args = ap.parse_args()
+
+    # Read by src.core.config at import time
+    os.environ["LLM_PROVIDERS"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.error_rate)
+    os.environ["FAKE_LLM_DROP_RATE"] = str(args.drop_rate)
+
+    from src.core.db import SessionLocal
+    from src.models import User
+    from src.services.categorizers.fake_provider import FakeInferenceClient
+    from src.services.parsers.td_parser import TDBankParser
+
+    rnd = random.Random(args.seed)
+    # Letters only, the normalizer keeps them as the first word of every merchant
+    tag = "BENCH" + "".join(rnd.choice(string.ascii_uppercase) for _ in range(6))
+    recurring = [f"{tag} {_word(rnd)}" for _ in range(args.merchants)]
+    user_id = uuid.uuid4()
+    stmt_ids = [
+        9_000_000_000 + rnd.randint(0, 10**8) * 1000 + i for i in range(args.statements)
+    ]
+
+    with SessionLocal() as db:
+        db.add(User(id=user_id, email=f"{tag.lower()}@bench.invalid"))
+        db.commit()
+
+    parser = TDBankParser()
+    FakeInferenceClient.reset_stats()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            jobs = []
+            for stmt_id in stmt_ids:
+                path = os.path.join(tmp, f"{stmt_id}.csv")
+                with open(path, "w") as f:
+                    f.write(
+                        make_statement_csv(
+                            args.rows, tag, recurring, args.new_merchants, rnd
+                        )
+                    )
+                jobs.append((stmt_id, path))
+
+            start = time.perf_counter()
+            if args.concurrency > 1:
+                timings = asyncio.run(
+                    _run_concurrent(parser, user_id, jobs, args.concurrency)
+                )
+            else:
+                timings = _run_sequential(parser, user_id, jobs)
+            elapsed = time.perf_counter() - start
+    finally:
+        if not args.keep:
+            _cleanup(user_id, stmt_ids, tag)
+
+    stats = FakeInferenceClient.stats
+    total_rows = args.rows * args.statements
+    mode = "sequential" if args.concurrency <= 1 else f"async x{args.concurrency}"
+    print(
+        f"{args.statements} statements x {args.rows} rows ({mode}), "
+        f"fake LLM {args.latency_ms:.0f}ms, error rate {args.error_rate}"
+    )
+    print(f"  wall time           {elapsed:10.2f} s")
+    print(f"  rows/sec            {total_rows / elapsed:10.0f}")
+    print(
+        f"  LLM calls/statement {stats['calls'] / args.statements:10.2f}"
+        f"  ({stats['calls']} calls, {stats['errors']} errors, "
+        f"{stats['items']} descriptions)"
+    )
+    print(f"  ingest p50          {statistics.median(timings):10.3f} s")
+    print(f"  ingest p99          {_percentile(timings, 0.99):10.3f} s")
+
+
+if __name__ == "__main__":
+    main()
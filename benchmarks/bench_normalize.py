@@ -0,0 +1,93 @@
+"""
+Micro-benchmark of description normalization.
+
+Compares the previous per-call re.sub implementation with DescriptionNormalizer
+(cold and warm memo cache) and the normalize_many batch API.
+
+Usage:
+    python -m benchmarks.bench_normalize [--rows 100000] [--distinct 2000]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from src.services.parsers.normalizer import DescriptionNormalizer
+from benchmarks.bench_parser_extract import MERCHANTS
+
+
+def legacy_normalize_description(desc: str) -> str:
+    """normalize_description before it was turned into DescriptionNormalizer."""
+    text = (desc or "").strip()
+
+    for pattern in ["TFR-TO C/C", "SEND E-TFR"]:
+        if pattern in text:
+            return pattern
+
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*#\d+\b", "", text)
+    text = re.sub(r"/(?=[A-Za-z0-9]*[A-Za-z])(?=[A-Za-z0-9]*\d)[A-Za-z0-9]+$", "", text)
+    text = re.sub(
+        r"\*(?=[A-Za-z0-9]*[A-Za-z])(?=[A-Za-z0-9]*\d)[A-Za-z0-9]+$", "", text
+    )
+    text = re.sub(r"\*{2,}\d+$", "", text)
+    text = re.sub(r"\*{2,}", "", text)
+    text = re.sub(r"\*\d+$", "", text)
+    text = re.sub(r"\s+\d+$", "", text)
+    text = re.sub(
+        r"\s*_(V|M|MC|AX|AMEX|DS|DISC|P|I|WD|DEP|TFR|BP|INT)$",
+        "",
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r"\b(?:[A-Za-z]\d){3,}[A-Za-z]?\b|\b(?:\d[A-Za-z]){3,}\d?\b", "", text
+    )
+    return text.strip().upper()
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, default=100_000)
+    arg_parser.add_argument("--distinct", type=int, default=2000)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    pool = [
+        rnd.choice(MERCHANTS).format(n=rnd.randint(1, 10**6))
+        for _ in range(args.distinct)
+    ]
+    descs = [rnd.choice(pool) for _ in range(args.rows)]
+
+    legacy, t_legacy = _timed(lambda: [legacy_normalize_description(d) for d in descs])
+
+    normalizer = DescriptionNormalizer(cache_size=args.distinct * 2)
+    cold, t_cold = _timed(lambda: [normalizer.normalize(d) for d in descs])
+    warm, t_warm = _timed(lambda: [normalizer.normalize(d) for d in descs])
+
+    batch_normalizer = DescriptionNormalizer(cache_size=args.distinct * 2)
+    batch, t_batch = _timed(lambda: batch_normalizer.normalize_many(descs))
+
+    if not legacy == cold == warm == batch:
+        raise SystemExit("normalizer output differs from the legacy implementation")
+
+    print(f"rows={args.rows} distinct={args.distinct}")
+    for name, seconds in [
+        ("legacy re.sub", t_legacy),
+        ("normalize (cold)", t_cold),
+        ("normalize (warm)", t_warm),
+        ("normalize_many", t_batch),
+    ]:
+        print(f"{name:<18}{seconds:>9.3f}s{t_legacy / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Throughput of per-row vs column-wise extraction for the bank parsers.
+
+Usage:
+    python -m benchmarks.bench_parser_extract [--rows 100000]
+"""
+
+import argparse
+import io
+import random
+import time
+
+from src.services.parsers.cmb_parser import CMBBankParser
+from src.services.parsers.rogers_parser import RogersBankParser
+from src.services.parsers.td_parser import TDBankParser
+
+MERCHANTS = [
+    "TIM HORTONS #{n}",
+    "UBER* TRIP {n}",
+    "AMZN MKTP CA*AB{n}CD",
+    "COSTCO WHOLESALE W{n}",
+    "SHOPPERS DRUG MART #{n}",
+    "NETFLIX.COM",
+    "SEND E-TFR ***{n}",
+    "TFR-TO C/C",
+]
+
+
+def _merchant(rnd: random.Random) -> str:
+    return rnd.choice(MERCHANTS).format(n=rnd.randint(1, 500))
+
+
+def _amount(rnd: random.Random) -> str:
+    return f"{rnd.randint(0, 99999) / 100:.2f}"
+
+
+def _day(rnd: random.Random, iso: bool = False) -> str:
+    m, d = rnd.randint(1, 12), rnd.randint(1, 28)
+    return f"2025-{m:02d}-{d:02d}" if iso else f"{m:02d}/{d:02d}/2025"
+
+
+def make_td_csv(rows: int, rnd: random.Random) -> str:
+    lines = []
+    for _ in range(rows):
+        debit, credit = (_amount(rnd), "") if rnd.random() < 0.9 else ("", _amount(rnd))
+        lines.append(f'{_day(rnd)},{_merchant(rnd)},"{debit}",{credit},1000.00')
+    return "\n".join(lines) + "\n"
+
+
+def make_rogers_csv(rows: int, rnd: random.Random) -> str:
+    lines = ["Date,Merchant Name,Amount"]
+    for _ in range(rows):
+        amount = f"${_amount(rnd)}"
+        if rnd.random() < 0.1:
+            amount = f"({amount})"
+        lines.append(f'{_day(rnd, iso=True)},{_merchant(rnd)},"{amount}"')
+    return "\n".join(lines) + "\n"
+
+
+def make_cmb_csv(rows: int, rnd: random.Random) -> str:
+    lines = ["Date,Currency,Amount,Balance,Type,Counterparty"]
+    for _ in range(rows):
+        sign = "-" if rnd.random() < 0.9 else ""
+        lines.append(
+            f"{_day(rnd, iso=True)},CNY,{sign}{_amount(rnd)},1000.00,"
+            f"快捷支付,{_merchant(rnd)}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _expense_rows(frame):
+    frame = frame[
+        frame["amount_minor"].notna() & (frame["amount_sign"].fillna(-1) >= 0)
+    ]
+    return list(
+        zip(
+            frame["tx_date"].tolist(),
+            frame["norm_desc"].tolist(),
+            frame["amount_minor"].astype("int64").tolist(),
+        )
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, default=100_000)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    cases = [
+        ("TD", TDBankParser(), make_td_csv),
+        ("ROGERS", RogersBankParser(), make_rogers_csv),
+        ("CMB", CMBBankParser(), make_cmb_csv),
+    ]
+
+    print(f"rows={args.rows}")
+    print(f"{'bank':<8}{'per-row s':>12}{'columns s':>12}{'speedup':>10}")
+    for name, parser, make_csv in cases:
+        df = parser.read_csv(io.StringIO(make_csv(args.rows, rnd)))
+
+        by_row, t_row = _timed(lambda: parser._extract_frame_by_row(df))
+        columns, t_col = _timed(lambda: parser.extract_transaction_columns(df))
+
+        if _expense_rows(by_row) != _expense_rows(columns):
+            raise SystemExit(f"{name}: column-wise output differs from per-row")
+
+        print(f"{name:<8}{t_row:>12.3f}{t_col:>12.3f}{t_row / t_col:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
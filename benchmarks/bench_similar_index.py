@@ -0,0 +1,104 @@
+"""
+Benchmark of SimilarRuleIndex at global_rules scale.
+
+Builds the index over --rules synthetic descriptions and times lookups of
+near-duplicates (one word changed) and of unrelated descriptions. Reports the
+build time, lookup latency and the resident memory the index added.
+
+Usage:
+    python -m benchmarks.bench_similar_index [--rules 1000000] [--queries 5000]
+"""
+
+import argparse
+import gc
+import random
+import resource
+import statistics
+import string
+import time
+
+from src.crud.global_rule_crud import GlobalRuleHit
+from src.services.categorizers.similar_rule_index import SimilarRuleIndex
+
+CITIES = ["TORONTO", "MONTREAL", "VANCOUVER", "OTTAWA", "CALGARY", "ON", "QC", "BC"]
+CATEGORY_NAMES = ["Food & Dining", "Transportation", "Shopping", "Utilities"]
+
+
+def _rss_mb() -> float:
+    """Current resident set size, the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _word(rnd: random.Random) -> str:
+    return "".join(rnd.choices(string.ascii_uppercase, k=rnd.randint(3, 9)))
+
+
+def make_descriptions(count: int, rnd: random.Random) -> list:
+    vocabulary = [_word(rnd) for _ in range(max(count // 20, 1000))]
+    descs = set()
+    while len(descs) < count:
+        words = rnd.sample(vocabulary, rnd.randint(1, 3))
+        if rnd.random() < 0.5:
+            words.append(rnd.choice(CITIES))
+        descs.add(" ".join(words))
+    return sorted(descs)
+
+
+def make_queries(descs: list, count: int, rnd: random.Random) -> list:
+    queries = []
+    for _ in range(count):
+        if rnd.random() < 0.5:
+            # Near-duplicate: one more word
+            queries.append(f"{rnd.choice(descs)} {rnd.choice(CITIES)}")
+        else:
+            queries.append(f"{_word(rnd)} {_word(rnd)}")
+    return queries
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rules", type=int, default=1_000_000)
+    arg_parser.add_argument("--queries", type=int, default=5000)
+    arg_parser.add_argument("--threshold", type=float, default=0.8)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    descs = make_descriptions(args.rules, rnd)
+    queries = make_queries(descs, args.queries, rnd)
+    hits = [GlobalRuleHit(i % 12 + 1, CATEGORY_NAMES[i % 4]) for i in range(4)]
+
+    gc.collect()
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    index = SimilarRuleIndex()
+    index.add_many((d, hits[i % 4]) for i, d in enumerate(descs))
+    build_s = time.perf_counter() - start
+    gc.collect()
+    rss_index = _rss_mb() - rss_before
+
+    latencies = []
+    matched = 0
+    for query in queries:
+        started = time.perf_counter()
+        similar = index.lookup(query, args.threshold)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        matched += similar is not None
+    latencies.sort()
+
+    print(f"rules:          {len(index):,}")
+    print(f"build:          {build_s:.1f}s")
+    print(f"index memory:   {rss_index:.0f} MB RSS")
+    print(f"lookups:        {len(queries):,}, {matched:,} matched")
+    print(f"lookup mean:    {statistics.fmean(latencies):.0f} us")
+    print(f"lookup p50:     {latencies[len(latencies) // 2]:.0f} us")
+    print(f"lookup p99:     {latencies[int(len(latencies) * 0.99)]:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
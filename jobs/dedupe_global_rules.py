@@ -0,0 +1,118 @@
+"""
+One-off: remove duplicate global_rules and create the unique index on norm_desc.
+
+Before the index, concurrent parses of the same new merchant could save its rule
+twice. The oldest rule of every norm_desc is kept (it is the one lookups used),
+the others are deleted in batches. The index is then built CONCURRENTLY, so
+parses can keep running. Safe to run again.
+
+    python -m jobs.dedupe_global_rules [--batch-size 5000] [--dry-run]
+"""
+
+import argparse
+import logging
+
+from sqlalchemy import text
+
+from src.core.db import SessionLocal, engine
+
+logger = logging.getLogger("dedupe_global_rules")
+
+DUPLICATES_SQL = text(
+    """
+    SELECT count(*) AS descs,
+           coalesce(sum(n - 1), 0) AS extra_rows,
+           count(*) FILTER (WHERE categories > 1) AS conflicting
+    FROM (
+        SELECT count(*) AS n, count(DISTINCT category_id) AS categories
+        FROM global_rules
+        GROUP BY norm_desc
+        HAVING count(*) > 1
+    ) d
+    """
+)
+
+DELETE_BATCH_SQL = text(
+    """
+    DELETE FROM global_rules g
+    USING (
+        SELECT id FROM (
+            SELECT id,
+                   row_number() OVER (PARTITION BY norm_desc ORDER BY id) AS rn
+            FROM global_rules
+        ) ranked
+        WHERE rn > 1
+        LIMIT :batch_size
+    ) dup
+    WHERE g.id = dup.id
+    """
+)
+
+INVALID_INDEX_SQL = text(
+    """
+    SELECT 1 FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = 'ux_global_rules_norm_desc' AND NOT i.indisvalid
+    """
+)
+
+DROP_INDEX_SQL = text("DROP INDEX CONCURRENTLY IF EXISTS ux_global_rules_norm_desc")
+
+CREATE_INDEX_SQL = text(
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_global_rules_norm_desc "
+    "ON global_rules (norm_desc)"
+)
+
+
+def dedupe(batch_size: int) -> int:
+    deleted = 0
+    with SessionLocal() as db:
+        while True:
+            count = db.execute(DELETE_BATCH_SQL, {"batch_size": batch_size}).rowcount
+            db.commit()
+            deleted += count
+            if count:
+                logger.info(f"deleted {deleted} duplicate rules so far")
+            if count < batch_size:
+                return deleted
+
+
+def create_unique_index() -> None:
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # Left behind by an interrupted build, IF NOT EXISTS would keep it
+        if conn.execute(INVALID_INDEX_SQL).first():
+            logger.info("dropping the invalid index of a previous run")
+            conn.execute(DROP_INDEX_SQL)
+        conn.execute(CREATE_INDEX_SQL)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Dedupe global_rules")
+    arg_parser.add_argument("--batch-size", type=int, default=5000)
+    arg_parser.add_argument(
+        "--dry-run", action="store_true", help="only report the duplicates"
+    )
+    args = arg_parser.parse_args()
+
+    with SessionLocal() as db:
+        descs, extra_rows, conflicting = db.execute(DUPLICATES_SQL).one()
+    logger.info(
+        f"{descs} descriptions have duplicate rules: {extra_rows} rows to delete, "
+        f"{conflicting} with disagreeing categories (the oldest one is kept)"
+    )
+    if args.dry_run:
+        return
+
+    deleted = dedupe(args.batch_size)
+    logger.info(f"deleted {deleted} duplicate rules, creating the unique index")
+    create_unique_index()
+    logger.info("done")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    )
+    main()
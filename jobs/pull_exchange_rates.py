@@ -4,6 +4,8 @@ import logging
 from src.core.config import OER_APP_ID, OER_BASE_URL
 from src.core.db import AsyncSessionLocal
 from src.services.exchange_rate_service import ExchangeRateService
+from src.services.fx_rate_store import FX_RATES_CHANNEL
+from sqlalchemy import text
 from dataclasses import dataclass
 from decimal import Decimal
 from typing import Dict, Optional
@@ -85,6 +87,11 @@ async def main():
                 source=exr_service.SOURCE,
                 rates=res.rates,
             )
+            # Delivered on commit: API processes reload their in-memory rates
+            await db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": FX_RATES_CHANNEL, "payload": str(res.timestamp)},
+            )
             await db.commit()
         except Exception:
             await db.rollback()
@@ -0,0 +1,75 @@
+"""
+Apply global rule changes to the existing transactions, e.g. after a taxonomy
+change. Transactions are updated with one set-based UPDATE per keyset chunk
+(RECATEGORIZE_CHUNK_SIZE rows, committed on its own), so the API and parses
+keep running. Safe to run again, rows already in the right category are
+skipped.
+
+    # Set the category of these descriptions (CSV: norm_desc,category_id)
+    python -m jobs.recategorize_transactions --file changes.csv
+
+    # Re-apply the global rules edited since a date
+    python -m jobs.recategorize_transactions --updated-since 2025-09-01
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+from datetime import datetime
+
+from src.core.db import AsyncSessionLocal
+from src.crud.global_rule_crud import get_global_rules_changed_since_async
+from src.schemas.global_rule import GlobalRuleChange
+from src.services.rule_service import RuleService
+
+logger = logging.getLogger("recategorize_transactions")
+
+
+def read_changes(path: str) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            GlobalRuleChange(norm_desc=row[0], category_id=int(row[1]))
+            for row in csv.reader(f)
+            if row and row[0] != "norm_desc"
+        ]
+
+
+async def run(args) -> None:
+    service = RuleService()
+    async with AsyncSessionLocal() as db:
+        if args.file:
+            changes = read_changes(args.file)
+            logger.info(f"applying {len(changes)} rule changes from {args.file}")
+            result = await service.recategorize(db, changes)
+            logger.info(f"done: {result.model_dump()}")
+        else:
+            rows = await get_global_rules_changed_since_async(db, args.updated_since)
+            categories = {
+                norm_desc: category_id for norm_desc, category_id, _, _ in rows
+            }
+            logger.info(
+                f"re-applying {len(categories)} rules updated since {args.updated_since}"
+            )
+            updated, chunks = await service.apply_categories(db, categories)
+            logger.info(f"done: {updated} transactions updated in {chunks} chunks")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Recategorize transactions")
+    source = arg_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="CSV of norm_desc,category_id")
+    source.add_argument(
+        "--updated-since",
+        type=datetime.fromisoformat,
+        help="re-apply the global rules changed since this date/time",
+    )
+    asyncio.run(run(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    )
+    main()
@@ -0,0 +1,399 @@
+"""
+Statement parse worker.
+
+Claims queued statement_jobs with FOR UPDATE SKIP LOCKED and parses them in a
+local process pool. Run as many workers as needed, on any number of nodes:
+
+    python -m jobs.statement_worker [--processes 2] [--poll-interval 2]
+
+With --async-concurrency N the jobs run as up to N concurrent parse_async tasks
+on one event loop and share its asyncpg pool instead of a process pool. Only
+this mode coalesces the LLM requests of concurrent parses (LLM_COALESCE_WINDOW_MS).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Set
+
+from src.core import config
+from src.core.db import AsyncSessionLocal, SessionLocal
+from src.crud.statement_job_crud import (
+    claim_jobs,
+    claim_jobs_async,
+    heartbeat_jobs,
+    heartbeat_jobs_async,
+    mark_job_failed,
+    mark_job_failed_async,
+    mark_job_succeeded,
+    mark_job_succeeded_async,
+)
+from src.models import StatementJob
+from src.services.parse_executor import ParseExecutor, run_parse_async
+
+logger = logging.getLogger("statement_worker")
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Exponential backoff: base, 2*base, 4*base... capped at the max delay."""
+    delay = config.STATEMENT_JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return min(delay, config.STATEMENT_JOB_RETRY_MAX_SECONDS)
+
+
+class StatementWorker:
+    def __init__(
+        self,
+        *,
+        processes: int,
+        poll_interval: float,
+        lease_seconds: int,
+    ):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.executor = ParseExecutor(max_workers=processes)
+
+        self._running: Dict[int, float] = {}  # job_id -> monotonic start
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._pool_broken = False
+
+    def stop(self, *_args) -> None:
+        logger.info("worker=%s stopping, waiting for running jobs", self.worker_id)
+        self._stopping.set()
+
+    def run(self) -> None:
+        logger.info("worker=%s started processes=%s", self.worker_id, self.processes)
+        self.executor.start()
+        last_heartbeat = time.monotonic()
+
+        while not self._stopping.is_set():
+            if self._pool_broken:
+                logger.warning(
+                    "worker=%s process pool broken, restarting", self.worker_id
+                )
+                self.executor.shutdown(wait=False)
+                self._pool_broken = False
+                self.executor.start()
+
+            claimed = 0
+            free_slots = self.processes - len(self._running)
+            if free_slots > 0:
+                try:
+                    with SessionLocal() as db:
+                        jobs = claim_jobs(
+                            db,
+                            worker_id=self.worker_id,
+                            limit=free_slots,
+                            lease_seconds=self.lease_seconds,
+                        )
+                except Exception:
+                    logger.exception("worker=%s failed to claim jobs", self.worker_id)
+                    jobs = []
+                for job in jobs:
+                    self._start(job)
+                claimed = len(jobs)
+
+            if time.monotonic() - last_heartbeat >= self.lease_seconds / 3:
+                self._heartbeat()
+                last_heartbeat = time.monotonic()
+
+            # Poll again right away while there is work and free capacity
+            if claimed == 0 or len(self._running) >= self.processes:
+                self._stopping.wait(self.poll_interval)
+
+        self.executor.shutdown(wait=True)
+        logger.info("worker=%s stopped", self.worker_id)
+
+    def _start(self, job: StatementJob) -> None:
+        if job.attempts > job.max_attempts:
+            # Lease expired too many times, e.g. the parse keeps killing its worker
+            self._record_failure(job, "lease expired on every attempt", retry=False)
+            return
+
+        self._mark_started(job)
+        try:
+            future = self.executor.submit(
+                bank=job.bank,
+                user_id=job.user_id,
+                stmt_id=job.statement_id,
+                currency=job.currency,
+                file_path=job.file_path,
+                clear_existing=job.attempts > 1,
+            )
+        except Exception as e:
+            self._finish(job, error=e)
+            return
+        future.add_done_callback(lambda f: self._on_done(job, f))
+
+    def _on_done(self, job: StatementJob, future: Future) -> None:
+        error: Optional[BaseException]
+        if future.cancelled():
+            error = RuntimeError("cancelled")
+        else:
+            error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._pool_broken = True
+        self._finish(job, error=error)
+
+    def _mark_started(self, job: StatementJob) -> None:
+        logger.info(
+            "worker=%s job_id=%s statement_id=%s attempt=%s/%s started",
+            self.worker_id,
+            job.id,
+            job.statement_id,
+            job.attempts,
+            job.max_attempts,
+        )
+        with self._lock:
+            self._running[job.id] = time.monotonic()
+
+    def _mark_finished(self, job: StatementJob, error: Optional[BaseException]) -> None:
+        with self._lock:
+            started = self._running.pop(job.id, time.monotonic())
+        duration_ms = int((time.monotonic() - started) * 1000)
+
+        if error is None:
+            logger.info(
+                "worker=%s job_id=%s statement_id=%s succeeded duration_ms=%s",
+                self.worker_id,
+                job.id,
+                job.statement_id,
+                duration_ms,
+            )
+        else:
+            logger.error(
+                "worker=%s job_id=%s statement_id=%s attempt=%s failed duration_ms=%s: %r",
+                self.worker_id,
+                job.id,
+                job.statement_id,
+                job.attempts,
+                duration_ms,
+                error,
+            )
+
+    def _finish(self, job: StatementJob, error: Optional[BaseException]) -> None:
+        self._mark_finished(job, error)
+        if error is not None:
+            self._record_failure(
+                job, repr(error), retry=job.attempts < job.max_attempts
+            )
+            return
+        try:
+            with SessionLocal() as db:
+                mark_job_succeeded(db, job_id=job.id, worker_id=self.worker_id)
+        except Exception:
+            logger.exception(
+                "worker=%s job_id=%s failed to save status", self.worker_id, job.id
+            )
+
+    def _record_failure(self, job: StatementJob, error: str, *, retry: bool) -> None:
+        try:
+            with SessionLocal() as db:
+                mark_job_failed(
+                    db,
+                    job_id=job.id,
+                    worker_id=self.worker_id,
+                    error=error[:2000],
+                    retry_delay_seconds=(
+                        retry_delay_seconds(job.attempts) if retry else None
+                    ),
+                )
+        except Exception:
+            logger.exception(
+                "worker=%s job_id=%s failed to save status", self.worker_id, job.id
+            )
+
+    def _heartbeat(self) -> None:
+        with self._lock:
+            job_ids = list(self._running)
+        if not job_ids:
+            return
+        try:
+            with SessionLocal() as db:
+                heartbeat_jobs(db, worker_id=self.worker_id, job_ids=job_ids)
+        except Exception:
+            logger.exception("worker=%s heartbeat failed", self.worker_id)
+
+
+class AsyncStatementWorker(StatementWorker):
+    """
+    Run claimed jobs as asyncio tasks. Job bookkeeping goes through the async
+    crud on AsyncSessionLocal, so it never blocks the loop the parses run on.
+    """
+
+    def __init__(self, *, concurrency: int, poll_interval: float, lease_seconds: int):
+        super().__init__(
+            processes=concurrency,
+            poll_interval=poll_interval,
+            lease_seconds=lease_seconds,
+        )
+        self._tasks: Set[asyncio.Task] = set()
+
+    def run(self) -> None:
+        asyncio.run(self.run_async())
+
+    async def run_async(self) -> None:
+        logger.info(
+            "worker=%s started async_concurrency=%s", self.worker_id, self.processes
+        )
+        last_heartbeat = time.monotonic()
+
+        while not self._stopping.is_set():
+            claimed = 0
+            free_slots = self.processes - len(self._running)
+            if free_slots > 0:
+                try:
+                    jobs = await self._claim(free_slots)
+                except Exception:
+                    logger.exception("worker=%s failed to claim jobs", self.worker_id)
+                    jobs = []
+                for job in jobs:
+                    await self._start_async(job)
+                claimed = len(jobs)
+
+            if time.monotonic() - last_heartbeat >= self.lease_seconds / 3:
+                await self._heartbeat_async()
+                last_heartbeat = time.monotonic()
+
+            if claimed == 0 or len(self._running) >= self.processes:
+                await asyncio.to_thread(self._stopping.wait, self.poll_interval)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info("worker=%s stopped", self.worker_id)
+
+    async def _claim(self, limit: int) -> List[StatementJob]:
+        async with AsyncSessionLocal() as db:
+            return await claim_jobs_async(
+                db,
+                worker_id=self.worker_id,
+                limit=limit,
+                lease_seconds=self.lease_seconds,
+            )
+
+    async def _start_async(self, job: StatementJob) -> None:
+        if job.attempts > job.max_attempts:
+            await self._record_failure_async(
+                job, "lease expired on every attempt", retry=False
+            )
+            return
+
+        self._mark_started(job)
+        task = asyncio.create_task(self._run_job(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, job: StatementJob) -> None:
+        error: Optional[BaseException] = None
+        try:
+            await run_parse_async(
+                bank=job.bank,
+                user_id=job.user_id,
+                stmt_id=job.statement_id,
+                currency=job.currency,
+                file_path=job.file_path,
+                clear_existing=job.attempts > 1,
+            )
+        except Exception as e:
+            error = e
+        await self._finish_async(job, error)
+
+    async def _finish_async(
+        self, job: StatementJob, error: Optional[BaseException]
+    ) -> None:
+        self._mark_finished(job, error)
+        if error is not None:
+            await self._record_failure_async(
+                job, repr(error), retry=job.attempts < job.max_attempts
+            )
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await mark_job_succeeded_async(
+                    db, job_id=job.id, worker_id=self.worker_id
+                )
+        except Exception:
+            logger.exception(
+                "worker=%s job_id=%s failed to save status", self.worker_id, job.id
+            )
+
+    async def _record_failure_async(
+        self, job: StatementJob, error: str, *, retry: bool
+    ) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await mark_job_failed_async(
+                    db,
+                    job_id=job.id,
+                    worker_id=self.worker_id,
+                    error=error[:2000],
+                    retry_delay_seconds=(
+                        retry_delay_seconds(job.attempts) if retry else None
+                    ),
+                )
+        except Exception:
+            logger.exception(
+                "worker=%s job_id=%s failed to save status", self.worker_id, job.id
+            )
+
+    async def _heartbeat_async(self) -> None:
+        with self._lock:
+            job_ids = list(self._running)
+        if not job_ids:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await heartbeat_jobs_async(
+                    db, worker_id=self.worker_id, job_ids=job_ids
+                )
+        except Exception:
+            logger.exception("worker=%s heartbeat failed", self.worker_id)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Statement parse worker")
+    arg_parser.add_argument("--processes", type=int, default=config.PARSE_WORKERS)
+    arg_parser.add_argument(
+        "--async-concurrency",
+        type=int,
+        default=0,
+        help="run up to N parses on one event loop instead of a process pool",
+    )
+    arg_parser.add_argument("--poll-interval", type=float, default=2.0)
+    arg_parser.add_argument(
+        "--lease-seconds", type=int, default=config.STATEMENT_JOB_LEASE_SECONDS
+    )
+    args = arg_parser.parse_args()
+
+    if args.async_concurrency > 0:
+        worker = AsyncStatementWorker(
+            concurrency=args.async_concurrency,
+            poll_interval=args.poll_interval,
+            lease_seconds=args.lease_seconds,
+        )
+    else:
+        worker = StatementWorker(
+            processes=args.processes,
+            poll_interval=args.poll_interval,
+            lease_seconds=args.lease_seconds,
+        )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    )
+    main()
@@ -0,0 +1,24 @@
+from src.core.auth import get_admin_user
+from src.core.db import get_async_session
+from src.schemas.global_rule import RecategorizeRequest, RecategorizeResult
+from src.services.rule_service import RuleService
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, APIRouter
+
+router = APIRouter(
+    prefix="/global-rules",
+    tags=["global-rules"],
+    dependencies=[Depends(get_admin_user)],
+)
+
+
+@router.post("/recategorize", response_model=RecategorizeResult)
+async def recategorize(
+    request: RecategorizeRequest,
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Change the category of global rules and of the existing transactions with
+    these descriptions. For large changes use jobs/recategorize_transactions.py.
+    """
+    return await RuleService().recategorize(db, request.rules)
@@ -1,5 +1,4 @@
 from src.core.auth import get_current_user
-from src.services.parsers.factory import get_parser
 from src.services.statement_service import StatementService
 from src.schemas.enums import BankEnum
 from src.schemas.user import AuthUser
@@ -7,7 +6,6 @@ from src.schemas.common import PaginatedResponse
 from src.schemas.statement import StatementRead, StatementDeleteResult
 from fastapi import (
     Depends,
-    BackgroundTasks,
     UploadFile,
     File,
     Form,
@@ -20,6 +18,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.db import get_async_session
 import uuid
 
+PARSE_RETRY_AFTER_SECONDS = 30
+
 router = APIRouter(
     prefix="/statements", tags=["statements"], dependencies=[Depends(get_current_user)]
 )
@@ -27,7 +27,6 @@ router = APIRouter(
 
 @router.post("")
 async def upload_statement(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     bank: BankEnum = Form(...),
     currency: str = Form(...),
@@ -37,28 +36,27 @@ async def upload_statement(
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only .csv files are allowed.")
 
+    # Reject early when the parse queue is full
+    if await StatementService.is_parse_queue_full(db):
+        raise HTTPException(
+            status_code=503,
+            detail="Statement processing is busy, please retry later.",
+            headers={"Retry-After": str(PARSE_RETRY_AFTER_SECONDS)},
+        )
+
     user_id = uuid.UUID(user.user_id)
 
     # Save file
     statement_service = StatementService()
     file_path = await statement_service.save_statement_file(file, bank, user_id)
 
-    # Save statement record to db
-    stmt_id = await statement_service.create_statement_record(
-        db=db, user_id=user_id, bank=bank, currency=currency, file_path=file_path
-    )
-
-    # Run parser asynchronously after file upload
-    parser = get_parser(bank.value)
-    background_tasks.add_task(
-        parser.parse,
-        user_id=user_id,
-        stmt_id=stmt_id,
-        currency=currency,
-        file_path=file_path,
+    # Save the statement record and queue its parse together,
+    # jobs/statement_worker.py picks it up
+    _, job_id = await statement_service.create_statement_with_job(
+        db, user_id=user_id, bank=bank, currency=currency, file_path=file_path
     )
 
-    return {"message": "Upload successful", "file_path": file_path}
+    return {"message": "Upload successful", "file_path": file_path, "job_id": job_id}
 
 
 # api
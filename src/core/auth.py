@@ -1,6 +1,6 @@
 import logging
 
-from fastapi import Request, HTTPException, status
+from fastapi import Depends, Request, HTTPException, status
 from src.schemas.user import AuthUser
 from src.core import config
 from jwt import PyJWTError
@@ -32,3 +32,12 @@ def get_current_user(request: Request) -> AuthUser:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Authorization error: {str(e)}",
         )
+
+
+def get_admin_user(user: AuthUser = Depends(get_current_user)) -> AuthUser:
+    if user.user_id not in config.ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin only",
+        )
+    return user
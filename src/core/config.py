@@ -22,6 +22,106 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
+# Users allowed to call admin endpoints (global rule changes), comma separated
+ADMIN_USER_IDS = {
+    u.strip() for u in os.getenv("ADMIN_USER_IDS", "").split(",") if u.strip()
+}
+
 # Open Exchange Rates app_id
 OER_APP_ID = os.getenv("OER_APP_ID", "")
 OER_BASE_URL = os.getenv("OER_BASE_URL", "")
+
+# Keep exchange_rates in memory in the API process (loaded at startup, refreshed
+# when pull_exchange_rates notifies), 0 queries the table on every conversion
+FX_RATE_STORE_ENABLED = os.getenv("FX_RATE_STORE_ENABLED", "1") == "1"
+FX_RATE_LISTEN_RETRY_SECONDS = float(os.getenv("FX_RATE_LISTEN_RETRY_SECONDS", 30))
+# Refreshes re-read the rates written this far back from the newest updated_at
+# loaded, see GLOBAL_RULE_SYNC_OVERLAP_SECONDS
+FX_RATE_SYNC_OVERLAP_SECONDS = int(os.getenv("FX_RATE_SYNC_OVERLAP_SECONDS", 60))
+
+# /summary converts and sums the transactions in SQL, only the totals per
+# category and month are fetched. 0 loads the transactions and sums in Python
+SUMMARY_AGGREGATE_IN_DB = os.getenv("SUMMARY_AGGREGATE_IN_DB", "1") == "1"
+
+# Process-wide cache of global rules (norm_desc -> category), in entries
+GLOBAL_RULE_CACHE_SIZE = int(os.getenv("GLOBAL_RULE_CACHE_SIZE", 100000))
+# Cached rules and the similar-rule index follow global_rules.updated_at, changes
+# (e.g. from another process) are re-read this far back from the newest seen,
+# as updated_at is the writing transaction's start and may commit out of order
+GLOBAL_RULE_SYNC_OVERLAP_SECONDS = int(
+    os.getenv("GLOBAL_RULE_SYNC_OVERLAP_SECONDS", 60)
+)
+# Cached rules are synced with global_rules at most this often per process
+GLOBAL_RULE_CACHE_SYNC_SECONDS = float(os.getenv("GLOBAL_RULE_CACHE_SYNC_SECONDS", 5))
+
+# Memo cache of normalized transaction descriptions, in entries
+NORMALIZE_CACHE_SIZE = int(os.getenv("NORMALIZE_CACHE_SIZE", 50000))
+
+# Statement parsing: rows read, categorized and saved per chunk (0 = whole file)
+PARSE_CHUNK_SIZE = int(os.getenv("PARSE_CHUNK_SIZE", 5000))
+
+# Statement parsing process pool (per statement worker)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", 2))
+
+# Statement job queue
+# Max open (pending + running) jobs, uploads get 503 beyond that
+STATEMENT_QUEUE_MAX_DEPTH = int(os.getenv("STATEMENT_QUEUE_MAX_DEPTH", 100))
+STATEMENT_JOB_MAX_ATTEMPTS = int(os.getenv("STATEMENT_JOB_MAX_ATTEMPTS", 5))
+# A running job whose worker stopped heartbeating for this long is re-claimed
+STATEMENT_JOB_LEASE_SECONDS = int(os.getenv("STATEMENT_JOB_LEASE_SECONDS", 300))
+STATEMENT_JOB_RETRY_BASE_SECONDS = int(
+    os.getenv("STATEMENT_JOB_RETRY_BASE_SECONDS", 30)
+)
+STATEMENT_JOB_RETRY_MAX_SECONDS = int(
+    os.getenv("STATEMENT_JOB_RETRY_MAX_SECONDS", 3600)
+)
+
+# LLM categorization: descriptions are sent in chunks bounded by estimated output
+# tokens and item count, with at most LLM_MAX_CONCURRENCY requests in flight
+LLM_CHUNK_MAX_TOKENS = int(os.getenv("LLM_CHUNK_MAX_TOKENS", 3000))
+LLM_CHUNK_MAX_ITEMS = int(os.getenv("LLM_CHUNK_MAX_ITEMS", 80))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+# Inference providers, comma separated. Requests go to the fastest healthy one
+# and are hedged on another after its p95 latency (LLM_HEDGE_DELAY_SECONDS
+# until enough samples, 0 disables hedging).
+LLM_PROVIDERS = [
+    p.strip() for p in os.getenv("LLM_PROVIDERS", "cerebras").split(",") if p.strip()
+]
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", 60))
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", 10))
+# Circuit breaker: skip a provider for the cooldown after this many 5xx/timeouts
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", 3))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", 30))
+
+# Concurrent parse_async calls of one process share LLM requests: descriptions
+# requested within the window are deduped and sent together (0 disables).
+# Only the async paths use it (statement_worker --async-concurrency N), a
+# process pool worker parses one statement at a time
+LLM_COALESCE_WINDOW_MS = int(os.getenv("LLM_COALESCE_WINDOW_MS", 50))
+LLM_COALESCE_MAX_BATCH = int(os.getenv("LLM_COALESCE_MAX_BATCH", 2000))
+
+# Keyword/regex rules of the local categorizer (default: bundled keyword_rules.json)
+KEYWORD_RULES_PATH = os.getenv("KEYWORD_RULES_PATH", "")
+
+# Reuse the category of a global rule whose description is this similar
+# (Jaccard index of character trigrams), 0 disables
+SIMILAR_RULE_THRESHOLD = float(os.getenv("SIMILAR_RULE_THRESHOLD", 0.8))
+
+# LLM categorization result cache: successes are trusted for the TTL, failed
+# descriptions are retried after base * 2^(failures-1) seconds, capped at max
+LLM_RESULT_TTL_SECONDS = int(os.getenv("LLM_RESULT_TTL_SECONDS", 30 * 24 * 3600))
+LLM_FAILURE_RETRY_BASE_SECONDS = int(os.getenv("LLM_FAILURE_RETRY_BASE_SECONDS", 3600))
+LLM_FAILURE_RETRY_MAX_SECONDS = int(
+    os.getenv("LLM_FAILURE_RETRY_MAX_SECONDS", 7 * 24 * 3600)
+)
+
+# Offline fake LLM provider (LLM_PROVIDERS=fake), for load tests and benchmarks
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 300))
+FAKE_LLM_MS_PER_ITEM = float(os.getenv("FAKE_LLM_MS_PER_ITEM", 5))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", 0))
+FAKE_LLM_DROP_RATE = float(os.getenv("FAKE_LLM_DROP_RATE", 0))
+
+# Recategorization after a global rule change: transactions updated per
+# transaction (keyset chunk), and rules applied per pass
+RECATEGORIZE_CHUNK_SIZE = int(os.getenv("RECATEGORIZE_CHUNK_SIZE", 5000))
+RECATEGORIZE_RULE_BATCH_SIZE = int(os.getenv("RECATEGORIZE_RULE_BATCH_SIZE", 1000))
@@ -1,8 +1,8 @@
 from __future__ import annotations
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Dict, Iterable, List, Optional, Tuple, Set
-from sqlalchemy import desc, distinct, func, select, literal
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Set
+from sqlalchemy import desc, distinct, func, select, literal, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.models.exchange_rate import ExchangeRate
 
@@ -100,72 +100,183 @@ async def get_best_rate_date(
     )
 
 
-async def get_rates_for_day(
+# The rate days of get_best_rate_date in SQL, shared by BEST_RATES_SQL and
+# SUMMARY_TOTALS_SQL. The query defines qkeys(qkey), the quote sets it needs as
+# sorted comma-joined keys; covering has the days having every quote of a key.
+COVERING_DAYS_CTE = """
+    covering AS (
+        SELECT q.qkey, e.as_of_date
+        FROM qkeys q
+        JOIN exchange_rates e
+          ON e.quote_currency = ANY(string_to_array(q.qkey, ','))
+        WHERE e.base_currency = :base_currency AND e.source = :source
+        GROUP BY q.qkey, e.as_of_date
+        HAVING count(DISTINCT e.quote_currency)
+               = cardinality(string_to_array(q.qkey, ','))
+    )
+"""
+
+# LATERAL subquery on a {row} having qkey and tx_date: the latest covering day
+# <= tx_date, else the latest overall, no row when no day covers qkey
+BEST_RATE_DAY_SQL = """
+    SELECT c.as_of_date
+    FROM covering c
+    WHERE c.qkey = {row}.qkey
+    ORDER BY (c.as_of_date <= {row}.tx_date) DESC, c.as_of_date DESC
+    LIMIT 1
+"""
+
+# Best rate day and rates of many (tx_date, qkey) pairs at once
+BEST_RATES_SQL = text(
+    f"""
+    WITH req AS (
+        SELECT DISTINCT r.tx_date, r.qkey
+        FROM unnest(CAST(:tx_dates AS date[]), CAST(:qkeys AS text[]))
+            AS r(tx_date, qkey)
+    ),
+    qkeys AS (
+        SELECT DISTINCT qkey FROM req
+    ),
+    {COVERING_DAYS_CTE}
+    SELECT req.tx_date, req.qkey, best.as_of_date, e.quote_currency, e.rate
+    FROM req
+    CROSS JOIN LATERAL ({BEST_RATE_DAY_SQL.format(row="req")}) best
+    JOIN exchange_rates e
+      ON e.as_of_date = best.as_of_date
+     AND e.base_currency = :base_currency
+     AND e.source = :source
+     AND e.quote_currency = ANY(string_to_array(req.qkey, ','))
+    """
+)
+
+
+async def get_best_rates_for_dates(
     db: AsyncSession,
     *,
-    as_of_date: date,
+    requests: Iterable[Tuple[date, FrozenSet[str]]],
     base_currency: str,
-    quote_currencies: Iterable[str],
-) -> Dict[str, ExchangeRate]:
-    quotes = list(set(quote_currencies))
-    if not quotes:
-        return {}
+    source: str,
+) -> Dict[Tuple[date, FrozenSet[str]], Tuple[date, Dict[str, Decimal]]]:
+    """
+    Batched get_best_rate_date + get_rates_by_date: resolve every
+    (tx_date, quotes) pair with one query.
+    Return (tx_date, quotes) -> (rate_date, quote -> rate).
+    Raise FxRateNotFound if no day covers one of the quote sets.
+    """
+    requests = {
+        (d, frozenset(q.upper() for q in quotes if q)) for d, quotes in requests
+    }
+    resolved: Dict[Tuple[date, FrozenSet[str]], Tuple[date, Dict[str, Decimal]]] = {
+        (d, quotes): (d, {}) for d, quotes in requests if not quotes
+    }
+    pending = [(d, quotes) for d, quotes in requests if quotes]
+    if not pending:
+        return resolved
 
-    stmt = (
-        select(ExchangeRate)
-        .where(ExchangeRate.as_of_date == as_of_date)
-        .where(ExchangeRate.base_currency == base_currency)
-        .where(ExchangeRate.quote_currency.in_(quotes))
+    qkeys = {quotes: ",".join(sorted(quotes)) for _, quotes in pending}
+    by_qkey = {qkey: quotes for quotes, qkey in qkeys.items()}
+    res = await db.execute(
+        BEST_RATES_SQL,
+        {
+            "tx_dates": [d for d, _ in pending],
+            "qkeys": [qkeys[quotes] for _, quotes in pending],
+            "base_currency": base_currency,
+            "source": source,
+        },
+    )
+    for tx_date, qkey, rate_date, quote, rate in res.all():
+        _, rates = resolved.setdefault((tx_date, by_qkey[qkey]), (rate_date, {}))
+        rates[quote] = Decimal(rate)
+
+    missing = sorted({qkeys[q] for d, q in pending if (d, q) not in resolved})
+    if missing:
+        raise FxRateNotFound(
+            f"No FX rate day found that covers quotes={missing} "
+            f"for base={base_currency} source={source}"
+        )
+    return resolved
+
+
+async def get_rates_updated_since(
+    db: AsyncSession, since: Optional[datetime] = None
+) -> List[tuple]:
+    """
+    (as_of_date, base, quote, source, rate, updated_at) of the rates written at
+    or after `since`, all of them when None.
+    """
+    stmt = select(
+        ExchangeRate.as_of_date,
+        ExchangeRate.base_currency,
+        ExchangeRate.quote_currency,
+        ExchangeRate.source,
+        ExchangeRate.rate,
+        ExchangeRate.updated_at,
     )
+    if since is not None:
+        stmt = stmt.where(ExchangeRate.updated_at >= since)
     res = await db.execute(stmt)
-    rows = res.scalars().all()
-    return {row.quote_currency: row for row in rows}
+    return res.all()
 
 
-async def upsert_rates_for_day(
+# Insert or update many (day, pair) rates in one statement. Existing rates are
+# only rewritten when they moved by more than :epsilon, so a re-run of the same
+# snapshot touches nothing (and keeps updated_at, the FxRateStore watermark).
+UPSERT_RATES_SQL = text(
+    """
+    WITH upserted AS (
+        INSERT INTO exchange_rates AS e
+            (as_of_date, base_currency, quote_currency, rate, source, source_ts)
+        SELECT *
+        FROM unnest(
+            CAST(:as_of_dates AS date[]),
+            CAST(:base_currencies AS text[]),
+            CAST(:quote_currencies AS text[]),
+            CAST(:rates AS numeric[]),
+            CAST(:sources AS text[]),
+            CAST(:source_ts AS timestamptz[])
+        )
+        ON CONFLICT (as_of_date, base_currency, quote_currency) DO UPDATE
+        SET rate = excluded.rate,
+            source = excluded.source,
+            source_ts = excluded.source_ts,
+            updated_at = now()
+        WHERE abs(e.rate - excluded.rate) > :epsilon
+        RETURNING xmax = 0 AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+    FROM upserted
+    """
+)
+
+
+async def upsert_rates(
     db: AsyncSession,
+    rows: Iterable[Tuple[date, str, str, Decimal, str, datetime]],
     *,
-    as_of_date: date,
-    base_currency: str,
-    source: str,
-    source_ts: datetime,
-    rates: Dict[str, Decimal],  # quote -> rate
     epsilon: Decimal,
 ) -> Tuple[int, int]:
     """
-    Idempotent upsert (The same day and the same currency pair, upsert if not exists)
+    Idempotent upsert of (as_of_date, base, quote, rate, source, source_ts)
+    rows, any number of days and currencies in one round trip. The last row of
+    a repeated (as_of_date, base, quote) wins. Not committed.
     Return (inserted_count, updated_count)
     """
-    existing = await get_rates_for_day(
-        db,
-        as_of_date=as_of_date,
-        base_currency=base_currency,
-        quote_currencies=rates.keys(),
-    )
-
-    inserted = 0
-    updated = 0
-
-    for quote, new_rate in rates.items():
-        row = existing.get(quote)
-        if row is None:
-            db.add(
-                ExchangeRate(
-                    as_of_date=as_of_date,
-                    base_currency=base_currency,
-                    quote_currency=quote,
-                    rate=new_rate,
-                    source=source,
-                    source_ts=source_ts,
-                )
-            )
-            inserted += 1
-        else:
-            old_rate = Decimal(row.rate)
-            if (new_rate - old_rate).copy_abs() > epsilon:
-                row.rate = new_rate
-                row.source = source
-                row.source_ts = source_ts
-                updated += 1
+    latest = {(row[0], row[1], row[2]): row for row in rows}
+    if not latest:
+        return 0, 0
 
+    columns = list(zip(*latest.values()))
+    res = await db.execute(
+        UPSERT_RATES_SQL,
+        {
+            "as_of_dates": list(columns[0]),
+            "base_currencies": list(columns[1]),
+            "quote_currencies": list(columns[2]),
+            "rates": list(columns[3]),
+            "sources": list(columns[4]),
+            "source_ts": list(columns[5]),
+            "epsilon": epsilon,
+        },
+    )
+    inserted, updated = res.one()
     return inserted, updated
@@ -1,27 +1,268 @@
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from datetime import datetime
+import time
+from typing import Optional, List, Dict, Iterable, NamedTuple, Tuple
+from src.core import config
+from src.helpers.lru_cache import LRUCache
+from src.helpers.watermark import UpdatedAtWatermark
 from src.schemas.global_rule import GlobalRuleCreate
 from ..models import GlobalRule
 
 
-def create_global_rule(db: Session, rule_data: GlobalRuleCreate) -> GlobalRule:
-    rule_data_dict = rule_data.model_dump(exclude_unset=True)
-    new_rule = GlobalRule(**rule_data_dict)
+class GlobalRuleHit(NamedTuple):
+    category_id: int
+    category_name: str
 
-    db.add(new_rule)
-    db.commit()
-    db.refresh(new_rule)
 
-    return new_rule
+class RuleChangeWatermark(UpdatedAtWatermark):
+    """Watermark of a process-local copy of global_rules."""
+
+    def __init__(self):
+        super().__init__(config.GLOBAL_RULE_SYNC_OVERLAP_SECONDS)
+
+
+# Process-wide cache: norm_desc -> (category_id, category_name).
+# Only existing rules are cached, a miss always goes to the db. Rules changed by
+# any process are dropped at most GLOBAL_RULE_CACHE_SYNC_SECONDS after the
+# change (see _sync_cache).
+global_rule_cache: LRUCache[str, GlobalRuleHit] = LRUCache(
+    maxsize=config.GLOBAL_RULE_CACHE_SIZE
+)
+_cache_watermark = RuleChangeWatermark()
+_cache_synced_at: Optional[float] = None
+
+
+def _cache_sync_due() -> bool:
+    global _cache_synced_at
+    now = time.monotonic()
+    if (
+        _cache_synced_at is not None
+        and now - _cache_synced_at < config.GLOBAL_RULE_CACHE_SYNC_SECONDS
+    ):
+        return False
+    _cache_synced_at = now
+    return True
+
+
+def _cache_changes_stmt(since: Optional[datetime]):
+    if since is None:
+        return select(func.max(GlobalRule.updated_at))
+    # Changed rules only: a new rule was a miss, so it can't be cached
+    return select(GlobalRule.updated_at, GlobalRule.norm_desc).where(
+        GlobalRule.updated_at >= since,
+        GlobalRule.updated_at > GlobalRule.created_at,
+    )
+
 
+def _sync_cache(since: Optional[datetime], rows: List[tuple]) -> None:
+    """Drop the cached rules changed since the last sync, by any process."""
+    if since is None:
+        # First lookup of the process: start from the newest rule
+        global_rule_cache.invalidate()
+        _cache_watermark.advance(rows[0][0])
+        return
+    global_rule_cache.invalidate([norm_desc for _, norm_desc in rows])
+    for updated_at, _ in rows:
+        _cache_watermark.advance(updated_at)
 
-def create_global_rules_batch(db: Session, rules: List[GlobalRuleCreate]) -> None:
-    rule_dict_list = [r.model_dump(exclude_unset=True) for r in rules]
-    new_rules = [GlobalRule(**r_dict) for r_dict in rule_dict_list]
 
-    db.add_all(new_rules)
+def _insert_rules_stmt(rows: List[dict]):
+    # First writer wins, concurrent parses of a new merchant don't duplicate it
+    return (
+        pg_insert(GlobalRule)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["norm_desc"])
+        .returning(GlobalRule.norm_desc)
+    )
+
+
+def _rule_rows(rules: Iterable[GlobalRuleCreate]) -> List[dict]:
+    rows: Dict[str, dict] = {}
+    for r in rules:
+        rows.setdefault(r.norm_desc, r.model_dump(exclude_unset=True))
+    # Same lock order in every process: concurrent writes of overlapping
+    # descriptions wait for each other instead of deadlocking
+    return [rows[norm_desc] for norm_desc in sorted(rows)]
+
+
+def create_global_rule(db: Session, rule_data: GlobalRuleCreate) -> GlobalRule:
+    """Create the rule of a description, or return the one that already exists."""
+    create_global_rules_batch(db, [rule_data])
+    return get_global_rule_by_norm_desc(db, rule_data.norm_desc)
+
+
+def create_global_rules_batch(
+    db: Session, rules: List[GlobalRuleCreate], chunk_size: int = 1000
+) -> int:
+    """
+    Insert the rules of descriptions that have none, with one
+    INSERT ... ON CONFLICT DO NOTHING per chunk. Return the number inserted.
+    """
+    rows = _rule_rows(rules)
+    inserted = 0
+    for i in range(0, len(rows), chunk_size):
+        result = db.execute(_insert_rules_stmt(rows[i : i + chunk_size]))
+        inserted += len(result.all())
     db.commit()
+    global_rule_cache.invalidate([r["norm_desc"] for r in rows])
+    return inserted
 
 
 def get_global_rule_by_norm_desc(db: Session, norm_desc: str) -> Optional[GlobalRule]:
     return db.query(GlobalRule).filter(GlobalRule.norm_desc == norm_desc).one_or_none()
+
+
+def get_global_rules_by_norm_descs(
+    db: Session,
+    norm_descs: Iterable[str],
+    chunk_size: int = 1000,
+    use_cache: bool = True,
+) -> Dict[str, GlobalRuleHit]:
+    """
+    Resolve many norm_descs against global_rules.
+    Cached descriptions are answered from global_rule_cache, the rest with one
+    IN query per chunk. Return a map of norm_desc -> GlobalRuleHit for the
+    descriptions that have a rule.
+    """
+    descs = set(norm_descs)
+    rules: Dict[str, GlobalRuleHit] = {}
+
+    if use_cache:
+        if _cache_sync_due():
+            since = _cache_watermark.since()
+            _sync_cache(since, db.execute(_cache_changes_stmt(since)).all())
+        rules.update(global_rule_cache.get_many(descs))
+        descs -= rules.keys()
+
+    descs = list(descs)
+    fetched: Dict[str, GlobalRuleHit] = {}
+    for i in range(0, len(descs), chunk_size):
+        chunk = descs[i : i + chunk_size]
+        rows = (
+            db.query(
+                GlobalRule.norm_desc, GlobalRule.category_id, GlobalRule.category_name
+            )
+            .filter(GlobalRule.norm_desc.in_(chunk))
+            .all()
+        )
+        for norm_desc, category_id, category_name in rows:
+            fetched[norm_desc] = GlobalRuleHit(category_id, category_name)
+
+    if use_cache and fetched:
+        global_rule_cache.set_many(fetched.items())
+
+    rules.update(fetched)
+    return rules
+
+
+async def create_global_rules_batch_async(
+    db: AsyncSession, rules: List[GlobalRuleCreate], chunk_size: int = 1000
+) -> int:
+    """Async version of create_global_rules_batch."""
+    rows = _rule_rows(rules)
+    inserted = 0
+    for i in range(0, len(rows), chunk_size):
+        result = await db.execute(_insert_rules_stmt(rows[i : i + chunk_size]))
+        inserted += len(result.all())
+    await db.commit()
+    global_rule_cache.invalidate([r["norm_desc"] for r in rows])
+    return inserted
+
+
+async def get_global_rules_by_norm_descs_async(
+    db: AsyncSession,
+    norm_descs: Iterable[str],
+    chunk_size: int = 1000,
+    use_cache: bool = True,
+) -> Dict[str, GlobalRuleHit]:
+    """Async version of get_global_rules_by_norm_descs."""
+    descs = set(norm_descs)
+    rules: Dict[str, GlobalRuleHit] = {}
+
+    if use_cache:
+        if _cache_sync_due():
+            since = _cache_watermark.since()
+            result = await db.execute(_cache_changes_stmt(since))
+            _sync_cache(since, result.all())
+        rules.update(global_rule_cache.get_many(descs))
+        descs -= rules.keys()
+
+    descs = list(descs)
+    fetched: Dict[str, GlobalRuleHit] = {}
+    for i in range(0, len(descs), chunk_size):
+        chunk = descs[i : i + chunk_size]
+        result = await db.execute(
+            select(
+                GlobalRule.norm_desc, GlobalRule.category_id, GlobalRule.category_name
+            ).where(GlobalRule.norm_desc.in_(chunk))
+        )
+        for norm_desc, category_id, category_name in result.all():
+            fetched[norm_desc] = GlobalRuleHit(category_id, category_name)
+
+    if use_cache and fetched:
+        global_rule_cache.set_many(fetched.items())
+
+    rules.update(fetched)
+    return rules
+
+
+def _rule_changes_stmt(since: Optional[datetime]):
+    stmt = select(
+        GlobalRule.norm_desc,
+        GlobalRule.category_id,
+        GlobalRule.category_name,
+        GlobalRule.updated_at,
+    )
+    if since is not None:
+        stmt = stmt.where(GlobalRule.updated_at >= since)
+    return stmt
+
+
+def get_global_rules_changed_since(
+    db: Session, since: Optional[datetime]
+) -> List[tuple]:
+    """
+    (norm_desc, category_id, category_name, updated_at) of the rules created or
+    changed at or after `since`, all of them when None.
+    """
+    return db.execute(_rule_changes_stmt(since)).all()
+
+
+async def get_global_rules_changed_since_async(
+    db: AsyncSession, since: Optional[datetime]
+) -> List[tuple]:
+    """Async version of get_global_rules_changed_since."""
+    result = await db.execute(_rule_changes_stmt(since))
+    return result.all()
+
+
+async def upsert_global_rule_categories_async(
+    db: AsyncSession, rules: List[GlobalRuleCreate], chunk_size: int = 1000
+) -> Tuple[int, int]:
+    """
+    Set the category of the given descriptions, creating missing rules.
+    Return (updated, created).
+    """
+    rows = _rule_rows(rules)
+    updated = created = 0
+    for i in range(0, len(rows), chunk_size):
+        stmt = pg_insert(GlobalRule).values(rows[i : i + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["norm_desc"],
+            set_={
+                "category_id": stmt.excluded.category_id,
+                "category_name": stmt.excluded.category_name,
+                "note": stmt.excluded.note,
+                "updated_at": func.now(),
+            },
+        ).returning(literal_column("xmax = 0"))
+        result = await db.execute(stmt)
+        for (inserted,) in result.all():
+            created += inserted
+            updated += not inserted
+    await db.commit()
+    global_rule_cache.invalidate([r["norm_desc"] for r in rows])
+    return updated, created
@@ -0,0 +1,193 @@
+from datetime import timedelta
+from typing import Dict, Iterable, List, NamedTuple
+
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core import config
+from src.models import LLMCategorizeResult
+from src.schemas.enums import LLMCategorizeStatus
+from src.schemas.global_rule import GlobalRuleCreate
+
+
+class LLMResultHit(NamedTuple):
+    status: LLMCategorizeStatus
+    category_id: int
+    category_name: str
+
+
+def _retry_interval(failures):
+    """SQL interval of the retry backoff after `failures` consecutive failures."""
+    seconds = func.least(
+        config.LLM_FAILURE_RETRY_BASE_SECONDS * func.power(2, failures - 1),
+        config.LLM_FAILURE_RETRY_MAX_SECONDS,
+    )
+    return func.make_interval(0, 0, 0, 0, 0, 0, seconds)
+
+
+def _fresh_results_stmt(norm_descs: List[str]):
+    return select(
+        LLMCategorizeResult.norm_desc,
+        LLMCategorizeResult.status,
+        LLMCategorizeResult.category_id,
+        LLMCategorizeResult.category_name,
+    ).where(
+        LLMCategorizeResult.norm_desc.in_(norm_descs),
+        LLMCategorizeResult.expires_at > func.now(),
+    )
+
+
+def _result_rows(
+    succeeded: List[GlobalRuleCreate], failed: Iterable[str], error: str
+) -> List[dict]:
+    rows: Dict[str, dict] = {}
+    for desc in failed:
+        rows[desc] = {
+            "norm_desc": desc,
+            "status": LLMCategorizeStatus.FAILED,
+            "category_id": 0,
+            "category_name": "",
+            "attempts": 1,
+            "failures": 1,
+            "last_error": error,
+            "expires_at": func.now()
+            + timedelta(seconds=config.LLM_FAILURE_RETRY_BASE_SECONDS),
+        }
+    for rule in succeeded:
+        rows[rule.norm_desc] = {
+            "norm_desc": rule.norm_desc,
+            "status": LLMCategorizeStatus.SUCCEEDED,
+            "category_id": rule.category_id,
+            "category_name": rule.category_name,
+            "attempts": 1,
+            "failures": 0,
+            "last_error": "",
+            "expires_at": func.now() + timedelta(seconds=config.LLM_RESULT_TTL_SECONDS),
+        }
+    # Same lock order in every process, see _rule_rows in global_rule_crud
+    return [rows[d] for d in sorted(rows)]
+
+
+def _upsert_results_stmt(rows: List[dict]):
+    stmt = pg_insert(LLMCategorizeResult).values(rows)
+    excluded = stmt.excluded
+    is_failure = excluded.status == LLMCategorizeStatus.FAILED
+    failures = case((is_failure, LLMCategorizeResult.failures + 1), else_=0)
+    return stmt.on_conflict_do_update(
+        index_elements=["norm_desc"],
+        set_={
+            "status": excluded.status,
+            "category_id": excluded.category_id,
+            "category_name": excluded.category_name,
+            "attempts": LLMCategorizeResult.attempts + 1,
+            "failures": failures,
+            "last_error": excluded.last_error,
+            "expires_at": case(
+                (is_failure, func.now() + _retry_interval(failures)),
+                else_=excluded.expires_at,
+            ),
+            "updated_at": func.now(),
+        },
+    )
+
+
+def _skipped_stmt():
+    # Core table: executemany with our own WHERE, not ORM bulk update by pk
+    table = LLMCategorizeResult.__table__
+    return (
+        update(table)
+        .where(table.c.norm_desc == bindparam("desc"))
+        .values(
+            skipped=table.c.skipped + 1,
+            tokens_saved=table.c.tokens_saved + bindparam("tokens"),
+        )
+    )
+
+
+def _skipped_params(tokens_by_desc: Dict[str, int]) -> List[dict]:
+    # Executemany rows in norm_desc order too, like _result_rows
+    return [{"desc": d, "tokens": tokens_by_desc[d]} for d in sorted(tokens_by_desc)]
+
+
+def get_fresh_llm_results(
+    db: Session, norm_descs: Iterable[str], chunk_size: int = 1000
+) -> Dict[str, LLMResultHit]:
+    """Unexpired LLM results of the given descriptions, successes and failures."""
+    descs = list(set(norm_descs))
+    results: Dict[str, LLMResultHit] = {}
+    for i in range(0, len(descs), chunk_size):
+        rows = db.execute(_fresh_results_stmt(descs[i : i + chunk_size])).all()
+        for norm_desc, status, category_id, category_name in rows:
+            results[norm_desc] = LLMResultHit(
+                LLMCategorizeStatus(status), category_id, category_name
+            )
+    return results
+
+
+def record_llm_results(
+    db: Session,
+    succeeded: List[GlobalRuleCreate],
+    failed: Iterable[str],
+    error: str = "no answer from LLM",
+    chunk_size: int = 1000,
+) -> None:
+    """Upsert the outcome of an LLM call, failures push their retry time back."""
+    rows = _result_rows(succeeded, failed, error)
+    for i in range(0, len(rows), chunk_size):
+        db.execute(_upsert_results_stmt(rows[i : i + chunk_size]))
+    db.commit()
+
+
+def mark_llm_results_skipped(db: Session, tokens_by_desc: Dict[str, int]) -> None:
+    """Count the LLM calls (and estimated tokens) the cached results avoided."""
+    if not tokens_by_desc:
+        return
+    db.execute(
+        _skipped_stmt(),
+        _skipped_params(tokens_by_desc),
+    )
+    db.commit()
+
+
+async def get_fresh_llm_results_async(
+    db: AsyncSession, norm_descs: Iterable[str], chunk_size: int = 1000
+) -> Dict[str, LLMResultHit]:
+    """Async version of get_fresh_llm_results."""
+    descs = list(set(norm_descs))
+    results: Dict[str, LLMResultHit] = {}
+    for i in range(0, len(descs), chunk_size):
+        result = await db.execute(_fresh_results_stmt(descs[i : i + chunk_size]))
+        for norm_desc, status, category_id, category_name in result.all():
+            results[norm_desc] = LLMResultHit(
+                LLMCategorizeStatus(status), category_id, category_name
+            )
+    return results
+
+
+async def record_llm_results_async(
+    db: AsyncSession,
+    succeeded: List[GlobalRuleCreate],
+    failed: Iterable[str],
+    error: str = "no answer from LLM",
+    chunk_size: int = 1000,
+) -> None:
+    """Async version of record_llm_results."""
+    rows = _result_rows(succeeded, failed, error)
+    for i in range(0, len(rows), chunk_size):
+        await db.execute(_upsert_results_stmt(rows[i : i + chunk_size]))
+    await db.commit()
+
+
+async def mark_llm_results_skipped_async(
+    db: AsyncSession, tokens_by_desc: Dict[str, int]
+) -> None:
+    """Async version of mark_llm_results_skipped."""
+    if not tokens_by_desc:
+        return
+    await db.execute(
+        _skipped_stmt(),
+        _skipped_params(tokens_by_desc),
+    )
+    await db.commit()
@@ -8,10 +8,10 @@ import uuid
 
 
 async def create_statement(db: AsyncSession, statement_data: StatementCreate):
+    """Add the statement and return its id, the caller commits."""
     stmt = Statement(**statement_data.model_dump())
     db.add(stmt)
-    await db.commit()
-    await db.refresh(stmt)
+    await db.flush()
     return stmt.id
 
 
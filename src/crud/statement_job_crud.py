@@ -0,0 +1,235 @@
+from datetime import timedelta
+from typing import List, Optional, Sequence
+
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.models import StatementJob
+from src.schemas.enums import StatementJobStatus
+from src.schemas.statement_job import StatementJobCreate
+
+OPEN_STATUSES = (StatementJobStatus.PENDING, StatementJobStatus.RUNNING)
+
+
+async def create_statement_job(
+    db: AsyncSession, job_data: StatementJobCreate
+) -> StatementJob:
+    """Add the job, the caller commits (with its statement)."""
+    job = StatementJob(**job_data.model_dump())
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def count_open_jobs(db: AsyncSession) -> int:
+    """Pending + running jobs, used for upload backpressure."""
+    result = await db.execute(
+        select(func.count())
+        .select_from(StatementJob)
+        .where(StatementJob.status.in_(OPEN_STATUSES))
+    )
+    return result.scalar_one()
+
+
+async def get_open_job_by_statement_id(
+    db: AsyncSession, statement_id: int
+) -> Optional[StatementJob]:
+    result = await db.execute(
+        select(StatementJob)
+        .where(StatementJob.statement_id == statement_id)
+        .where(StatementJob.status.in_(OPEN_STATUSES))
+    )
+    return result.scalars().first()
+
+
+def _claim_stmt(*, worker_id: str, limit: int, lease_seconds: int):
+    now = func.now()
+    lease_expired = now - timedelta(seconds=lease_seconds)
+    candidates = (
+        select(StatementJob.id)
+        .where(
+            or_(
+                and_(
+                    StatementJob.status == StatementJobStatus.PENDING,
+                    StatementJob.run_after <= now,
+                ),
+                and_(
+                    StatementJob.status == StatementJobStatus.RUNNING,
+                    StatementJob.locked_at < lease_expired,
+                ),
+            )
+        )
+        .order_by(StatementJob.run_after, StatementJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return (
+        update(StatementJob)
+        .where(StatementJob.id.in_(candidates))
+        .values(
+            status=StatementJobStatus.RUNNING,
+            attempts=StatementJob.attempts + 1,
+            locked_by=worker_id,
+            locked_at=now,
+            started_at=now,
+            finished_at=None,
+        )
+        .returning(StatementJob)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def claim_jobs(
+    db: Session, *, worker_id: str, limit: int, lease_seconds: int
+) -> List[StatementJob]:
+    """
+    Claim up to `limit` runnable jobs for worker_id.
+
+    Runnable: pending jobs whose run_after has passed, or running jobs whose
+    lease expired (their worker died). Rows locked by other workers are skipped
+    (FOR UPDATE SKIP LOCKED), so any number of workers can poll concurrently.
+    """
+    if limit <= 0:
+        return []
+
+    stmt = _claim_stmt(worker_id=worker_id, limit=limit, lease_seconds=lease_seconds)
+    jobs = list(db.scalars(stmt).all())
+    # Detach so the claimed rows stay readable after commit
+    for job in jobs:
+        db.expunge(job)
+    db.commit()
+    return jobs
+
+
+async def claim_jobs_async(
+    db: AsyncSession, *, worker_id: str, limit: int, lease_seconds: int
+) -> List[StatementJob]:
+    """Async claim_jobs for the AsyncStatementWorker."""
+    if limit <= 0:
+        return []
+
+    stmt = _claim_stmt(worker_id=worker_id, limit=limit, lease_seconds=lease_seconds)
+    jobs = list((await db.scalars(stmt)).all())
+    for job in jobs:
+        db.expunge(job)
+    await db.commit()
+    return jobs
+
+
+def _heartbeat_stmt(*, worker_id: str, job_ids: Sequence[int]):
+    return (
+        update(StatementJob)
+        .where(StatementJob.id.in_(job_ids))
+        .where(StatementJob.locked_by == worker_id)
+        .where(StatementJob.status == StatementJobStatus.RUNNING)
+        .values(locked_at=func.now())
+    )
+
+
+def heartbeat_jobs(db: Session, *, worker_id: str, job_ids: Sequence[int]) -> None:
+    """Extend the lease of the jobs worker_id is still running."""
+    if not job_ids:
+        return
+    db.execute(_heartbeat_stmt(worker_id=worker_id, job_ids=job_ids))
+    db.commit()
+
+
+async def heartbeat_jobs_async(
+    db: AsyncSession, *, worker_id: str, job_ids: Sequence[int]
+) -> None:
+    if not job_ids:
+        return
+    await db.execute(_heartbeat_stmt(worker_id=worker_id, job_ids=job_ids))
+    await db.commit()
+
+
+def _succeeded_stmt(*, job_id: int, worker_id: str):
+    return (
+        update(StatementJob)
+        .where(StatementJob.id == job_id)
+        .where(StatementJob.locked_by == worker_id)
+        .values(
+            status=StatementJobStatus.SUCCEEDED,
+            finished_at=func.now(),
+            last_error="",
+        )
+    )
+
+
+def mark_job_succeeded(db: Session, *, job_id: int, worker_id: str) -> int:
+    res = db.execute(_succeeded_stmt(job_id=job_id, worker_id=worker_id))
+    db.commit()
+    return res.rowcount or 0
+
+
+async def mark_job_succeeded_async(
+    db: AsyncSession, *, job_id: int, worker_id: str
+) -> int:
+    res = await db.execute(_succeeded_stmt(job_id=job_id, worker_id=worker_id))
+    await db.commit()
+    return res.rowcount or 0
+
+
+def _failed_stmt(
+    *, job_id: int, worker_id: str, error: str, retry_delay_seconds: Optional[float]
+):
+    values = dict(finished_at=func.now(), last_error=error, locked_by="")
+    if retry_delay_seconds is None:
+        values["status"] = StatementJobStatus.FAILED
+    else:
+        values["status"] = StatementJobStatus.PENDING
+        values["run_after"] = func.now() + timedelta(seconds=retry_delay_seconds)
+
+    return (
+        update(StatementJob)
+        .where(StatementJob.id == job_id)
+        .where(StatementJob.locked_by == worker_id)
+        .values(**values)
+    )
+
+
+def mark_job_failed(
+    db: Session,
+    *,
+    job_id: int,
+    worker_id: str,
+    error: str,
+    retry_delay_seconds: Optional[float],
+) -> int:
+    """
+    Record a failed attempt. The job goes back to pending after
+    retry_delay_seconds, or to failed when retry_delay_seconds is None
+    (no attempts left).
+    """
+    res = db.execute(
+        _failed_stmt(
+            job_id=job_id,
+            worker_id=worker_id,
+            error=error,
+            retry_delay_seconds=retry_delay_seconds,
+        )
+    )
+    db.commit()
+    return res.rowcount or 0
+
+
+async def mark_job_failed_async(
+    db: AsyncSession,
+    *,
+    job_id: int,
+    worker_id: str,
+    error: str,
+    retry_delay_seconds: Optional[float],
+) -> int:
+    res = await db.execute(
+        _failed_stmt(
+            job_id=job_id,
+            worker_id=worker_id,
+            error=error,
+            retry_delay_seconds=retry_delay_seconds,
+        )
+    )
+    await db.commit()
+    return res.rowcount or 0
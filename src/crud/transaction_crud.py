@@ -1,13 +1,33 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select, update, func
-from typing import Optional, List
+from sqlalchemy import select, update, func, insert, delete, text
+from typing import Dict, Optional, List, Iterable, Mapping, Sequence, Tuple, Union
 
+from src.crud.exchange_rates_crud import (
+    BEST_RATE_DAY_SQL,
+    COVERING_DAYS_CTE,
+    FxRateNotFound,
+)
 from src.models import Transaction
 from src.schemas.transaction import TransactionCreate, TransactionUpdate
 from datetime import date
+import io
 import uuid
 
+# Default column order of the rows accepted by bulk_insert_transactions
+TRANSACTION_INSERT_COLUMNS = (
+    "user_id",
+    "tx_date",
+    "amount",
+    "currency",
+    "category_id",
+    "description",
+    "statement_id",
+)
+
+# Either row tuples in column order, or column name -> sequence of values
+TransactionRows = Union[Iterable[Sequence], Mapping[str, Sequence]]
+
 
 def create_transaction(db: Session, transaction_data: TransactionCreate) -> Transaction:
     transaction_data_dict = transaction_data.model_dump(exclude_unset=True)
@@ -31,6 +51,126 @@ def create_transactions_batch(
     db.commit()
 
 
+def bulk_insert_transactions(
+    db: Session,
+    rows: TransactionRows,
+    columns: Sequence[str] = TRANSACTION_INSERT_COLUMNS,
+    use_copy: bool = True,
+) -> int:
+    """
+    Insert plain rows into transactions without building ORM objects.
+
+    Uses PostgreSQL COPY when the driver supports it (psycopg2), otherwise a
+    Core multi-row INSERT. Columns not listed get their server defaults.
+    Return the inserted count.
+    """
+    if isinstance(rows, Mapping):
+        rows = list(zip(*(rows[c] for c in columns)))
+    else:
+        rows = list(rows)
+    if not rows:
+        return 0
+
+    if use_copy and _copy_rows(db, rows, columns):
+        db.commit()
+        return len(rows)
+
+    db.execute(insert(Transaction.__table__), [dict(zip(columns, row)) for row in rows])
+    db.commit()
+    return len(rows)
+
+
+async def bulk_insert_transactions_async(
+    db: AsyncSession,
+    rows: TransactionRows,
+    columns: Sequence[str] = TRANSACTION_INSERT_COLUMNS,
+    use_copy: bool = True,
+) -> int:
+    """
+    Async version of bulk_insert_transactions.
+    Uses asyncpg's binary COPY (copy_records_to_table) when available.
+    """
+    if isinstance(rows, Mapping):
+        rows = list(zip(*(rows[c] for c in columns)))
+    else:
+        rows = list(rows)
+    if not rows:
+        return 0
+
+    if use_copy:
+        conn = await db.connection()
+        raw_conn = await conn.get_raw_connection()
+        driver_conn = raw_conn.driver_connection
+        if hasattr(driver_conn, "copy_records_to_table"):
+            await driver_conn.copy_records_to_table(
+                Transaction.__tablename__, records=rows, columns=list(columns)
+            )
+            await db.commit()
+            return len(rows)
+
+    await db.execute(
+        insert(Transaction.__table__), [dict(zip(columns, row)) for row in rows]
+    )
+    await db.commit()
+    return len(rows)
+
+
+def delete_transactions_by_statement_id(db: Session, statement_id: int) -> int:
+    """Hard-delete the rows of a statement, e.g. before re-running its parse."""
+    res = db.execute(
+        delete(Transaction).where(Transaction.statement_id == statement_id)
+    )
+    db.commit()
+    return res.rowcount or 0
+
+
+async def delete_transactions_by_statement_id_async(
+    db: AsyncSession, statement_id: int
+) -> int:
+    res = await db.execute(
+        delete(Transaction).where(Transaction.statement_id == statement_id)
+    )
+    await db.commit()
+    return res.rowcount or 0
+
+
+def _copy_rows(db: Session, rows: List[Sequence], columns: Sequence[str]) -> bool:
+    """COPY rows into transactions, return False if the driver has no COPY support."""
+    cursor = db.connection().connection.cursor()
+    try:
+        if not hasattr(cursor, "copy_expert"):
+            return False
+        cursor.copy_expert(
+            f"COPY {Transaction.__tablename__} ({', '.join(columns)}) FROM STDIN",
+            _to_copy_buffer(rows),
+        )
+        return True
+    finally:
+        cursor.close()
+
+
+def _copy_value(value) -> str:
+    """Format a value for COPY ... FROM STDIN (text format)."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _to_copy_buffer(rows: List[Sequence]) -> io.StringIO:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(map(_copy_value, row)))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
 async def get_transactions_by_user(
     db: AsyncSession,
     user_id: uuid.UUID,
@@ -80,6 +220,126 @@ async def get_transactions_by_user(
     return items, total
 
 
+# Sum of the filtered transactions by category and month, converted to :to_cur
+# (as is when NULL). Rate days are the ones of get_best_rates_for_dates, with
+# the quote key of each currency built like ExchangeRateService.required_quotes.
+# Amounts are rounded half up per transaction with the rates scaled to
+# integers, like ExchangeRateService.convert_amounts.
+SUMMARY_TOTALS_SQL = f"""
+    WITH tx AS (
+        SELECT category_id, tx_date, currency, amount
+        FROM transactions
+        WHERE {{filters}}
+    ),
+    pairs AS (
+        SELECT DISTINCT tx_date, currency,
+               array_to_string(
+                   array_remove(
+                       ARRAY[least(currency, :to_cur), greatest(currency, :to_cur)],
+                       :base_currency
+                   ),
+                   ','
+               ) AS qkey
+        FROM tx
+        WHERE currency <> :to_cur
+    ),
+    qkeys AS (
+        SELECT DISTINCT qkey FROM pairs
+    ),
+    {COVERING_DAYS_CTE},
+    fx AS (
+        SELECT p.tx_date, p.currency, best.as_of_date,
+               coalesce(r_to.rate, 1) * 100000000 AS multiplier,
+               coalesce(r_from.rate, 1) * 100000000 AS divisor
+        FROM pairs p
+        LEFT JOIN LATERAL ({BEST_RATE_DAY_SQL.format(row="p")}) best ON true
+        LEFT JOIN exchange_rates r_from
+          ON r_from.as_of_date = best.as_of_date
+         AND r_from.base_currency = :base_currency
+         AND r_from.source = :source
+         AND r_from.quote_currency = p.currency
+        LEFT JOIN exchange_rates r_to
+          ON r_to.as_of_date = best.as_of_date
+         AND r_to.base_currency = :base_currency
+         AND r_to.source = :source
+         AND r_to.quote_currency = :to_cur
+    )
+    SELECT tx.category_id,
+           to_char(tx.tx_date, 'YYYY-MM') AS month,
+           sum(
+               CASE WHEN fx.currency IS NULL THEN tx.amount
+               ELSE sign(CAST(tx.amount AS numeric)) * div(
+                   2 * abs(CAST(tx.amount AS numeric)) * fx.multiplier
+                   + fx.divisor,
+                   2 * fx.divisor
+               )
+               END
+           ) AS amount,
+           array_agg(DISTINCT tx.currency)
+               FILTER (WHERE fx.currency IS NOT NULL AND fx.as_of_date IS NULL)
+               AS missing
+    FROM tx
+    LEFT JOIN fx ON fx.tx_date = tx.tx_date AND fx.currency = tx.currency
+    GROUP BY 1, 2
+    ORDER BY 2 DESC, 3 DESC
+"""
+
+
+async def get_transaction_totals(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    *,
+    base_currency: str,
+    source: str,
+    display_currency: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    min_amount_out: Optional[int] = None,
+    max_amount_out: Optional[int] = None,
+    status: Optional[int] = None,
+) -> List[Tuple[int, str, int]]:
+    """
+    (category_id, "YYYY-MM", amount) of the transactions matching the filters of
+    get_transactions_by_user, amounts converted to display_currency (minor
+    units) in the query. Raise FxRateNotFound if a currency has no rate day.
+    """
+    filters = ["user_id = :user_id"]
+    if start_date:
+        filters.append("tx_date >= :start_date")
+    if end_date:
+        filters.append("tx_date <= :end_date")
+    if min_amount_out is not None:
+        filters.append("amount >= :min_amount_out")
+    if max_amount_out is not None:
+        filters.append("amount <= :max_amount_out")
+    if status is not None:
+        filters.append("status = :status")
+
+    result = await db.execute(
+        text(SUMMARY_TOTALS_SQL.format(filters=" AND ".join(filters))),
+        {
+            "user_id": user_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "min_amount_out": min_amount_out,
+            "max_amount_out": max_amount_out,
+            "status": status,
+            "to_cur": display_currency.upper() if display_currency else None,
+            "base_currency": base_currency,
+            "source": source,
+        },
+    )
+    rows = result.all()
+
+    missing = sorted({cur for *_, currencies in rows for cur in currencies or ()})
+    if missing:
+        raise FxRateNotFound(
+            f"No FX rate day found that covers the quotes of {missing} "
+            f"for base={base_currency} source={source}"
+        )
+    return [(category_id, month, int(amount)) for category_id, month, amount, _ in rows]
+
+
 async def get_transaction_by_id(
     db: AsyncSession, transaction_id: int
 ) -> Optional[Transaction]:
@@ -92,11 +352,11 @@ async def get_transaction_by_id(
 async def update_transaction(
     db: AsyncSession, db_obj: Transaction, obj_in: TransactionUpdate
 ) -> Transaction:
+    """Apply the set fields of obj_in, the caller commits."""
     update_data = obj_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_obj, field, value)
-    await db.commit()
-    await db.refresh(db_obj)
+    await db.flush()
     return db_obj
 
 
@@ -114,3 +374,61 @@ async def soft_delete_by_statement_id(
     )
     res = await db.execute(q)
     return res.rowcount or 0
+
+
+# One keyset chunk of a recategorization: the next :chunk_size transactions
+# (by id) whose description has a new category, except deleted ones (status 2)
+# and the ones the user categorized themselves (user_rules)
+RECATEGORIZE_CHUNK_SQL = text(
+    """
+    WITH rules AS (
+        SELECT *
+        FROM unnest(CAST(:descs AS text[]), CAST(:category_ids AS int[]))
+            AS r(norm_desc, category_id)
+    ),
+    batch AS (
+        SELECT t.id, r.category_id
+        FROM transactions t
+        JOIN rules r ON r.norm_desc = t.description
+        WHERE t.id > :after_id
+          AND t.status = 1
+          AND t.category_id <> r.category_id
+          AND NOT EXISTS (
+              SELECT 1 FROM user_rules u
+              WHERE u.user_id = t.user_id AND u.norm_desc = t.description
+          )
+        ORDER BY t.id
+        LIMIT :chunk_size
+    ),
+    updated AS (
+        UPDATE transactions t
+        SET category_id = batch.category_id, updated_at = now()
+        FROM batch
+        WHERE t.id = batch.id
+        RETURNING t.id
+    )
+    SELECT count(*), max(id) FROM updated
+    """
+)
+
+
+async def recategorize_chunk_by_description(
+    db: AsyncSession, categories: Dict[str, int], after_id: int, chunk_size: int
+) -> Tuple[int, Optional[int]]:
+    """
+    Set category_id = categories[description] on the next chunk_size
+    transactions with id > after_id, in one UPDATE committed on its own so row
+    locks are short. Return (updated, last id) with last id None when done.
+    """
+    result = await db.execute(
+        RECATEGORIZE_CHUNK_SQL,
+        {
+            "descs": list(categories),
+            "category_ids": list(categories.values()),
+            "after_id": after_id,
+            "chunk_size": chunk_size,
+        },
+    )
+    updated, last_id = result.one()
+    await db.commit()
+    return updated, (last_id if updated == chunk_size else None)
@@ -0,0 +1,43 @@
+import uuid
+from typing import Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.models import UserRule
+
+
+def _user_rules_stmt(user_id: uuid.UUID):
+    return select(UserRule.norm_desc, UserRule.category_id).where(
+        UserRule.user_id == user_id
+    )
+
+
+def get_user_rules(db: Session, user_id: uuid.UUID) -> Dict[str, int]:
+    """All the rules of a user, norm_desc -> category_id."""
+    return dict(db.execute(_user_rules_stmt(user_id)).all())
+
+
+async def get_user_rules_async(db: AsyncSession, user_id: uuid.UUID) -> Dict[str, int]:
+    """Async version of get_user_rules."""
+    result = await db.execute(_user_rules_stmt(user_id))
+    return dict(result.all())
+
+
+async def upsert_user_rule(
+    db: AsyncSession, user_id: uuid.UUID, norm_desc: str, category_id: int
+) -> None:
+    """
+    Remember the category a user picked for a description, the last pick wins.
+    The caller commits, together with the transaction update that taught it.
+    """
+    stmt = pg_insert(UserRule).values(
+        user_id=user_id, norm_desc=norm_desc, category_id=category_id
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "norm_desc"],
+        set_={"category_id": stmt.excluded.category_id, "updated_at": func.now()},
+    )
+    await db.execute(stmt)
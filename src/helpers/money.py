@@ -1,4 +1,7 @@
 from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Tuple
+
+import numpy as np
 
 _MINOR_FACTOR = Decimal("100")
 
@@ -10,3 +13,42 @@ def to_minor_units(amount: Decimal | int) -> int:
     Uses ROUND_HALF_UP for financial rounding.
     """
     return int((amount * _MINOR_FACTOR).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+# exchange_rates.rate is DECIMAL(18,8): rates are exact integers at this scale
+RATE_SCALE = 10**8
+_INT64_MAX = 2**63 - 1
+
+
+def to_scaled_rate(rate: Decimal) -> Optional[int]:
+    """rate * RATE_SCALE as an int, None if rate has more than 8 decimals."""
+    scaled = rate * RATE_SCALE
+    if scaled != scaled.to_integral_value():
+        return None
+    return int(scaled)
+
+
+def convert_minor_units(
+    amounts: np.ndarray, multiplier: int, divisor: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    round(amounts * multiplier / divisor), ROUND_HALF_UP (ties away from zero),
+    on int64 arrays. Return (converted, ok): where ok is False the product would
+    overflow int64 and converted is meaningless, convert those with Decimal.
+
+    Results are bit-identical to the Decimal path of ExchangeRateService:
+    there the product amount * rate is exact (it fits int64, far below the
+    28 digits of the default context) and the quotient is rounded to 28
+    significant digits before quantize. That rounding moves x = n / divisor
+    by at most |x| * 5e-28, while a quotient that is not exactly a tie is at
+    least 1 / (2 * divisor) away from one. |n| < 1e27 makes the first smaller,
+    so both paths always pick the same side of every tie.
+    """
+    amounts = np.asarray(amounts, dtype=np.int64)
+    # 2 * |amount| * multiplier + divisor must fit int64
+    max_abs = ((_INT64_MAX - divisor) // 2) // multiplier
+    ok = (amounts <= max_abs) & (amounts >= -max_abs)
+
+    magnitude = np.where(ok, np.abs(amounts), 0)
+    rounded = (2 * magnitude * multiplier + divisor) // (2 * divisor)
+    return np.where(amounts < 0, -rounded, rounded), ok
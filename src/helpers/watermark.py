@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class UpdatedAtWatermark:
+    """
+    How far a process-local copy of a table has followed its updated_at.
+
+    updated_at is set at the start of the writing transaction, so a row can
+    commit with a timestamp behind rows already seen: changes are read again
+    from overlap_seconds before the newest one seen. Readers must treat the
+    rows read again as no-ops.
+    """
+
+    def __init__(self, overlap_seconds: float):
+        self.overlap_seconds = overlap_seconds
+        self.last_updated_at: Optional[datetime] = None
+
+    def since(self) -> Optional[datetime]:
+        """Read the changes from here, None: nothing seen yet, read everything."""
+        if self.last_updated_at is None:
+            return None
+        return self.last_updated_at - timedelta(seconds=self.overlap_seconds)
+
+    def advance(self, updated_at: Optional[datetime]) -> None:
+        if updated_at is not None and (
+            self.last_updated_at is None or updated_at > self.last_updated_at
+        ):
+            self.last_updated_at = updated_at
@@ -1,7 +1,12 @@
+import asyncio
+import contextlib
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.api import users, statements, transactions, categories, summary
+from src.api import users, statements, transactions, categories, summary, rules
+from src.core import config
+from src.core.db import AsyncSessionLocal, DATABASE_URL
+from src.services.fx_rate_store import fx_rate_store, listen_for_rate_updates
 
 
 # Log conf
@@ -9,7 +14,25 @@ logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
-app = FastAPI()
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = None
+    if config.FX_RATE_STORE_ENABLED:
+        # Rates in memory, kept current by pull_exchange_rates notifications
+        async with AsyncSessionLocal() as db:
+            await fx_rate_store.refresh(db)
+        listener = asyncio.create_task(
+            listen_for_rate_updates(fx_rate_store, AsyncSessionLocal, DATABASE_URL)
+        )
+    yield
+    if listener is not None:
+        listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await listener
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",  # Front-end addr
@@ -27,6 +50,7 @@ app.include_router(statements.router)
 app.include_router(transactions.router)
 app.include_router(categories.router)
 app.include_router(summary.router)
+app.include_router(rules.router)
 
 
 @app.get("/")
@@ -5,3 +5,6 @@ from .statement import Statement
 from .transaction import Transaction
 from .user import User
 from .global_rule import GlobalRule
+from .statement_job import StatementJob
+from .llm_categorize_result import LLMCategorizeResult
+from .user_rule import UserRule
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, DateTime, Column, Boolean, Text
+from sqlalchemy import Integer, String, DateTime, Column, Boolean, Text, Index
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -12,4 +12,12 @@ class GlobalRule(Base):
     category_name = Column(String(255), nullable=False, server_default='')
     note = Column(Text, nullable=False, server_default='')
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    # One rule per description, rule writes rely on it for ON CONFLICT.
+    # Existing duplicates: run jobs/dedupe_global_rules.py before creating it.
+    __table_args__ = (
+        Index("ux_global_rules_norm_desc", "norm_desc", unique=True),
+        # Other processes pick up rule changes by updated_at
+        Index("idx_global_rules_updated_at", "updated_at"),
+    )
@@ -0,0 +1,53 @@
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    Integer,
+    SmallInteger,
+    String,
+    DateTime,
+    Text,
+    Index,
+    CheckConstraint,
+)
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class LLMCategorizeResult(Base):
+    """
+    Last LLM categorization outcome of a norm_desc.
+    Failures are not sent to the LLM again before expires_at, see
+    BaseBankParser.parse_chunk.
+    """
+
+    __tablename__ = "llm_categorize_results"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    norm_desc = Column(Text, nullable=False)
+    # 1 succeeded, 2 failed (LLMCategorizeStatus)
+    status = Column(SmallInteger, nullable=False)
+    category_id = Column(Integer, nullable=False, server_default="0")
+    category_name = Column(String(255), nullable=False, server_default="")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    # Consecutive failures, drives the retry backoff
+    failures = Column(Integer, nullable=False, server_default="0")
+    # Times a parse reused this result instead of calling the LLM
+    skipped = Column(Integer, nullable=False, server_default="0")
+    # Estimated LLM tokens those skips avoided
+    tokens_saved = Column(BigInteger, nullable=False, server_default="0")
+    last_error = Column(Text, nullable=False, server_default="")
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        Index("ux_llm_categorize_results_norm_desc", "norm_desc", unique=True),
+        CheckConstraint("status IN (1,2)", name="chk_llm_categorize_status_valid"),
+    )
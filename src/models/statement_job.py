@@ -0,0 +1,52 @@
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    SmallInteger,
+    String,
+    DateTime,
+    Text,
+    Index,
+    CheckConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class StatementJob(Base):
+    """Durable parse job of an uploaded statement, see jobs/statement_worker.py"""
+
+    __tablename__ = "statement_jobs"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    statement_id = Column(BigInteger, nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    bank = Column(String(50), nullable=False)
+    currency = Column(String(3), nullable=False)
+    file_path = Column(Text, nullable=False)
+    # 1 pending, 2 running, 3 succeeded, 4 failed (StatementJobStatus)
+    status = Column(SmallInteger, nullable=False, server_default="1")
+    attempts = Column(SmallInteger, nullable=False, server_default="0")
+    max_attempts = Column(SmallInteger, nullable=False, server_default="5")
+    run_after = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    locked_by = Column(String(255), nullable=False, server_default="")
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=False, server_default="")
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        Index("idx_statement_jobs_status_run_after", "status", "run_after"),
+        CheckConstraint("status IN (1,2,3,4)", name="chk_statement_job_status_valid"),
+    )
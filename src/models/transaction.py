@@ -43,6 +43,8 @@ class Transaction(Base):
             "idx_transactions_user_currency_txdate", "user_id", "currency", "tx_date"
         ),
         Index("idx_transactions_user_txdate", "user_id", "tx_date"),
+        # Recategorization by description after a global rule change
+        Index("idx_transactions_description", "description"),
         CheckConstraint("currency ~ '^[A-Z]{3}$'", name="chk_currency_iso4217"),
         CheckConstraint("status IN (1,2)", name="chk_status_valid"),
     )
@@ -0,0 +1,39 @@
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    Integer,
+    Text,
+    DateTime,
+    ForeignKey,
+    Index,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class UserRule(Base):
+    """
+    Category a user picked for a norm_desc, learned from their transaction
+    edits. Applied before every shared rule, see BaseBankParser.parse_chunk.
+    """
+
+    __tablename__ = "user_rules"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    norm_desc = Column(Text, nullable=False)
+    category_id = Column(Integer, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        Index("ux_user_rules_user_norm_desc", "user_id", "norm_desc", unique=True),
+    )
@@ -6,3 +6,15 @@ class BankEnum(str, Enum):
     TD = "TD"
     Rogers = "Rogers"
     CMB = "CMB"
+
+
+class StatementJobStatus(int, Enum):
+    PENDING = 1
+    RUNNING = 2
+    SUCCEEDED = 3
+    FAILED = 4
+
+
+class LLMCategorizeStatus(int, Enum):
+    SUCCEEDED = 1
+    FAILED = 2
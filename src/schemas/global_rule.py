@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict, UUID4, Field, condecimal
 from datetime import datetime
+from typing import List
 
 
 class GlobalRuleCreate(BaseModel):
@@ -8,6 +9,7 @@ class GlobalRuleCreate(BaseModel):
     category_name: str
     note: str
 
+
 class GlobalRuleRead(BaseModel):
     id: int
     norm_desc: str
@@ -18,3 +20,19 @@ class GlobalRuleRead(BaseModel):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class GlobalRuleChange(BaseModel):
+    norm_desc: str = Field(min_length=1)
+    category_id: int
+
+
+class RecategorizeRequest(BaseModel):
+    rules: List[GlobalRuleChange] = Field(min_length=1)
+
+
+class RecategorizeResult(BaseModel):
+    rules_updated: int
+    rules_created: int
+    transactions_updated: int
+    chunks: int
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, ConfigDict, UUID4, Field
+from typing import Optional
+from datetime import datetime
+
+
+class StatementJobCreate(BaseModel):
+    statement_id: int
+    user_id: UUID4
+    bank: str
+    currency: str
+    file_path: str
+    max_attempts: Optional[int] = Field(default=5)
+
+
+class StatementJobRead(BaseModel):
+    id: int
+    statement_id: int
+    user_id: UUID4
+    bank: str
+    currency: str
+    file_path: str
+    status: int
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    locked_by: str
+    locked_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    last_error: str
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from src.core import config
+from src.services.categorizers.llm_categorizer import (
+    CategorizeReport,
+    HFTransactionCategorizer,
+    get_categorizer,
+)
+
+# Outcome of one description: ("categorized", item), ("unanswered", None) or
+# ("errored", None)
+Outcome = Tuple[str, Optional[dict]]
+
+
+class CategorizationCoalescer:
+    """
+    Merge the LLM categorizations of concurrent parses running on one event loop.
+
+    Descriptions requested within window_ms of each other are deduped and sent
+    as one categorize_report_async call, each caller then gets the results of
+    its own descriptions. A description already pending or in flight for
+    another parse is not requested twice.
+    """
+
+    def __init__(
+        self,
+        categorizer: HFTransactionCategorizer,
+        window_ms: int = config.LLM_COALESCE_WINDOW_MS,
+        max_batch: int = config.LLM_COALESCE_MAX_BATCH,
+    ):
+        self.categorizer = categorizer
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        # Descriptions waiting for the next flush / in a batch being categorized
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._pending_callers = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def categorize_report(
+        self, transaction_descriptions: List[str]
+    ) -> CategorizeReport:
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        for desc in dict.fromkeys(transaction_descriptions):
+            future = self._in_flight.get(desc) or self._pending.get(desc)
+            if future is None:
+                future = loop.create_future()
+                self._pending[desc] = future
+            futures[desc] = future
+        self._pending_callers += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._pending and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        # Shielded: the futures are shared with other parses, cancelling this
+        # caller must not cancel them
+        outcomes = await asyncio.gather(*(asyncio.shield(f) for f in futures.values()))
+
+        report = CategorizeReport([], [], [])
+        for desc, (kind, item) in zip(futures, outcomes):
+            if kind == "categorized":
+                report.categorized.append(item)
+            else:
+                getattr(report, kind).append(desc)
+        return report
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        callers, self._pending_callers = self._pending_callers, 0
+        self._in_flight.update(batch)
+        logging.info(
+            f"[{self.__class__.__name__}] categorizing {len(batch)} distinct "
+            f"descriptions for {callers} parses in one batch"
+        )
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[str, asyncio.Future]) -> None:
+        try:
+            report = await self.categorizer.categorize_report_async(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            outcomes: Dict[str, Outcome] = {
+                d: ("unanswered", None) for d in report.unanswered
+            }
+            outcomes.update({d: ("errored", None) for d in report.errored})
+            outcomes.update(
+                {d["norm_desc"]: ("categorized", d) for d in report.categorized}
+            )
+            for desc, future in batch.items():
+                if not future.done():
+                    future.set_result(outcomes.get(desc, ("unanswered", None)))
+        finally:
+            for desc, future in batch.items():
+                if self._in_flight.get(desc) is future:
+                    del self._in_flight[desc]
+
+
+# One coalescer per event loop, the futures it hands out belong to that loop
+_coalescers = weakref.WeakKeyDictionary()
+
+
+def get_coalescer() -> CategorizationCoalescer:
+    """Coalescer of the running event loop, over the process-wide categorizer."""
+    loop = asyncio.get_running_loop()
+    coalescer = _coalescers.get(loop)
+    if coalescer is None:
+        coalescer = CategorizationCoalescer(get_categorizer())
+        _coalescers[loop] = coalescer
+    return coalescer
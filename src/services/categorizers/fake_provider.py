@@ -0,0 +1,109 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import List
+
+import requests
+from huggingface_hub.utils import HfHubHTTPError
+
+from src.core import config
+
+# Same ids and names as prompt.txt
+CATEGORIES = [
+    (1, "Housing"),
+    (2, "Utilities"),
+    (3, "Groceries"),
+    (4, "Food & Dining"),
+    (5, "Transportation"),
+    (6, "Shopping"),
+    (7, "Health & Medical"),
+    (8, "Fitness"),
+    (9, "Entertainment"),
+    (10, "Subscription"),
+    (11, "Education"),
+    (12, "Other"),
+    (13, "Pets"),
+    (14, "Insurance"),
+]
+
+
+def fake_category(norm_desc: str) -> tuple:
+    """Deterministic (category_id, category_name) of a description."""
+    digest = hashlib.md5(norm_desc.encode("utf-8")).digest()
+    return CATEGORIES[digest[0] % len(CATEGORIES)]
+
+
+class FakeInferenceClient:
+    """
+    Offline stand-in for InferenceClient, for load tests and benchmarks.
+    Use it by listing a provider named "fake..." in LLM_PROVIDERS.
+
+    chat_completion answers the categorization prompt with the same JSON schema
+    as a real provider: every line of the user message is one description.
+    Latency is FAKE_LLM_LATENCY_MS plus FAKE_LLM_MS_PER_ITEM per description,
+    with exponential jitter. FAKE_LLM_ERROR_RATE of the calls fail with a 503,
+    FAKE_LLM_DROP_RATE of the descriptions are left out of the answer.
+    """
+
+    # Calls across all instances, for benchmarks
+    stats = {"calls": 0, "errors": 0, "items": 0}
+    _stats_lock = threading.Lock()
+
+    def __init__(self, provider: str = "fake", seed: int = None):
+        self.provider = provider
+        self.latency = config.FAKE_LLM_LATENCY_MS / 1000
+        self.per_item = config.FAKE_LLM_MS_PER_ITEM / 1000
+        self.error_rate = config.FAKE_LLM_ERROR_RATE
+        self.drop_rate = config.FAKE_LLM_DROP_RATE
+        self._rnd = random.Random(seed)
+        self._rnd_lock = threading.Lock()
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._stats_lock:
+            for key in cls.stats:
+                cls.stats[key] = 0
+
+    def _count(self, **increments) -> None:
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def chat_completion(self, messages: List[dict], **kwargs):
+        descs = [line for line in messages[-1]["content"].split("\n") if line]
+        with self._rnd_lock:
+            jitter = self._rnd.expovariate(1 / self.latency) if self.latency else 0.0
+            fail = self._rnd.random() < self.error_rate
+            dropped = {d for d in descs if self._rnd.random() < self.drop_rate}
+        time.sleep(self.latency / 2 + jitter / 2 + self.per_item * len(descs))
+
+        if fail:
+            self._count(calls=1, errors=1)
+            response = requests.Response()
+            response.status_code = 503
+            raise HfHubHTTPError(
+                f"{self.provider}: 503 Service Unavailable", response=response
+            )
+
+        self._count(calls=1, items=len(descs))
+        items = []
+        for desc in descs:
+            if desc in dropped:
+                continue
+            category_id, category_name = fake_category(desc)
+            items.append(
+                {
+                    "norm_desc": desc,
+                    "category_id": category_id,
+                    "category_name": category_name,
+                    "note": "fake",
+                }
+            )
+        content = json.dumps({"trans_category_list": items}, ensure_ascii=False)
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(index=0, finish_reason="stop", message=message)]
+        )
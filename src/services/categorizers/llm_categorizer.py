@@ -1,24 +1,94 @@
 import os
 import json
+import asyncio
 import logging
-import random
-from huggingface_hub import (
-    InferenceClient,
-    ChatCompletionInputResponseFormatJSONSchema,
+import threading
+from huggingface_hub import ChatCompletionInputResponseFormatJSONSchema
+from src.core import config
+from src.services.categorizers.provider_pool import (
+    ProviderPool,
+    ProviderUnavailable,
+    get_provider_pool,
 )
-from huggingface_hub.utils import HfHubHTTPError
 from src.schemas.transaction import TransactionCategoryList
-from typing import List
+from typing import Iterable, List, NamedTuple, Optional
+
+# Rough output tokens of one result item besides the description itself:
+# {"norm_desc": "...", "category_id": 4, "category_name": "...", "note": "..."}
+ITEM_TOKEN_OVERHEAD = 40
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~3 chars per token, CJK counted one per char)."""
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return ascii_chars // 3 + (len(text) - ascii_chars) + 1
+
+
+def estimate_item_tokens(desc: str) -> int:
+    """Estimated tokens one description costs in a request, input plus output."""
+    return 2 * estimate_tokens(desc) + ITEM_TOKEN_OVERHEAD
+
+
+class CategorizeReport(NamedTuple):
+    categorized: List[dict]
+    # In a successful response but left out by the model
+    unanswered: List[str]
+    # In a request that failed after all retries
+    errored: List[str]
+
+
+def chunk_descriptions(
+    descriptions: Iterable[str],
+    max_tokens: Optional[int] = None,
+    max_items: Optional[int] = None,
+) -> List[List[str]]:
+    """
+    Split descriptions into request-sized chunks, keeping their order.
+    The model echoes every description back, so a chunk is bounded by the
+    estimated output tokens of its items as well as by their count
+    (LLM_CHUNK_MAX_TOKENS / LLM_CHUNK_MAX_ITEMS by default).
+    """
+    max_tokens = max_tokens or config.LLM_CHUNK_MAX_TOKENS
+    max_items = max_items or config.LLM_CHUNK_MAX_ITEMS
+    chunks: List[List[str]] = []
+    chunk: List[str] = []
+    chunk_tokens = 0
+    for desc in descriptions:
+        tokens = estimate_tokens(desc) + ITEM_TOKEN_OVERHEAD
+        if chunk and (chunk_tokens + tokens > max_tokens or len(chunk) >= max_items):
+            chunks.append(chunk)
+            chunk, chunk_tokens = [], 0
+        chunk.append(desc)
+        chunk_tokens += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
 
 
 class HFTransactionCategorizer:
+    """
+    LLM categorizer. Build it once per process (get_categorizer): the prompt,
+    response schema and provider clients are reused by every call.
+    """
+
     def __init__(
         self,
         model_name: str = "meta-llama/Llama-3.3-70B-Instruct",
         providers: List[str] = None,
+        max_concurrency: int = config.LLM_MAX_CONCURRENCY,
+        pool: Optional[ProviderPool] = None,
     ):
-        self.providers = providers or ["cerebras"]
         self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.max_attempts = 3
+        if pool is None:
+            pool = (
+                ProviderPool(providers, max_workers=2 * max_concurrency)
+                if providers
+                else get_provider_pool()
+            )
+        self.pool = pool
+        self.providers = pool.providers
 
         self.response_format = ChatCompletionInputResponseFormatJSONSchema(
             type="json_schema",
@@ -35,71 +105,137 @@ class HFTransactionCategorizer:
         with open(prompt_path, "r", encoding="utf-8") as f:
             self.system_prompt = f.read()
 
-    def _create_client(self, provider: str) -> InferenceClient:
-        return InferenceClient(
-            api_key=os.getenv("HF_TOKEN", ""),
-            provider=provider,
-        )
-
-    def categorize(self, transaction_descriptions: List[str]) -> List[dict]:
-        logging.info(
-            f"[HF API Call] Request transaction_descriptions: {transaction_descriptions}"
-        )
-
-        # Build system/user messages
-        messages = [
+    def _build_messages(self, transaction_descriptions: List[str]) -> List[dict]:
+        return [
             {"role": "system", "content": self.system_prompt},
             {"role": "user", "content": "\n".join(transaction_descriptions)},
         ]
 
-        max_attempts = 3
-        tried_providers = []
+    @staticmethod
+    def _parse_response(structured_data: str, requested: List[str]) -> List[dict]:
+        trans_category_list = json.loads(structured_data)["trans_category_list"]
+        # Drop anything the model made up instead of echoing a requested description
+        wanted = set(requested)
+        return [d for d in trans_category_list if d.get("norm_desc") in wanted]
 
-        for attempt in range(max_attempts):
-            available_providers = [
-                p for p in self.providers if p not in tried_providers
-            ]
-            if not available_providers:
-                logging.warning(
-                    "All providers exhausted, retrying previously tried providers"
+    def categorize(self, transaction_descriptions: List[str]) -> List[dict]:
+        """
+        Categorize descriptions, see categorize_async.
+        Must not be called from a running event loop, await categorize_async there.
+        """
+        return self.categorize_report(transaction_descriptions).categorized
+
+    def categorize_report(
+        self, transaction_descriptions: List[str]
+    ) -> CategorizeReport:
+        """Sync version of categorize_report_async."""
+        return asyncio.run(self.categorize_report_async(transaction_descriptions))
+
+    async def categorize_async(self, transaction_descriptions: List[str]) -> List[dict]:
+        """
+        Split the descriptions into token-bounded chunks and categorize them
+        concurrently, at most max_concurrency requests in flight.
+
+        Results of successful chunks are kept when others fail, the missing
+        descriptions are simply absent from the result. Raise only when every
+        chunk failed.
+        """
+        report = await self.categorize_report_async(transaction_descriptions)
+        return report.categorized
+
+    async def categorize_report_async(
+        self, transaction_descriptions: List[str]
+    ) -> CategorizeReport:
+        """categorize_async, also telling which descriptions got no category and why."""
+        chunks = chunk_descriptions(transaction_descriptions)
+        if not chunks:
+            return CategorizeReport([], [], [])
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(chunk: List[str]) -> List[dict]:
+            async with semaphore:
+                return await self.categorize_chunk_async(chunk)
+
+        results = await asyncio.gather(
+            *(run(chunk) for chunk in chunks), return_exceptions=True
+        )
+
+        categorized: List[dict] = []
+        unanswered: List[str] = []
+        errored: List[str] = []
+        errors: List[BaseException] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logging.error(
+                    f"[HF API Call] chunk of {len(chunk)} descriptions failed: {result!r}"
                 )
-                available_providers = self.providers.copy()
+                errors.append(result)
+                errored.extend(chunk)
+            else:
+                categorized.extend(result)
+                answered = {d["norm_desc"] for d in result}
+                unanswered.extend(d for d in chunk if d not in answered)
 
-            provider = random.choice(available_providers)
-            tried_providers.append(provider)
-            logging.info(
-                f"[HF API Call] Attempt {attempt + 1}, using provider: {provider}"
-            )
+        logging.info(
+            f"[HF API Call] categorized {len(categorized)}/"
+            f"{len(transaction_descriptions)} descriptions in {len(chunks)} chunks, "
+            f"{len(errors)} chunks failed"
+        )
+        if errors and len(errors) == len(chunks):
+            raise errors[0]
+        return CategorizeReport(categorized, unanswered, errored)
 
-            client = self._create_client(provider)
+    async def categorize_chunk_async(
+        self, transaction_descriptions: List[str]
+    ) -> List[dict]:
+        logging.info(
+            f"[HF API Call] Request transaction_descriptions: {transaction_descriptions}"
+        )
+        messages = self._build_messages(transaction_descriptions)
+        tried_providers: List[str] = []
+        last_error: Optional[Exception] = None
 
+        for attempt in range(self.max_attempts):
+            provider = None
             try:
-                response = client.chat_completion(
+                provider, structured_data = await self.pool.hedged_request(
+                    exclude=tuple(tried_providers),
                     messages=messages,
                     response_format=self.response_format,
                     model=self.model_name,
                 )
-
-                structured_data = response.choices[0].message.content
                 logging.info(
-                    f"[HF API Call] Response structured_data: {structured_data}"
+                    f"[HF API Call] Attempt {attempt + 1}, {provider} structured_data: {structured_data}"
+                )
+                return self._parse_response(structured_data, transaction_descriptions)
+
+            except ProviderUnavailable as e:
+                logging.warning(
+                    f"Provider {e.provider} failed: {e.cause!r}, retrying..."
                 )
-                trans_category_list = json.loads(structured_data)["trans_category_list"]
-
-                return trans_category_list
-
-            except HfHubHTTPError as e:
-                if 500 <= e.status_code < 600:
-                    logging.warning(
-                        f"Provider {provider} failed with {e.status_code}, retrying..."
-                    )
-                    continue
-                else:
-                    logging.error(
-                        f"Provider {provider} failed with {e.status_code}: {e}"
-                    )
-                    raise
+                tried_providers.append(e.provider)
+                last_error = e
+                continue
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                # Truncated or malformed structured output, ask again
+                logging.warning(f"Provider {provider} returned invalid JSON: {e!r}")
+                last_error = e
+                continue
 
         raise RuntimeError(
-            f"Failed to categorize transactions after {max_attempts} attempts."
-        )
+            f"Failed to categorize transactions after {self.max_attempts} attempts."
+        ) from last_error
+
+
+_default_categorizer: Optional[HFTransactionCategorizer] = None
+_default_categorizer_lock = threading.Lock()
+
+
+def get_categorizer() -> HFTransactionCategorizer:
+    """Process-wide HFTransactionCategorizer on the shared provider pool."""
+    global _default_categorizer
+    with _default_categorizer_lock:
+        if _default_categorizer is None:
+            _default_categorizer = HFTransactionCategorizer()
+    return _default_categorizer
@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from huggingface_hub import InferenceClient, InferenceTimeoutError
+from huggingface_hub.utils import HfHubHTTPError
+
+from src.core import config
+from src.services.categorizers.fake_provider import FakeInferenceClient
+
+# Latency samples kept per provider, and needed before its p95 is trusted
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+class ProviderUnavailable(Exception):
+    """Retryable provider failure: 5xx, timeout or connection error."""
+
+    def __init__(self, provider: str, cause: BaseException):
+        super().__init__(f"{provider}: {cause!r}")
+        self.provider = provider
+        self.cause = cause
+
+
+class ProviderStats:
+    """
+    Latency window and circuit breaker of one inference provider.
+
+    The breaker opens after LLM_BREAKER_FAILURE_THRESHOLD consecutive retryable
+    failures and stays open for LLM_BREAKER_COOLDOWN_SECONDS. After that one
+    trial request is let through (half-open): success closes the breaker,
+    failure opens it again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this provider before hedging: p95, or the default."""
+        return self.percentile(0.95) or config.LLM_HEDGE_DELAY_SECONDS
+
+    def is_open(self, now: float) -> bool:
+        return self.consecutive_failures >= config.LLM_BREAKER_FAILURE_THRESHOLD and (
+            now < self.open_until or self.trial_in_flight
+        )
+
+    def on_start(self, now: float) -> None:
+        with self._lock:
+            if self.consecutive_failures >= config.LLM_BREAKER_FAILURE_THRESHOLD:
+                self.trial_in_flight = True
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+
+    def record_slow(self, latency: float) -> None:
+        """A request abandoned for a faster hedge, latency is a lower bound."""
+        with self._lock:
+            self.latencies.append(latency)
+            self.trial_in_flight = False
+
+    def record_rejected(self) -> None:
+        """
+        A request the provider refused (4xx) or that failed in our code: says
+        nothing about its health or speed, only ends a half-open trial.
+        """
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.trial_in_flight = False
+            if self.consecutive_failures >= config.LLM_BREAKER_FAILURE_THRESHOLD:
+                self.open_until = time.monotonic() + config.LLM_BREAKER_COOLDOWN_SECONDS
+                logging.warning(
+                    f"[ProviderPool] circuit open for {self.name} after "
+                    f"{self.consecutive_failures} failures"
+                )
+
+
+class ProviderPool:
+    """
+    Long-lived InferenceClient per provider, shared by every categorization of
+    the process.
+
+    Calls run on a dedicated thread pool: the sync client keeps a keep-alive
+    requests session per thread, so connections are reused across calls and
+    across event loops (the async client opens a new aiohttp session per call).
+    A call can't be interrupted once its thread runs: a cancelled hedge keeps
+    its thread until the client's LLM_REQUEST_TIMEOUT_SECONDS, so hedges are
+    only sent while a thread is free.
+    """
+
+    def __init__(self, providers: List[str], max_workers: int):
+        self.providers = list(providers)
+        self.stats = {p: ProviderStats(p) for p in self.providers}
+        self.clients: Dict[str, InferenceClient] = {
+            p: self._create_client(p) for p in self.providers
+        }
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="llm"
+        )
+        # Calls submitted to the executor and not finished, abandoned ones too
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    @staticmethod
+    def _create_client(provider: str) -> InferenceClient:
+        if provider.startswith("fake"):
+            # Offline stand-in, see fake_provider.py
+            return FakeInferenceClient(provider)
+        return InferenceClient(
+            api_key=os.getenv("HF_TOKEN", ""),
+            provider=provider,
+            timeout=config.LLM_REQUEST_TIMEOUT_SECONDS,
+        )
+
+    def pick(self, exclude: Tuple[str, ...] = ()) -> Optional[str]:
+        """
+        Fastest provider (p50) whose circuit is closed, providers without enough
+        samples first so they get measured. None when every candidate is open.
+        """
+        now = time.monotonic()
+        candidates = [
+            p
+            for p in self.providers
+            if p not in exclude and not self.stats[p].is_open(now)
+        ]
+        if not candidates:
+            return None
+        random.shuffle(candidates)
+        return min(candidates, key=lambda p: self.stats[p].percentile(0.5) or 0.0)
+
+    def pick_any(self, exclude: Tuple[str, ...] = ()) -> str:
+        """pick, falling back to the provider whose circuit closes first."""
+        provider = self.pick(exclude) or self.pick()
+        if provider is None:
+            provider = min(self.providers, key=lambda p: self.stats[p].open_until)
+            logging.warning(
+                f"[ProviderPool] all circuits open, trying {provider} anyway"
+            )
+        return provider
+
+    def has_free_worker(self) -> bool:
+        with self._in_flight_lock:
+            return self._in_flight < self.max_workers
+
+    def _submit(self, provider: str, kwargs: dict) -> Future:
+        future = self.executor.submit(
+            partial(self.clients[provider].chat_completion, **kwargs)
+        )
+        with self._in_flight_lock:
+            self._in_flight += 1
+        future.add_done_callback(self._on_call_done)
+        return future
+
+    def _on_call_done(self, _future: Future) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    async def request(self, provider: str, **kwargs) -> str:
+        """One chat_completion on provider, return the message content."""
+        stats = self.stats[provider]
+        started = time.monotonic()
+        stats.on_start(started)
+        try:
+            response = await asyncio.wait_for(
+                asyncio.wrap_future(self._submit(provider, kwargs)),
+                config.LLM_REQUEST_TIMEOUT_SECONDS,
+            )
+        except asyncio.CancelledError:
+            stats.record_slow(time.monotonic() - started)
+            raise
+        except HfHubHTTPError as e:
+            status = e.response.status_code if e.response is not None else 0
+            if 500 <= status < 600:
+                stats.record_failure()
+                raise ProviderUnavailable(provider, e) from e
+            stats.record_rejected()
+            logging.error(f"Provider {provider} failed with {status}: {e}")
+            raise
+        except (
+            asyncio.TimeoutError,
+            InferenceTimeoutError,
+            requests.ConnectionError,
+            requests.Timeout,
+        ) as e:
+            stats.record_failure()
+            raise ProviderUnavailable(provider, e) from e
+        except Exception:
+            stats.record_rejected()
+            raise
+
+        stats.record_success(time.monotonic() - started)
+        return response.choices[0].message.content
+
+    async def hedged_request(
+        self, exclude: Tuple[str, ...] = (), **kwargs
+    ) -> Tuple[str, str]:
+        """
+        Send the request to the best provider. When it has not answered after its
+        p95 latency, send the same request to the next best provider too and keep
+        whichever answers first. Return (provider, content).
+        """
+        primary = self.pick_any(exclude)
+        tasks = {asyncio.ensure_future(self.request(primary, **kwargs)): primary}
+
+        delay = self.stats[primary].hedge_delay()
+        if delay > 0:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            backup = self.pick(exclude=exclude + (primary,))
+            if not done and backup is not None and not self.has_free_worker():
+                # Every thread is busy, abandoned hedges included
+                logging.info(
+                    f"[ProviderPool] {primary} slower than {delay:.2f}s, no thread free to hedge"
+                )
+            elif not done and backup is not None:
+                logging.info(
+                    f"[ProviderPool] {primary} slower than {delay:.2f}s, hedging with {backup}"
+                )
+                tasks[asyncio.ensure_future(self.request(backup, **kwargs))] = backup
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return tasks[task], task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+
+_default_pool: Optional[ProviderPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_provider_pool() -> ProviderPool:
+    """Process-wide ProviderPool over LLM_PROVIDERS."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ProviderPool(
+                config.LLM_PROVIDERS,
+                # Room for one hedge per request in flight
+                max_workers=2 * config.LLM_MAX_CONCURRENCY,
+            )
+    return _default_pool
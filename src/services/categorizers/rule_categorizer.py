@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.core import config
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "keyword_rules.json")
+
+
+class KeywordRule(NamedTuple):
+    category_id: int
+    category_name: str
+    # The keyword or regex the rule was built from, kept as note for debugging
+    source: str
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isascii() and (c.isalnum() or c == "_")
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a fixed set of keywords.
+    A scan is linear in the text length plus the number of matches, whatever
+    the number of keywords.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Keyword indexes ending at each node, fail chain included
+        self._out: List[List[int]] = [[]]
+
+        for keyword in keywords:
+            self._add(keyword)
+        self._build_fail_links()
+
+    def _add(self, keyword: str) -> None:
+        node = 0
+        for c in keyword:
+            nxt = self._goto[node].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(len(self.keywords))
+        self.keywords.append(keyword)
+
+    def _build_fail_links(self) -> None:
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for c, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and c not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(c, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int]]:
+        """Yield (start, keyword index) of every keyword occurrence in text."""
+        node = 0
+        for end, c in enumerate(text, start=1):
+            while node and c not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(c, 0)
+            for idx in self._out[node]:
+                yield end - len(self.keywords[idx]), idx
+
+
+class RuleCategorizer:
+    """
+    Local categorizer from curated keyword and regex rules, tried before the LLM.
+
+    Keywords are matched case-insensitively on word boundaries (for ASCII
+    letters and digits, so CJK keywords match anywhere). The longest matching
+    keyword wins, ties go to the rule listed first. Regex patterns are only
+    tried when no keyword matched, all of them in a single combined search.
+    """
+
+    def __init__(self, rule_groups: List[dict]):
+        keywords: List[str] = []
+        patterns: List[str] = []
+        self._keyword_rules: List[KeywordRule] = []
+        self._pattern_rules: List[KeywordRule] = []
+
+        for group in rule_groups:
+            category_id = int(group["category_id"])
+            category_name = group["category_name"]
+            for keyword in group.get("keywords", []):
+                keywords.append(keyword.upper())
+                self._keyword_rules.append(
+                    KeywordRule(category_id, category_name, keyword)
+                )
+            for pattern in group.get("patterns", []):
+                patterns.append(pattern)
+                self._pattern_rules.append(
+                    KeywordRule(category_id, category_name, pattern)
+                )
+
+        self.matcher = AhoCorasick(keywords)
+        self.pattern = (
+            re.compile(
+                "|".join(f"(?P<r{i}>{p})" for i, p in enumerate(patterns)),
+                re.IGNORECASE,
+            )
+            if patterns
+            else None
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleCategorizer":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self._keyword_rules) + len(self._pattern_rules)
+
+    def match(self, desc: str) -> Optional[KeywordRule]:
+        text = desc.upper()
+        best: Optional[Tuple[int, int]] = None  # (-length, rule index)
+        for start, idx in self.matcher.iter_matches(text):
+            keyword = self.matcher.keywords[idx]
+            end = start + len(keyword)
+            if _is_word_char(keyword[0]) and start and _is_word_char(text[start - 1]):
+                continue
+            if (
+                _is_word_char(keyword[-1])
+                and end < len(text)
+                and _is_word_char(text[end])
+            ):
+                continue
+            if best is None or (-len(keyword), idx) < best:
+                best = (-len(keyword), idx)
+        if best is not None:
+            return self._keyword_rules[best[1]]
+
+        if self.pattern is not None:
+            m = self.pattern.search(text)
+            if m:
+                return self._pattern_rules[int(m.lastgroup[1:])]
+        return None
+
+    def categorize(self, transaction_descriptions: Iterable[str]) -> List[dict]:
+        """
+        Same result shape as HFTransactionCategorizer.categorize, for the
+        descriptions a rule matched only.
+        """
+        results = []
+        for desc in transaction_descriptions:
+            rule = self.match(desc)
+            if rule is not None:
+                results.append(
+                    {
+                        "norm_desc": desc,
+                        "category_id": rule.category_id,
+                        "category_name": rule.category_name,
+                        "note": f"rule: {rule.source}",
+                    }
+                )
+        return results
+
+
+_default_categorizer: Optional[RuleCategorizer] = None
+
+
+def get_rule_categorizer() -> RuleCategorizer:
+    """Process-wide RuleCategorizer, loaded from KEYWORD_RULES_PATH on first use."""
+    global _default_categorizer
+    if _default_categorizer is None:
+        path = config.KEYWORD_RULES_PATH or DEFAULT_RULES_PATH
+        _default_categorizer = RuleCategorizer.from_file(path)
+        logging.info(
+            f"[RuleCategorizer] loaded {len(_default_categorizer)} rules from {path}"
+        )
+    return _default_categorizer
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import math
+import threading
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core import config
+from src.crud.global_rule_crud import (
+    GlobalRuleHit,
+    RuleChangeWatermark,
+    get_global_rules_changed_since,
+    get_global_rules_changed_since_async,
+)
+
+NGRAM_SIZE = 3
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> Set[str]:
+    """Character n-grams of a description, padded so short words still count."""
+    padded = f" {text.strip().upper()} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+class SimilarRule(NamedTuple):
+    norm_desc: str
+    hit: GlobalRuleHit
+    score: float
+
+
+class SimilarRuleIndex:
+    """
+    Inverted index of character trigrams over global_rules.norm_desc, used to
+    reuse the category of a near-duplicate description instead of asking the LLM.
+
+    Similarity is the Jaccard index of the trigram sets. Lookups only walk the
+    postings of the query's rarest trigrams (prefix filtering): a description
+    reaching the threshold must share at least two of them (one for the
+    shortest queries).
+
+    Trigrams are interned to int ids: the ids of every rule sit back to back in
+    one uint32 array and the postings are uint32 arrays, 8 bytes per trigram of
+    a rule instead of Python objects, and candidates are verified with NumPy.
+    See benchmarks/bench_similar_index.py.
+    """
+
+    def __init__(self):
+        self._descs: List[str] = []
+        self._hits: List[GlobalRuleHit] = []
+        # One shared GlobalRuleHit per (category_id, category_name)
+        self._hit_pool: Dict[GlobalRuleHit, GlobalRuleHit] = {}
+        self._by_desc: Dict[str, int] = {}
+        self._gram_ids: Dict[str, int] = {}
+        # Trigram ids of rule i: _grams[_offsets[i]:_offsets[i + 1]]
+        self._grams = array("I")
+        self._offsets = array("Q", [0])
+        self._lengths = array("I")
+        # Gram id -> the rules having it
+        self._postings: List[array] = []
+        # Held while adding, and while a lookup has NumPy views of the arrays
+        # (appending to an array with a view raises BufferError)
+        self._lock = threading.Lock()
+        self._refresh_lock = asyncio.Lock()
+        # refresh() picks up the rules created or changed since the last one
+        self.watermark = RuleChangeWatermark()
+
+    def __len__(self) -> int:
+        return len(self._descs)
+
+    def _gram_id(self, gram: str) -> int:
+        gram_id = self._gram_ids.get(gram)
+        if gram_id is None:
+            gram_id = self._gram_ids[gram] = len(self._postings)
+            self._postings.append(array("I"))
+        return gram_id
+
+    def add(self, norm_desc: str, hit: GlobalRuleHit) -> None:
+        """Index a description, or replace the category of an indexed one."""
+        with self._lock:
+            hit = self._hit_pool.setdefault(hit, hit)
+            entry = self._by_desc.get(norm_desc)
+            if entry is not None:
+                self._hits[entry] = hit
+                return
+            entry = len(self._descs)
+            gram_ids = [self._gram_id(gram) for gram in char_ngrams(norm_desc)]
+            self._descs.append(norm_desc)
+            self._hits.append(hit)
+            self._by_desc[norm_desc] = entry
+            self._grams.extend(gram_ids)
+            self._offsets.append(len(self._grams))
+            self._lengths.append(len(gram_ids))
+            for gram_id in gram_ids:
+                self._postings[gram_id].append(entry)
+
+    def add_many(self, rules: Iterable[Tuple[str, GlobalRuleHit]]) -> None:
+        for norm_desc, hit in rules:
+            self.add(norm_desc, hit)
+
+    def lookup(
+        self, desc: str, threshold: Optional[float] = None
+    ) -> Optional[SimilarRule]:
+        """Most similar indexed description with Jaccard >= threshold, or None."""
+        if threshold is None:
+            threshold = config.SIMILAR_RULE_THRESHOLD
+        entry = self._by_desc.get(desc)
+        if entry is not None:
+            return SimilarRule(desc, self._hits[entry], 1.0)
+
+        query = char_ngrams(desc)
+        q_len = len(query)
+        min_len = math.ceil(threshold * q_len)
+        max_len = math.floor(q_len / threshold) if threshold > 0 else math.inf
+
+        with self._lock:
+            known = [self._gram_ids[g] for g in query if g in self._gram_ids]
+            # A match shares at least min_len grams with the query, so at least
+            # `shared` of its prefix_len rarest ones. The grams no rule has are
+            # the rarest of all and match nothing.
+            shared = 2 if min_len >= 2 else 1
+            prefix_len = q_len - min_len + shared - (q_len - len(known))
+            if prefix_len < shared:
+                return None
+            known.sort(key=lambda g: len(self._postings[g]))
+            candidates = np.concatenate(
+                [
+                    np.frombuffer(self._postings[g], dtype=np.uint32)
+                    for g in known[:prefix_len]
+                ]
+            )
+            candidates, counts = np.unique(candidates, return_counts=True)
+            candidates = candidates[counts >= shared]
+
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)[candidates]
+            candidates = candidates[(lengths >= min_len) & (lengths <= max_len)]
+            if not len(candidates):
+                return None
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)[candidates]
+            lengths = lengths.astype(np.int64)
+            starts = np.frombuffer(self._offsets, dtype=np.uint64)[candidates]
+            starts = starts.astype(np.int64)
+
+            # Trigram ids of all the candidates back to back, overlap per candidate
+            ends = np.cumsum(lengths)
+            firsts = ends - lengths
+            positions = np.arange(ends[-1]) + np.repeat(starts - firsts, lengths)
+            grams = np.frombuffer(self._grams, dtype=np.uint32)[positions]
+            in_query = np.zeros(len(self._postings), dtype=np.int64)
+            in_query[known] = 1
+            overlap = np.add.reduceat(in_query[grams], firsts)
+
+        scores = overlap / (q_len + lengths - overlap)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        entry = int(candidates[best])
+        return SimilarRule(self._descs[entry], self._hits[entry], float(scores[best]))
+
+    def lookup_many(
+        self, descs: Iterable[str], threshold: Optional[float] = None
+    ) -> Dict[str, SimilarRule]:
+        results = {}
+        for desc in descs:
+            similar = self.lookup(desc, threshold)
+            if similar is not None:
+                results[desc] = similar
+        return results
+
+    def _load(self, rows) -> int:
+        loaded = 0
+        for norm_desc, category_id, category_name, updated_at in rows:
+            self.add(norm_desc, GlobalRuleHit(category_id, category_name))
+            self.watermark.advance(updated_at)
+            loaded += 1
+        if loaded:
+            logging.info(
+                f"[SimilarRuleIndex] indexed {loaded} new or changed rules, {len(self)} in total"
+            )
+        return loaded
+
+    def refresh(self, db: Session) -> int:
+        """Index the global rules created or changed since the last refresh (all on first call)."""
+        return self._load(get_global_rules_changed_since(db, self.watermark.since()))
+
+    async def refresh_async(self, db: AsyncSession) -> int:
+        """
+        Async version of refresh. Indexing runs in a worker thread, the first
+        refresh indexes the whole table.
+        """
+        async with self._refresh_lock:
+            rows = await get_global_rules_changed_since_async(
+                db, self.watermark.since()
+            )
+            return await asyncio.to_thread(self._load, rows)
+
+
+# Process-wide index, built when a worker process starts (see parse_executor)
+# and refreshed incrementally at the start of every chunk
+similar_rule_index = SimilarRuleIndex()
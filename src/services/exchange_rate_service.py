@@ -1,15 +1,19 @@
 from datetime import datetime, timezone, date
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Tuple, Set, List, Sequence, Optional
+from typing import Dict, FrozenSet, Tuple, Set, List, Sequence, Optional
 
-from black.trans import defaultdict
+from collections import defaultdict
+
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.crud.exchange_rates_crud import (
     get_best_rate_date,
+    get_best_rates_for_dates,
     get_rates_by_date,
-    upsert_rates_for_day,
+    upsert_rates,
 )
-from src.models.exchange_rate import ExchangeRate
+from src.helpers.money import RATE_SCALE, convert_minor_units, to_scaled_rate
+from src.services.fx_rate_store import fx_rate_store
 
 
 class ExchangeRateService:
@@ -39,39 +43,58 @@ class ExchangeRateService:
         if from_cur == to_cur:
             return amounts, tx_date
 
-        # Quotes that need to be converted
-        required_quotes: Set[str] = set()
-        if from_cur != cls.BASE_CURRENCY:
-            required_quotes.add(from_cur)
-        if to_cur != cls.BASE_CURRENCY:
-            required_quotes.add(to_cur)
-
-        # Find the rate date that can be used
-        rate_date = await get_best_rate_date(
-            db,
-            tx_date=tx_date,
-            base_currency=cls.BASE_CURRENCY,
-            source=cls.SOURCE,
-            required_quotes=required_quotes,
+        required_quotes = cls.required_quotes(from_cur, to_cur)
+        rate_date, rates = await cls.resolve_rates(
+            db, tx_date=tx_date, required_quotes=required_quotes
         )
+        return cls.convert_amounts(amounts, from_cur, to_cur, rates), rate_date
 
-        # Fetch rates in that day
-        rates: Dict[str, ExchangeRate] = await get_rates_by_date(
-            db,
-            as_of_date=rate_date,
-            base_currency=cls.BASE_CURRENCY,
-            source=cls.SOURCE,
-            quote_currencies=required_quotes,
-        )
+    @classmethod
+    def required_quotes(cls, from_cur: str, to_cur: str) -> Set[str]:
+        """Quotes (against BASE_CURRENCY) needed to convert from_cur to to_cur."""
+        return {c for c in (from_cur, to_cur) if c != cls.BASE_CURRENCY}
 
-        # Safety check (should not fail if the get_best_rate_date is correct)
-        if len(rates) != len(required_quotes):
-            missing = required_quotes - set(rates.keys())
-            raise ValueError(
-                f"Missing FX rates for {sorted(missing)} "
-                f"on {rate_date} base={cls.BASE_CURRENCY}"
-            )
+    @classmethod
+    def convert_amounts(
+        cls,
+        amounts: List[int],  # minor units
+        from_cur: str,
+        to_cur: str,
+        rates: Dict[str, Decimal],  # quote -> rate against BASE_CURRENCY
+    ) -> List[int]:
+        """
+        Convert minor-unit amounts with the given rates, rounding half up.
+        Vectorized on int64 with the rates scaled to integers (see
+        convert_minor_units), amounts too large for it go through Decimal.
+        """
+        scaled = {q: to_scaled_rate(r) for q, r in rates.items()}
+        if from_cur == cls.BASE_CURRENCY:
+            multiplier, divisor = scaled[to_cur], RATE_SCALE
+        elif to_cur == cls.BASE_CURRENCY:
+            multiplier, divisor = RATE_SCALE, scaled[from_cur]
+        else:
+            multiplier, divisor = scaled[to_cur], scaled[from_cur]
+        if not amounts or not multiplier or not divisor:
+            # Rates with more than 8 decimals, or zero
+            return cls.convert_amounts_decimal(amounts, from_cur, to_cur, rates)
+
+        converted, ok = convert_minor_units(np.array(amounts), multiplier, divisor)
+        result = converted.tolist()
+        for i in np.flatnonzero(~ok).tolist():
+            result[i] = cls.convert_amounts_decimal(
+                [amounts[i]], from_cur, to_cur, rates
+            )[0]
+        return result
 
+    @classmethod
+    def convert_amounts_decimal(
+        cls,
+        amounts: List[int],  # minor units
+        from_cur: str,
+        to_cur: str,
+        rates: Dict[str, Decimal],  # quote -> rate against BASE_CURRENCY
+    ) -> List[int]:
+        """convert_amounts one Decimal at a time, the reference implementation."""
         converted_amounts = []
         for amount in amounts:
             if amount == 0:
@@ -83,25 +106,97 @@ class ExchangeRateService:
 
             if from_cur == cls.BASE_CURRENCY:
                 # USD -> to
-                rate_to = Decimal(rates[to_cur].rate)
+                rate_to = rates[to_cur]
                 result = amt * rate_to
 
             elif to_cur == cls.BASE_CURRENCY:
                 # from -> USD
-                rate_from = Decimal(rates[from_cur].rate)
+                rate_from = rates[from_cur]
                 result = amt / rate_from
 
             else:
                 # from -> USD -> to
-                rate_from = Decimal(rates[from_cur].rate)
-                rate_to = Decimal(rates[to_cur].rate)
+                rate_from = rates[from_cur]
+                rate_to = rates[to_cur]
                 result = amt * rate_to / rate_from
 
             # Rounding to minor units
             converted = int(result.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
             converted_amounts.append(converted)
 
-        return converted_amounts, rate_date
+        return converted_amounts
+
+    @classmethod
+    async def resolve_rates(
+        cls, db: AsyncSession, *, tx_date: date, required_quotes: Set[str]
+    ) -> Tuple[date, Dict[str, Decimal]]:
+        """
+        Rate date to use for tx_date (see get_best_rate_date) and the rates of
+        required_quotes on that day, from fx_rate_store once it is loaded.
+        """
+        if fx_rate_store.loaded:
+            rate_date = fx_rate_store.best_rate_date(
+                tx_date,
+                base_currency=cls.BASE_CURRENCY,
+                source=cls.SOURCE,
+                quotes=required_quotes,
+            )
+            rates = fx_rate_store.get_rates(
+                rate_date,
+                base_currency=cls.BASE_CURRENCY,
+                source=cls.SOURCE,
+                quotes=required_quotes,
+            )
+        else:
+            # Find the rate date that can be used
+            rate_date = await get_best_rate_date(
+                db,
+                tx_date=tx_date,
+                base_currency=cls.BASE_CURRENCY,
+                source=cls.SOURCE,
+                required_quotes=required_quotes,
+            )
+
+            # Fetch rates in that day
+            rows = await get_rates_by_date(
+                db,
+                as_of_date=rate_date,
+                base_currency=cls.BASE_CURRENCY,
+                source=cls.SOURCE,
+                quote_currencies=required_quotes,
+            )
+            rates = {quote: Decimal(row.rate) for quote, row in rows.items()}
+
+        # Safety check (should not fail if the get_best_rate_date is correct)
+        if len(rates) != len(required_quotes):
+            missing = required_quotes - set(rates.keys())
+            raise ValueError(
+                f"Missing FX rates for {sorted(missing)} "
+                f"on {rate_date} base={cls.BASE_CURRENCY}"
+            )
+        return rate_date, rates
+
+    @classmethod
+    async def resolve_many_rates(
+        cls, db: AsyncSession, *, requests: List[Tuple[date, FrozenSet[str]]]
+    ) -> Dict[Tuple[date, FrozenSet[str]], Tuple[date, Dict[str, Decimal]]]:
+        """
+        resolve_rates for many (tx_date, quotes) pairs: from fx_rate_store once
+        it is loaded, else with one query for all of them.
+        """
+        if not fx_rate_store.loaded:
+            return await get_best_rates_for_dates(
+                db,
+                requests=requests,
+                base_currency=cls.BASE_CURRENCY,
+                source=cls.SOURCE,
+            )
+        resolved = {}
+        for tx_date, quotes in set(requests):
+            resolved[(tx_date, quotes)] = await cls.resolve_rates(
+                db, tx_date=tx_date, required_quotes=set(quotes)
+            )
+        return resolved
 
     @classmethod
     async def convert_transaction_amounts(
@@ -127,22 +222,32 @@ class ExchangeRateService:
         rate_dates_used: list[Optional[date]] = [None] * n
 
         # tuple[from_currency, to_currency, tx_date] -> list[tuple[idx, amount]]
+        to_cur = display_currency.upper()
         buckets: dict[tuple[str, str, date], list[tuple[int, int]]] = defaultdict(list)
         for i, tx in enumerate(transactions):
             from_cur = tx.currency.upper()
             tx_date = tx.tx_date
-            buckets[(from_cur, display_currency, tx_date)].append((i, tx.amount))
+            buckets[(from_cur, to_cur, tx_date)].append((i, tx.amount))
+
+        # Rate date and rates of every bucket at once
+        resolved = await cls.resolve_many_rates(
+            db,
+            requests=[
+                (tx_date, frozenset(cls.required_quotes(from_cur, to_cur)))
+                for from_cur, to_cur, tx_date in buckets
+                if from_cur != to_cur
+            ],
+        )
 
         for (from_cur, to_cur, tx_date), idx_amount_list in buckets.items():
             amounts = [amount for _, amount in idx_amount_list]
 
-            converted, rate_date_used = await cls.convert(
-                db,
-                from_currency=from_cur,
-                to_currency=to_cur,
-                tx_date=tx_date,
-                amounts=amounts,
-            )
+            if from_cur == to_cur:
+                converted, rate_date_used = amounts, tx_date
+            else:
+                quotes = frozenset(cls.required_quotes(from_cur, to_cur))
+                rate_date_used, rates = resolved[(tx_date, quotes)]
+                converted = cls.convert_amounts(amounts, from_cur, to_cur, rates)
 
             for (idx, _), conv_amt in zip(idx_amount_list, converted, strict=True):
                 display_amounts[idx] = conv_amt
@@ -159,15 +264,31 @@ class ExchangeRateService:
         source: str,
         rates: Dict[str, Decimal],  # quote -> rate
     ) -> Tuple[int, int]:
-        as_of_date = datetime.fromtimestamp(timestamp, tz=timezone.utc).date()
-        source_ts = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-
-        return await upsert_rates_for_day(
+        return await self.write_snapshots(
             db,
-            as_of_date=as_of_date,
-            base_currency=base_currency,
+            snapshots=[(timestamp, base_currency, rates)],
             source=source,
-            source_ts=source_ts,
-            rates=rates,
-            epsilon=self.EPSILON,
         )
+
+    async def write_snapshots(
+        self,
+        db: AsyncSession,
+        *,
+        snapshots: Sequence[Tuple[int, str, Dict[str, Decimal]]],
+        source: str,
+    ) -> Tuple[int, int]:
+        """
+        Upsert (timestamp, base_currency, quote -> rate) snapshots, e.g. several
+        days of a backfill, with one statement. The UTC day of the timestamp is
+        the rate day. Return (inserted_count, updated_count)
+        """
+        rows = []
+        for timestamp, base_currency, rates in snapshots:
+            source_ts = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+            as_of_date = source_ts.date()
+            rows.extend(
+                (as_of_date, base_currency, quote, rate, source, source_ts)
+                for quote, rate in rates.items()
+            )
+
+        return await upsert_rates(db, rows, epsilon=self.EPSILON)
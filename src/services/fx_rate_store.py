@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date
+from decimal import Decimal
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import config
+from src.crud.exchange_rates_crud import (
+    FxRateNotFound,
+    get_rates_updated_since,
+)
+from src.helpers.watermark import UpdatedAtWatermark
+
+# Channel pull_exchange_rates notifies after writing rates
+FX_RATES_CHANNEL = "exchange_rates_updated"
+
+# (base_currency, source, quote_currency)
+RateKey = Tuple[str, str, str]
+
+
+class FxRateStore:
+    """
+    Process-wide copy of exchange_rates, so converting amounts needs no query.
+
+    Every (base, source, quote) keeps its rate days and rates in two sorted
+    arrays. The days covering a set of quotes (the intersection of their
+    arrays) are computed once per set and cached until the next refresh, so
+    "latest rate day <= tx_date with all these quotes" is one bisection.
+    """
+
+    def __init__(self):
+        self._dates: Dict[RateKey, List[date]] = {}
+        self._rates: Dict[RateKey, List[Decimal]] = {}
+        self._covering: Dict[Tuple[str, str, FrozenSet[str]], List[date]] = {}
+        # refresh() picks up the rates written since the last one
+        self.watermark = UpdatedAtWatermark(config.FX_RATE_SYNC_OVERLAP_SECONDS)
+        self.loaded = False
+        self._refresh_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(d) for d in self._dates.values())
+
+    def apply(self, rows: Iterable[tuple]) -> int:
+        """
+        Add or replace (as_of_date, base, quote, source, rate, updated_at) rows.
+        Return how many changed the store, rates already loaded don't count.
+        """
+        applied = 0
+        for as_of_date, base, quote, source, rate, updated_at in rows:
+            self.watermark.advance(updated_at)
+            key = (base, source, quote)
+            dates = self._dates.setdefault(key, [])
+            rates = self._rates.setdefault(key, [])
+            rate = Decimal(rate)
+            i = bisect_left(dates, as_of_date)
+            if i < len(dates) and dates[i] == as_of_date:
+                if rates[i] == rate:
+                    continue
+                rates[i] = rate
+            else:
+                dates.insert(i, as_of_date)
+                rates.insert(i, rate)
+            applied += 1
+        if applied:
+            self._covering.clear()
+        return applied
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Load the rates written since the last refresh (all on first call)."""
+        async with self._refresh_lock:
+            rows = await get_rates_updated_since(db, self.watermark.since())
+            applied = self.apply(rows)
+            self.loaded = True
+        if applied:
+            logging.info(
+                f"[{self.__class__.__name__}] loaded {applied} rates, {len(self)} in total"
+            )
+        return applied
+
+    def _covering_dates(
+        self, base: str, source: str, quotes: FrozenSet[str]
+    ) -> List[date]:
+        cache_key = (base, source, quotes)
+        dates = self._covering.get(cache_key)
+        if dates is None:
+            day_sets = [set(self._dates.get((base, source, q), ())) for q in quotes]
+            dates = sorted(set.intersection(*day_sets)) if day_sets else []
+            self._covering[cache_key] = dates
+        return dates
+
+    def best_rate_date(
+        self, tx_date: date, *, base_currency: str, source: str, quotes: Set[str]
+    ) -> date:
+        """Same rules as exchange_rates_crud.get_best_rate_date, without a query."""
+        quotes = frozenset(q.upper() for q in quotes if q)
+        if not quotes:
+            return tx_date
+
+        dates = self._covering_dates(base_currency, source, quotes)
+        if not dates:
+            raise FxRateNotFound(
+                f"No FX rate day found that covers quotes={sorted(quotes)} "
+                f"for base={base_currency} source={source}"
+            )
+        # Latest day <= tx_date, else the latest day overall
+        i = bisect_right(dates, tx_date)
+        return dates[i - 1] if i else dates[-1]
+
+    def get_rates(
+        self, as_of_date: date, *, base_currency: str, source: str, quotes: Set[str]
+    ) -> Dict[str, Decimal]:
+        """quote -> rate on as_of_date, quotes without a rate that day are left out."""
+        rates = {}
+        for quote in quotes:
+            key = (base_currency, source, quote.upper())
+            dates = self._dates.get(key, [])
+            i = bisect_left(dates, as_of_date)
+            if i < len(dates) and dates[i] == as_of_date:
+                rates[quote.upper()] = self._rates[key][i]
+        return rates
+
+
+# Loaded at API startup (see src/main.py), refreshed on FX_RATES_CHANNEL
+fx_rate_store = FxRateStore()
+
+
+async def listen_for_rate_updates(
+    store: FxRateStore, session_factory, dsn: str
+) -> None:
+    """
+    Refresh store whenever pull_exchange_rates notifies FX_RATES_CHANNEL.
+    Also refreshes after every (re)connect, to catch up on missed notifications.
+    Runs until cancelled.
+    """
+    while True:
+        updated = asyncio.Event()
+        conn = None
+        try:
+            conn = await asyncpg.connect(dsn)
+            await conn.add_listener(FX_RATES_CHANNEL, lambda *args: updated.set())
+            updated.set()
+            while not conn.is_closed():
+                try:
+                    await asyncio.wait_for(
+                        updated.wait(), config.FX_RATE_LISTEN_RETRY_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                updated.clear()
+                async with session_factory() as db:
+                    await store.refresh(db)
+        except Exception as e:
+            logging.warning(f"[FxRateStore] listening for rate updates failed: {e!r}")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(config.FX_RATE_LISTEN_RETRY_SECONDS)
@@ -0,0 +1,144 @@
+import logging
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from src.core import config
+from src.core.db import SessionLocal, AsyncSessionLocal
+from src.crud.transaction_crud import (
+    delete_transactions_by_statement_id,
+    delete_transactions_by_statement_id_async,
+)
+from src.services.categorizers.similar_rule_index import similar_rule_index
+from src.services.parsers.factory import get_parser
+
+
+def run_parse(
+    bank: str,
+    user_id: uuid.UUID,
+    stmt_id: int,
+    currency: str,
+    file_path: str,
+    clear_existing: bool = False,
+) -> None:
+    """
+    Entry point executed inside a worker process.
+    clear_existing drops rows saved by a previous, interrupted attempt first.
+    """
+    if clear_existing:
+        with SessionLocal() as db:
+            deleted = delete_transactions_by_statement_id(db, stmt_id)
+        logging.info(
+            f"[run_parse] statement_id={stmt_id}, cleared {deleted} transactions"
+        )
+
+    parser = get_parser(bank)
+    parser.parse(
+        user_id=user_id, stmt_id=stmt_id, currency=currency, file_path=file_path
+    )
+
+
+async def run_parse_async(
+    bank: str,
+    user_id: uuid.UUID,
+    stmt_id: int,
+    currency: str,
+    file_path: str,
+    clear_existing: bool = False,
+) -> None:
+    """Same as run_parse, on the event loop instead of a worker process."""
+    if clear_existing:
+        async with AsyncSessionLocal() as db:
+            deleted = await delete_transactions_by_statement_id_async(db, stmt_id)
+        logging.info(
+            f"[run_parse_async] statement_id={stmt_id}, cleared {deleted} transactions"
+        )
+
+    parser = get_parser(bank)
+    await parser.parse_async(
+        user_id=user_id, stmt_id=stmt_id, currency=currency, file_path=file_path
+    )
+
+
+def _init_worker() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    # Index the global rules now rather than in the first parse
+    if config.SIMILAR_RULE_THRESHOLD > 0:
+        try:
+            with SessionLocal() as db:
+                similar_rule_index.refresh(db)
+        except Exception:
+            # The first parse will try again
+            logging.exception("[ParseExecutor] indexing global rules failed")
+
+
+class ParseExecutor:
+    """
+    Runs statement parsing in a pool of worker processes, so CPU-heavy parses
+    are isolated from the process that schedules them.
+
+    Submissions are not bounded here, the caller caps them (StatementWorker
+    claims at most one job per worker process).
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._pool is None:
+                # spawn: workers must not inherit the API's db connections/threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def submit(
+        self,
+        *,
+        bank: str,
+        user_id: uuid.UUID,
+        stmt_id: int,
+        currency: str,
+        file_path: str,
+        clear_existing: bool = False,
+    ) -> Future:
+        self.start()
+        future = self._pool.submit(
+            run_parse, bank, user_id, stmt_id, currency, file_path, clear_existing
+        )
+        future.add_done_callback(
+            lambda f: self._on_done(f, stmt_id=stmt_id, user_id=user_id)
+        )
+        return future
+
+    def _on_done(self, future: Future, *, stmt_id: int, user_id: uuid.UUID) -> None:
+        if future.cancelled():
+            logging.warning(
+                "[ParseExecutor] cancelled: user_id=%s statement_id=%s",
+                str(user_id),
+                str(stmt_id),
+            )
+            return
+        exc = future.exception()
+        if exc is not None:
+            logging.error(
+                "[ParseExecutor] failed: user_id=%s statement_id=%s",
+                str(user_id),
+                str(stmt_id),
+                exc_info=exc,
+            )
@@ -1,104 +1,540 @@
+import asyncio
 import logging
 import uuid
+from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import pandas as pd
-from src.core.db import SessionLocal
-from src.schemas.transaction import TransactionCreate
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.core import config
+from src.core.db import SessionLocal, AsyncSessionLocal
 from src.schemas.global_rule import GlobalRuleCreate
+from src.services.parsers.dates import sniff_date_format
 from src.crud.global_rule_crud import (
-    get_global_rule_by_norm_desc,
+    GlobalRuleHit,
+    get_global_rules_by_norm_descs,
+    get_global_rules_by_norm_descs_async,
+    global_rule_cache,
     create_global_rules_batch,
+    create_global_rules_batch_async,
 )
-from src.crud.transaction_crud import create_transactions_batch
-from src.services.categorizers.llm_categorizer import HFTransactionCategorizer
+from src.crud.user_rule_crud import get_user_rules, get_user_rules_async
+from src.crud.transaction_crud import (
+    bulk_insert_transactions,
+    bulk_insert_transactions_async,
+)
+from src.crud.llm_categorize_result_crud import (
+    LLMResultHit,
+    get_fresh_llm_results,
+    get_fresh_llm_results_async,
+    mark_llm_results_skipped,
+    mark_llm_results_skipped_async,
+    record_llm_results,
+    record_llm_results_async,
+)
+from src.schemas.enums import LLMCategorizeStatus
+from src.services.categorizers.llm_categorizer import (
+    CategorizeReport,
+    estimate_item_tokens,
+    get_categorizer,
+)
+from src.services.categorizers.coalescer import get_coalescer
+from src.services.categorizers.rule_categorizer import get_rule_categorizer
+from src.services.categorizers.similar_rule_index import similar_rule_index
+
+
+class ChunkCategories:
+    """The categories found so far for the descriptions of one parsed chunk."""
+
+    def __init__(self, norm_descs: Set[str], category_map: Dict[str, int]):
+        self.norm_descs = norm_descs
+        # norm_desc -> category_id
+        self.category_map = category_map
+        self.uncategorized = norm_descs - category_map.keys()
+        # Rules to save for the descriptions no global rule had
+        self.new_global_rules: List[GlobalRuleCreate] = []
+
+    def categorize(self, categories: Dict[str, int]) -> None:
+        self.category_map.update(categories)
+        self.uncategorized -= categories.keys()
+
+    def add_global_rules(self, rules: List[GlobalRuleCreate]) -> None:
+        self.new_global_rules += rules
+        self.categorize({r.norm_desc: r.category_id for r in rules})
 
 
 class BaseBankParser:
-    def parse(self, user_id: uuid.UUID, stmt_id: int, currency: str, file_path: str):
-        # Read file
-        header = self.get_csv_header()
-        df = pd.read_csv(file_path, header=None if header else "infer", names=header)
-        df = df.fillna("")
-        raw_data = df.to_dict(orient="records")
+    # Use extract_transaction_columns when the subclass implements it,
+    # extract_transaction_fields (per row) otherwise
+    use_vectorized_extraction = True
+    # Column holding the transaction date, used to sniff the file's date format
+    date_column = "Date"
 
-        transactions = []
-        uncat_transactions = []
-        uncat_desc_set = set()
+    def parse(
+        self,
+        user_id: uuid.UUID,
+        stmt_id: int,
+        currency: str,
+        file_path: str,
+        chunk_size: Optional[int] = None,
+    ):
+        """
+        Parse, categorize and save a statement file.
+        The file is streamed in chunks of chunk_size rows (PARSE_CHUNK_SIZE by
+        default, 0 reads the whole file at once), each chunk is categorized and
+        committed before the next one is read.
+        """
+        if chunk_size is None:
+            chunk_size = config.PARSE_CHUNK_SIZE
 
+        parsed = 0
+        date_format = None
         with SessionLocal() as db:
-            for item in raw_data:
-                # Call subclass.extract_transaction_fields to extract columns
-                amount, formatted_date, norm_desc = self.extract_transaction_fields(
-                    item
+            user_rules = get_user_rules(db, user_id)
+            for df in self.read_csv_chunks(file_path, chunk_size):
+                # Settle the date format once per file, from the first chunk
+                date_format = date_format or self.sniff_date_format(df)
+                parsed += self.parse_chunk(
+                    db,
+                    df,
+                    user_id=user_id,
+                    stmt_id=stmt_id,
+                    currency=currency,
+                    date_format=date_format,
+                    user_rules=user_rules,
                 )
-                # TODO: Save income too
-                if amount is None or amount < 0:
-                    continue
 
-                amount_minor = int(
-                    (amount * Decimal("100")).quantize(
-                        Decimal("1"), rounding=ROUND_HALF_UP
-                    )
-                )
-                # 1. Check global rules
-                global_rule = get_global_rule_by_norm_desc(db, norm_desc)
-                if global_rule:
-                    transactions.append(
-                        TransactionCreate(
-                            user_id=user_id,
-                            tx_date=formatted_date,
-                            description=norm_desc,
-                            category_id=global_rule.category_id,
-                            amount=amount_minor,
-                            currency=currency,
-                            statement_id=stmt_id,
-                        )
-                    )
-                else:
-                    uncat_transactions.append(
-                        TransactionCreate(
-                            user_id=user_id,
-                            tx_date=formatted_date,
-                            description=norm_desc,
-                            category_id=0,
-                            amount=amount_minor,
-                            currency=currency,
-                            statement_id=stmt_id,
-                        )
-                    )
-                    uncat_desc_set.add(norm_desc)
-
-            # 2. Call LLM for uncategorized
-            failed_descs = []
-            if uncat_desc_set:
-                categorizer = HFTransactionCategorizer()
-                auto_category_list = categorizer.categorize(list(uncat_desc_set))
-
-                new_global_rules = [GlobalRuleCreate(**d) for d in auto_category_list]
-                trans_category_dict = {d["norm_desc"]: d for d in auto_category_list}
-
-                for t in uncat_transactions:
-                    if t.description in trans_category_dict:
-                        cat = trans_category_dict[t.description]
-                        t.category_id = cat["category_id"]
-                    else:
-                        failed_descs.append(t.description)
-
-                create_global_rules_batch(db, new_global_rules)
-                logging.info(
-                    f"[{self.__class__.__name__}] saved new global rules: {new_global_rules}"
+        logging.info(
+            f"[{self.__class__.__name__}] user_id={user_id}, parsed {parsed} transactions"
+        )
+
+    async def parse_async(
+        self,
+        user_id: uuid.UUID,
+        stmt_id: int,
+        currency: str,
+        file_path: str,
+        chunk_size: Optional[int] = None,
+    ):
+        """
+        Async version of parse on AsyncSession (asyncpg), sharing the API's pool.
+        CSV reading, extraction and the LLM call run in worker threads so the
+        event loop keeps serving other work.
+        """
+        if chunk_size is None:
+            chunk_size = config.PARSE_CHUNK_SIZE
+
+        parsed = 0
+        date_format = None
+        chunks = self.read_csv_chunks(file_path, chunk_size)
+        async with AsyncSessionLocal() as db:
+            user_rules = await get_user_rules_async(db, user_id)
+            while (df := await asyncio.to_thread(next, chunks, None)) is not None:
+                date_format = date_format or self.sniff_date_format(df)
+                parsed += await self.parse_chunk_async(
+                    db,
+                    df,
+                    user_id=user_id,
+                    stmt_id=stmt_id,
+                    currency=currency,
+                    date_format=date_format,
+                    user_rules=user_rules,
                 )
 
-            if failed_descs:
-                logging.error(f"LLM categorize failed: {failed_descs}")
+        logging.info(
+            f"[{self.__class__.__name__}] user_id={user_id}, parsed {parsed} transactions"
+        )
+
+    def parse_chunk(
+        self,
+        db: Session,
+        df: pd.DataFrame,
+        *,
+        user_id: uuid.UUID,
+        stmt_id: int,
+        currency: str,
+        date_format: Optional[str] = None,
+        user_rules: Optional[Dict[str, int]] = None,
+    ) -> int:
+        """
+        Categorize and save the transactions of one chunk, return the count saved.
+        user_rules (norm_desc -> category_id) are the user's own corrections.
+        Only the db and LLM calls are here, the steps between them are the
+        apply_* methods shared with parse_chunk_async.
+        """
+        rows = self.extract_rows(df, date_format)
+        # 1. The user's own corrections, over any shared rule
+        chunk = self.start_chunk(rows, user_rules or {})
+
+        # 2-3. Global rules, then the local keyword rules
+        self.apply_global_rules(
+            chunk, get_global_rules_by_norm_descs(db, chunk.uncategorized)
+        )
+
+        # 4. Reuse the category of near-duplicate global rules
+        if self.wants_similar_rules(chunk):
+            similar_rule_index.refresh(db)
+            self.apply_similar_rules(chunk)
+
+        # 5. Reuse recent LLM results, skip descriptions it recently failed on
+        if chunk.uncategorized:
+            llm_results = get_fresh_llm_results(db, chunk.uncategorized)
+            mark_llm_results_skipped(db, self.apply_llm_results(chunk, llm_results))
+
+        # 6. Call LLM for uncategorized
+        self.log_llm_usage(chunk.norm_descs, chunk.uncategorized)
+        if chunk.uncategorized:
+            llm_rules, unanswered = self.categorize_with_llm(chunk.uncategorized)
+            chunk.add_global_rules(llm_rules)
+            record_llm_results(db, llm_rules, unanswered)
+
+        if chunk.new_global_rules:
+            saved = create_global_rules_batch(db, chunk.new_global_rules)
+            self.log_saved_rules(chunk, saved)
+
+        # 7. Save all transactions, uncategorized ones with category 0
+        inserted = bulk_insert_transactions(
+            db, self.chunk_transaction_rows(rows, chunk, user_id, stmt_id, currency)
+        )
+        self.log_saved_chunk(user_id, inserted)
+        return inserted
+
+    async def parse_chunk_async(
+        self,
+        db: AsyncSession,
+        df: pd.DataFrame,
+        *,
+        user_id: uuid.UUID,
+        stmt_id: int,
+        currency: str,
+        date_format: Optional[str] = None,
+        user_rules: Optional[Dict[str, int]] = None,
+    ) -> int:
+        """Async version of parse_chunk."""
+        rows = await asyncio.to_thread(self.extract_rows, df, date_format)
+        chunk = self.start_chunk(rows, user_rules or {})
+
+        self.apply_global_rules(
+            chunk, await get_global_rules_by_norm_descs_async(db, chunk.uncategorized)
+        )
+
+        if self.wants_similar_rules(chunk):
+            await similar_rule_index.refresh_async(db)
+            self.apply_similar_rules(chunk)
+
+        if chunk.uncategorized:
+            llm_results = await get_fresh_llm_results_async(db, chunk.uncategorized)
+            await mark_llm_results_skipped_async(
+                db, self.apply_llm_results(chunk, llm_results)
+            )
+
+        self.log_llm_usage(chunk.norm_descs, chunk.uncategorized)
+        if chunk.uncategorized:
+            llm_rules, unanswered = await self.categorize_with_llm_async(
+                chunk.uncategorized
+            )
+            chunk.add_global_rules(llm_rules)
+            await record_llm_results_async(db, llm_rules, unanswered)
+
+        if chunk.new_global_rules:
+            saved = await create_global_rules_batch_async(db, chunk.new_global_rules)
+            self.log_saved_rules(chunk, saved)
+
+        inserted = await bulk_insert_transactions_async(
+            db, self.chunk_transaction_rows(rows, chunk, user_id, stmt_id, currency)
+        )
+        self.log_saved_chunk(user_id, inserted)
+        return inserted
+
+    def start_chunk(
+        self, rows: List[Tuple[date, str, int]], user_rules: Dict[str, int]
+    ) -> "ChunkCategories":
+        """Categories of the chunk's descriptions, from the user's rules first."""
+        norm_descs = {norm_desc for _, norm_desc, _ in rows}
+        return ChunkCategories(
+            norm_descs, self.categorize_with_user_rules(norm_descs, user_rules)
+        )
+
+    def apply_global_rules(
+        self, chunk: "ChunkCategories", global_rule_map: Dict[str, GlobalRuleHit]
+    ) -> None:
+        """
+        Categorize with the global rules found, then the local keyword rules
+        (learned and admin-corrected categories win over the generic keywords).
+        """
+        logging.info(
+            f"[{self.__class__.__name__}] global rule cache: {global_rule_cache.stats()}"
+        )
+        chunk.categorize({d: rule.category_id for d, rule in global_rule_map.items()})
+        chunk.categorize(self.categorize_with_rules(chunk.uncategorized))
+
+    @staticmethod
+    def wants_similar_rules(chunk: "ChunkCategories") -> bool:
+        return bool(chunk.uncategorized) and config.SIMILAR_RULE_THRESHOLD > 0
 
-            # 3. Save all transactions
-            transactions += uncat_transactions
-            create_transactions_batch(db, transactions)
+    def apply_similar_rules(self, chunk: "ChunkCategories") -> None:
+        """Categorize with near-duplicate global rules (similar_rule_index is fresh)."""
+        chunk.add_global_rules(self.categorize_with_similar_rules(chunk.uncategorized))
+
+    def apply_llm_results(
+        self, chunk: "ChunkCategories", llm_results: Dict[str, LLMResultHit]
+    ) -> Dict[str, int]:
+        """
+        Categorize with the recent LLM results, the descriptions they cover are
+        not sent to the LLM. Return norm_desc -> tokens saved of those, to mark
+        them skipped.
+        """
+        chunk.add_global_rules(self.reuse_llm_results(llm_results))
+        chunk.uncategorized -= llm_results.keys()
+        return self.estimate_llm_tokens(llm_results)
+
+    def log_saved_rules(self, chunk: "ChunkCategories", saved: int) -> None:
+        logging.info(
+            f"[{self.__class__.__name__}] saved {saved} new global rules "
+            f"({len(chunk.new_global_rules) - saved} already existed): {chunk.new_global_rules}"
+        )
+
+    def log_saved_chunk(self, user_id: uuid.UUID, inserted: int) -> None:
+        logging.info(
+            f"[{self.__class__.__name__}] user_id={user_id}, saved chunk of {inserted} transactions"
+        )
+
+    def chunk_transaction_rows(
+        self,
+        rows: List[Tuple[date, str, int]],
+        chunk: "ChunkCategories",
+        user_id: uuid.UUID,
+        stmt_id: int,
+        currency: str,
+    ) -> Iterator[tuple]:
+        return self.build_transaction_rows(
+            rows,
+            chunk.category_map,
+            user_id=user_id,
+            stmt_id=stmt_id,
+            currency=currency,
+        )
+
+    def extract_rows(
+        self, df: pd.DataFrame, date_format: Optional[str] = None
+    ) -> List[Tuple[date, str, int]]:
+        """Return (tx_date, norm_desc, amount_minor) of the expense rows of df."""
+        # TODO: Save income too
+        frame = self.extract_frame(df, date_format)
+        frame = frame[
+            frame["amount_minor"].notna() & (frame["amount_sign"].fillna(-1) >= 0)
+        ]
+        # Unparseable dates were already reported by parse_date_column
+        frame = frame[frame["tx_date"].notna()]
+        return list(
+            zip(
+                frame["tx_date"].tolist(),
+                frame["norm_desc"].tolist(),
+                frame["amount_minor"].astype("int64").tolist(),
+            )
+        )
+
+    def categorize_with_user_rules(
+        self, norm_descs: Set[str], user_rules: Dict[str, int]
+    ) -> Dict[str, int]:
+        """Categories the user picked before for these descriptions."""
+        matched = {d: user_rules[d] for d in norm_descs if d in user_rules}
+        logging.info(
+            f"[{self.__class__.__name__}] user rules matched {len(matched)}/{len(norm_descs)} descriptions"
+        )
+        return matched
+
+    def categorize_with_rules(self, norm_descs: Set[str]) -> Dict[str, int]:
+        """Categorize with the local keyword rules, return norm_desc -> category_id."""
+        matched = get_rule_categorizer().categorize(norm_descs)
+        logging.info(
+            f"[{self.__class__.__name__}] keyword rules matched {len(matched)}/{len(norm_descs)} descriptions"
+        )
+        return {d["norm_desc"]: d["category_id"] for d in matched}
+
+    def categorize_with_similar_rules(
+        self, norm_descs: Set[str]
+    ) -> List[GlobalRuleCreate]:
+        """Copy the category of the most similar existing global rule, if close enough."""
+        similar_rules = similar_rule_index.lookup_many(norm_descs)
+        logging.info(
+            f"[{self.__class__.__name__}] similar global rules matched {len(similar_rules)}/{len(norm_descs)} descriptions"
+        )
+        return [
+            GlobalRuleCreate(
+                norm_desc=desc,
+                category_id=similar.hit.category_id,
+                category_name=similar.hit.category_name,
+                note=f"similar to {similar.norm_desc!r} ({similar.score:.2f})",
+            )
+            for desc, similar in similar_rules.items()
+        ]
+
+    def reuse_llm_results(
+        self, llm_results: Dict[str, LLMResultHit]
+    ) -> List[GlobalRuleCreate]:
+        """
+        Turn cached LLM successes back into global rules (e.g. the rule was
+        removed since), known failures stay uncategorized until they expire.
+        """
+        failed = sorted(
+            d for d, r in llm_results.items() if r.status == LLMCategorizeStatus.FAILED
+        )
+        if failed:
             logging.info(
-                f"[{self.__class__.__name__}] user_id={user_id}, parsed {len(transactions)} transactions"
+                f"[{self.__class__.__name__}] skipped {len(failed)} descriptions the LLM failed on recently: {failed}"
+            )
+        return [
+            GlobalRuleCreate(
+                norm_desc=d,
+                category_id=r.category_id,
+                category_name=r.category_name,
+                note="cached LLM result",
+            )
+            for d, r in llm_results.items()
+            if r.status == LLMCategorizeStatus.SUCCEEDED
+        ]
+
+    @staticmethod
+    def estimate_llm_tokens(norm_descs: Iterable[str]) -> Dict[str, int]:
+        return {d: estimate_item_tokens(d) for d in norm_descs}
+
+    def log_llm_usage(self, norm_descs: Set[str], llm_descs: Set[str]) -> None:
+        """Log how many descriptions (and estimated tokens) go to the LLM or not."""
+        sent = sum(self.estimate_llm_tokens(llm_descs).values())
+        avoided = sum(self.estimate_llm_tokens(norm_descs - llm_descs).values())
+        logging.info(
+            f"[{self.__class__.__name__}] LLM: sending {len(llm_descs)} descriptions "
+            f"(~{sent} tokens), avoided {len(norm_descs) - len(llm_descs)} (~{avoided} tokens)"
+        )
+
+    def categorize_with_llm(
+        self, norm_descs: Set[str]
+    ) -> Tuple[List[GlobalRuleCreate], List[str]]:
+        """
+        Ask the LLM for categories. Return them as new global rules, along with
+        the descriptions the LLM answered without a category.
+        """
+        categorizer = get_categorizer()
+        report = categorizer.categorize_report(list(norm_descs))
+        return self._to_global_rules(report), report.unanswered
+
+    async def categorize_with_llm_async(
+        self, norm_descs: Set[str]
+    ) -> Tuple[List[GlobalRuleCreate], List[str]]:
+        """Async version of categorize_with_llm."""
+        if config.LLM_COALESCE_WINDOW_MS > 0:
+            # Batched with the other parses running on this event loop
+            report = await get_coalescer().categorize_report(list(norm_descs))
+        else:
+            report = await get_categorizer().categorize_report_async(list(norm_descs))
+        return self._to_global_rules(report), report.unanswered
+
+    @staticmethod
+    def _to_global_rules(report: CategorizeReport) -> List[GlobalRuleCreate]:
+        failed_descs = report.unanswered + report.errored
+        if failed_descs:
+            logging.error(f"LLM categorize failed: {sorted(failed_descs)}")
+
+        return [GlobalRuleCreate(**d) for d in report.categorized]
+
+    @staticmethod
+    def build_transaction_rows(
+        rows: List[Tuple[date, str, int]],
+        category_map: Dict[str, int],
+        *,
+        user_id: uuid.UUID,
+        stmt_id: int,
+        currency: str,
+    ) -> Iterator[tuple]:
+        """Rows in TRANSACTION_INSERT_COLUMNS order, unknown categories are 0."""
+        for tx_date, norm_desc, amount_minor in rows:
+            yield (
+                user_id,
+                tx_date,
+                amount_minor,
+                currency,
+                category_map.get(norm_desc, 0),
+                norm_desc,
+                stmt_id,
+            )
+
+    def read_csv(self, file_path: str, **kwargs):
+        # Read every cell as text so amounts keep their exact decimal digits
+        header = self.get_csv_header()
+        return pd.read_csv(
+            file_path,
+            header=None if header else "infer",
+            names=header,
+            dtype=str,
+            keep_default_na=False,
+            **kwargs,
+        )
+
+    def read_csv_chunks(
+        self, file_path: str, chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the file as frames of at most chunk_size rows (0: one frame)."""
+        if chunk_size <= 0:
+            yield self.read_csv(file_path)
+            return
+
+        with self.read_csv(file_path, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                yield chunk
+
+    def sniff_date_format(self, df: pd.DataFrame) -> Optional[str]:
+        """Guess the date format of a statement from a sample of its rows."""
+        if self.date_column not in df.columns:
+            return None
+        return sniff_date_format(df[self.date_column].unique())
+
+    def extract_frame(
+        self, df: pd.DataFrame, date_format: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Return a frame with columns tx_date, norm_desc, amount_minor (Int64, NA when
+        the row has no usable amount) and amount_sign (-1, 0, 1).
+        date_format is the file's sniffed date format, tried first for every row.
+        """
+        if self.use_vectorized_extraction:
+            try:
+                return self.extract_transaction_columns(df, date_format)
+            except NotImplementedError:
+                pass
+        return self._extract_frame_by_row(df)
+
+    def _extract_frame_by_row(self, df: pd.DataFrame) -> pd.DataFrame:
+        tx_dates, norm_descs, amounts_minor, amount_signs = [], [], [], []
+        for item in df.to_dict(orient="records"):
+            # Call subclass.extract_transaction_fields to extract columns
+            amount, formatted_date, norm_desc = self.extract_transaction_fields(item)
+            tx_dates.append(formatted_date)
+            norm_descs.append(norm_desc)
+            if amount is None:
+                amounts_minor.append(None)
+                amount_signs.append(None)
+                continue
+
+            amounts_minor.append(
+                int(
+                    (amount * Decimal("100")).quantize(
+                        Decimal("1"), rounding=ROUND_HALF_UP
+                    )
+                )
             )
+            amount_signs.append(-1 if amount < 0 else (1 if amount > 0 else 0))
+
+        return pd.DataFrame(
+            {
+                "tx_date": pd.Series(tx_dates, dtype=object),
+                "norm_desc": pd.Series(norm_descs, dtype=object),
+                "amount_minor": pd.array(amounts_minor, dtype="Int64"),
+                "amount_sign": pd.array(amount_signs, dtype="Int8"),
+            }
+        )
 
     def get_csv_header(self):
         """Get csv header from different banks."""
@@ -107,3 +543,12 @@ class BaseBankParser:
     def extract_transaction_fields(self, raw_item: dict):
         """Subclass must implement and return (amount, formatted_date, norm_desc)."""
         raise NotImplementedError
+
+    def extract_transaction_columns(
+        self, df: pd.DataFrame, date_format: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Optional column-wise version of extract_transaction_fields.
+        Must return the same frame as _extract_frame_by_row, see extract_frame.
+        """
+        raise NotImplementedError
@@ -1,8 +1,22 @@
+from typing import Optional
+
+import pandas as pd
+
 from .base import BaseBankParser
-from .utils import normalize_description, parse_date, first_non_empty
+from .utils import (
+    normalize_description,
+    parse_date,
+    first_non_empty,
+    amount_column_to_minor_units,
+    first_non_empty_column,
+    normalize_description_column,
+    parse_date_column,
+)
 
 import decimal
 
+_EMPTY_AMOUNTS = {"nan", "none", "null", "n/a", "-", "--"}
+
 
 class CMBBankParser(BaseBankParser):
     """
@@ -21,14 +35,7 @@ class CMBBankParser(BaseBankParser):
     def extract_transaction_fields(self, item: dict):
         # Amount
         raw_amount = first_non_empty(item, "Amount", "Transaction Amount")
-        if not raw_amount or raw_amount.lower() in {
-            "nan",
-            "none",
-            "null",
-            "n/a",
-            "-",
-            "--",
-        }:
+        if not raw_amount or raw_amount.lower() in _EMPTY_AMOUNTS:
             return None, None, None
 
         cleaned = (
@@ -65,3 +72,39 @@ class CMBBankParser(BaseBankParser):
         norm_desc = normalize_description(combined_desc)
 
         return system_amount, formatted_date, norm_desc
+
+    def extract_transaction_columns(
+        self, df: pd.DataFrame, date_format: Optional[str] = None
+    ) -> pd.DataFrame:
+        # Amount
+        raw_amount = first_non_empty_column(df, "Amount", "Transaction Amount")
+        is_empty = raw_amount.str.lower().isin(_EMPTY_AMOUNTS) | (raw_amount == "")
+
+        cleaned = raw_amount
+        for symbol in (",", "¥", "￥", "$"):
+            cleaned = cleaned.str.replace(symbol, "", regex=False)
+        cleaned = cleaned.str.strip()
+
+        # (123.45) -> -123.45
+        in_parens = cleaned.str.startswith("(") & cleaned.str.endswith(")")
+        cleaned = cleaned.mask(in_parens, "-" + cleaned.str[1:-1])
+
+        amounts = amount_column_to_minor_units(cleaned.mask(is_empty, ""))
+
+        # Description: Type + Counterparty
+        tx_type = first_non_empty_column(df, "Type", "Transaction Type")
+        if "Counterparty" in df.columns:
+            counterparty = df["Counterparty"].astype(str).str.strip()
+        else:
+            counterparty = pd.Series("", index=df.index)
+        combined_desc = (tx_type + " " + counterparty).str.strip()
+
+        return pd.DataFrame(
+            {
+                "tx_date": parse_date_column(df["Date"], date_format),
+                "norm_desc": normalize_description_column(combined_desc),
+                # Invert sign to match system convention
+                "amount_minor": -amounts["amount_minor"],
+                "amount_sign": -amounts["amount_sign"],
+            }
+        )
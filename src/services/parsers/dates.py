@@ -0,0 +1,132 @@
+import logging
+from typing import Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+# Candidate formats, in order of preference when several fit a sample equally
+# well: month-first before day-first since most statements are from Canadian banks.
+DATE_FORMATS = (
+    "%m/%d/%Y",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%Y/%m/%d",
+    "%Y%m%d",
+    "%Y.%m.%d",
+    "%Y年%m月%d日",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+)
+
+SNIFF_SAMPLE_SIZE = 200
+
+# How many bad values are quoted in the unparseable-rows warning
+_REPORT_LIMIT = 20
+
+
+def formats_to_try(
+    date_format: Optional[str], formats: Sequence[str] = DATE_FORMATS
+) -> List[str]:
+    """
+    date_format, then the year-first formats for the values it doesn't parse.
+    Those can't be misread, while trying e.g. %d/%m/%Y on a %m/%d/%Y file would
+    silently swap day and month of some rows.
+    """
+    order = [date_format] if date_format else []
+    return order + [f for f in formats if f != date_format and f.startswith("%Y")]
+
+
+def _to_dates(values: pd.Series, date_format: str) -> pd.Series:
+    return pd.to_datetime(values, format=date_format, errors="coerce")
+
+
+def rank_date_formats(
+    values: Iterable[str],
+    formats: Sequence[str] = DATE_FORMATS,
+    sample_size: int = SNIFF_SAMPLE_SIZE,
+) -> List[str]:
+    """
+    Rank formats by how many values of a sample they parse, best first.
+    Formats that parse nothing are left out, ties keep the order of formats.
+    """
+    sample = pd.Series(
+        [v.strip() for v in values if isinstance(v, str) and v.strip()],
+        dtype=object,
+    ).drop_duplicates()
+    if sample.empty:
+        return []
+    if len(sample) > sample_size:
+        # Spread the sample over the file instead of only looking at the top
+        sample = sample.iloc[:: len(sample) // sample_size + 1]
+
+    hits = [(int(_to_dates(sample, fmt).notna().sum()), fmt) for fmt in formats]
+    ranked = sorted(
+        ((n, i, fmt) for i, (n, fmt) in enumerate(hits) if n),
+        key=lambda t: (-t[0], t[1]),
+    )
+    return [fmt for _, _, fmt in ranked]
+
+
+def sniff_date_format(
+    values: Iterable[str],
+    formats: Sequence[str] = DATE_FORMATS,
+    sample_size: int = SNIFF_SAMPLE_SIZE,
+) -> Optional[str]:
+    """Return the format that parses most of a sample of values, or None."""
+    ranked = rank_date_formats(values, formats=formats, sample_size=sample_size)
+    return ranked[0] if ranked else None
+
+
+def parse_date_column(
+    dates: pd.Series,
+    date_format: Optional[str] = None,
+    formats: Sequence[str] = DATE_FORMATS,
+) -> pd.Series:
+    """
+    Convert a column of date strings to datetime.date objects.
+
+    Each distinct value is converted once, one vectorized pass per format:
+    date_format (sniffed from the column when not given) first, then the
+    year-first formats for whatever is left (see formats_to_try). Unparseable
+    values, including dates in another ambiguous format, become None and are
+    reported in a single warning.
+    """
+    stripped = dates.astype(str).str.strip()
+    distinct = pd.Series(stripped.unique(), dtype=object)
+
+    if date_format is None:
+        date_format = sniff_date_format(distinct, formats=formats)
+    order = formats_to_try(date_format, formats)
+
+    parsed = pd.Series(pd.NaT, index=distinct.index, dtype="datetime64[ns]")
+    for fmt in order:
+        missing = parsed.isna() & (distinct != "")
+        if not missing.any():
+            break
+        parsed[missing] = _to_dates(distinct[missing], fmt)
+
+    mapping = dict(
+        zip(
+            distinct,
+            [None if pd.isna(ts) else ts.date() for ts in parsed],
+        )
+    )
+    result = stripped.map(mapping)
+
+    invalid = result.isna()
+    if invalid.any():
+        report_unparseable_dates(stripped[invalid], date_format)
+    return result
+
+
+def report_unparseable_dates(values: pd.Series, date_format: Optional[str]) -> None:
+    """Log every unparseable date of a column in one warning."""
+    shown = ", ".join(
+        f"{idx}={value!r}" for idx, value in values.head(_REPORT_LIMIT).items()
+    )
+    more = (
+        f" (+{len(values) - _REPORT_LIMIT} more)" if len(values) > _REPORT_LIMIT else ""
+    )
+    logging.warning(
+        f"[parse_date_column] {len(values)} unparseable dates "
+        f"(sniffed format {date_format!r}), rows: {shown}{more}"
+    )
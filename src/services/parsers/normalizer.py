@@ -0,0 +1,105 @@
+import re
+from typing import Iterable, List, Optional
+
+from src.core import config
+from src.helpers.lru_cache import LRUCache
+
+
+class DescriptionNormalizer:
+    """
+    Clean transaction description noise.
+
+    Patterns are compiled once and results are memoized by raw description,
+    since the same merchants repeat a lot within and across statements.
+    """
+
+    # Descriptions containing one of these are collapsed to it
+    FIXED_DESCRIPTIONS = ("TFR-TO C/C", "SEND E-TFR")
+
+    # (pattern, replacement) applied in order
+    PATTERNS = (
+        # 0) Normalize spaces
+        (re.compile(r"\s+"), " "),
+        # 1) Remove ' #1234' anywhere
+        (re.compile(r"\s*#\d+\b"), ""),
+        # 2) Remove '/suffix' with letters+digits, e.g. '/G3ZGWU'
+        (
+            re.compile(r"/(?=[A-Za-z0-9]*[A-Za-z])(?=[A-Za-z0-9]*\d)[A-Za-z0-9]+$"),
+            "",
+        ),
+        # 3) Remove '*suffix' with letters+digits, e.g. '*NI3HV3DJ1'
+        (
+            re.compile(r"\*(?=[A-Za-z0-9]*[A-Za-z])(?=[A-Za-z0-9]*\d)[A-Za-z0-9]+$"),
+            "",
+        ),
+        # 4) Remove '******1234' (card numbers)
+        (re.compile(r"\*{2,}\d+$"), ""),
+        (re.compile(r"\*{2,}"), ""),
+        # 5) Remove '*digits', e.g. 'UPS*123456...'
+        (re.compile(r"\*\d+$"), ""),
+        # 6) Remove trailing pure digits
+        (re.compile(r"\s+\d+$"), ""),
+        # 7) Remove common transaction network / suffix identifiers
+        (
+            re.compile(
+                r"\s*_(V|M|MC|AX|AMEX|DS|DISC|P|I|WD|DEP|TFR|BP|INT)$", re.IGNORECASE
+            ),
+            "",
+        ),
+        # 8) Remove reference codes made of alternating letters and digits
+        (
+            re.compile(r"\b(?:[A-Za-z]\d){3,}[A-Za-z]?\b|\b(?:\d[A-Za-z]){3,}\d?\b"),
+            "",
+        ),
+    )
+
+    def __init__(self, cache_size: int = 50000):
+        self.cache: LRUCache[str, str] = LRUCache(maxsize=cache_size)
+
+    def normalize(self, desc: Optional[str]) -> str:
+        key = desc or ""
+        norm_desc = self.cache.get(key)
+        if norm_desc is None:
+            norm_desc = self._normalize(key)
+            self.cache.set(key, norm_desc)
+        return norm_desc
+
+    def normalize_many(self, descs: Iterable[Optional[str]]) -> List[str]:
+        """
+        Normalize a batch of descriptions, returned in input order.
+        Each distinct description is looked up / normalized only once.
+        """
+        keys = [desc or "" for desc in descs]
+        distinct = set(keys)
+
+        results = self.cache.get_many(distinct)
+        missing = {key: self._normalize(key) for key in distinct - results.keys()}
+        if missing:
+            self.cache.set_many(missing.items())
+            results.update(missing)
+
+        return [results[key] for key in keys]
+
+    def _normalize(self, desc: str) -> str:
+        text = desc.strip()
+
+        for fixed in self.FIXED_DESCRIPTIONS:
+            if fixed in text:
+                return fixed
+
+        for pattern, replacement in self.PATTERNS:
+            text = pattern.sub(replacement, text)
+
+        # Convert to uppercase
+        return text.strip().upper()
+
+
+default_normalizer = DescriptionNormalizer(cache_size=config.NORMALIZE_CACHE_SIZE)
+
+
+def normalize_description(desc: Optional[str]) -> str:
+    return default_normalizer.normalize(desc)
+
+
+def normalize_many(descs: Iterable[Optional[str]]) -> List[str]:
+    return default_normalizer.normalize_many(descs)
@@ -1,5 +1,15 @@
+from typing import Optional
+
+import pandas as pd
+
 from .base import BaseBankParser
-from .utils import normalize_description, parse_date
+from .utils import (
+    normalize_description,
+    parse_date,
+    amount_column_to_minor_units,
+    normalize_description_column,
+    parse_date_column,
+)
 
 import decimal
 
@@ -16,7 +26,10 @@ class RogersBankParser(BaseBankParser):
             return None, None, None
 
         cleaned = raw_amount.replace("$", "").replace(",", "")
-        amount = decimal.Decimal(cleaned)
+        try:
+            amount = decimal.Decimal(cleaned)
+        except decimal.InvalidOperation:
+            return None, None, None
 
         # Date
         formatted_date = parse_date(date_str=item["Date"])
@@ -24,3 +37,23 @@ class RogersBankParser(BaseBankParser):
         # Normalized description
         norm_desc = normalize_description(item["Merchant Name"])
         return amount, formatted_date, norm_desc
+
+    def extract_transaction_columns(
+        self, df: pd.DataFrame, date_format: Optional[str] = None
+    ) -> pd.DataFrame:
+        # Amount, credits are written as (123.45) and skipped
+        raw_amount = df["Amount"].astype(str).str.strip()
+        is_credit = raw_amount.str.startswith("(") & raw_amount.str.endswith(")")
+        cleaned = raw_amount.str.replace("$", "", regex=False).str.replace(
+            ",", "", regex=False
+        )
+        amounts = amount_column_to_minor_units(cleaned.mask(is_credit, ""))
+
+        return pd.DataFrame(
+            {
+                "tx_date": parse_date_column(df["Date"], date_format),
+                "norm_desc": normalize_description_column(df["Merchant Name"]),
+                "amount_minor": amounts["amount_minor"],
+                "amount_sign": amounts["amount_sign"],
+            }
+        )
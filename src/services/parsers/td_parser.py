@@ -1,7 +1,16 @@
+import decimal
+from typing import Optional
+
 import pandas as pd
 
 from .base import BaseBankParser
-from .utils import normalize_description, parse_date
+from .utils import (
+    normalize_description,
+    parse_date,
+    amount_column_to_minor_units,
+    normalize_description_column,
+    parse_date_column,
+)
 
 
 class TDBankParser(BaseBankParser):
@@ -10,8 +19,12 @@ class TDBankParser(BaseBankParser):
 
     def extract_transaction_fields(self, item: dict):
         # Amount
-        amount = item["Debit"]
-        if amount is None or pd.isna(amount):
+        raw_amount = str(item["Debit"]).replace(",", "").strip()
+        if not raw_amount:
+            return None, None, None
+        try:
+            amount = decimal.Decimal(raw_amount)
+        except decimal.InvalidOperation:
             return None, None, None
         # Date
         formatted_date = parse_date(date_str=item["Date"])
@@ -19,3 +32,20 @@ class TDBankParser(BaseBankParser):
         norm_desc = normalize_description(item["Transaction Description"])
 
         return amount, formatted_date, norm_desc
+
+    def extract_transaction_columns(
+        self, df: pd.DataFrame, date_format: Optional[str] = None
+    ) -> pd.DataFrame:
+        amounts = amount_column_to_minor_units(
+            df["Debit"].astype(str).str.replace(",", "", regex=False).str.strip()
+        )
+        return pd.DataFrame(
+            {
+                "tx_date": parse_date_column(df["Date"], date_format),
+                "norm_desc": normalize_description_column(
+                    df["Transaction Description"]
+                ),
+                "amount_minor": amounts["amount_minor"],
+                "amount_sign": amounts["amount_sign"],
+            }
+        )
@@ -1,61 +1,24 @@
 from datetime import datetime, date
-import re
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Optional
 
+import numpy as np
+import pandas as pd
 
-def normalize_description(desc: str) -> str:
-    """
-    Clean transaction description noise:
-    """
-    text = (desc or "").strip()
-
-    for pattern in ["TFR-TO C/C", "SEND E-TFR"]:
-        if pattern in text:
-            return pattern
-
-    # 0) Normalize spaces
-    text = re.sub(r"\s+", " ", text)
-
-    # 1) Remove ' #1234' anywhere
-    text = re.sub(r"\s*#\d+\b", "", text)
-
-    # 2) Remove '/suffix' with letters+digits, e.g. '/G3ZGWU'
-    text = re.sub(r"/(?=[A-Za-z0-9]*[A-Za-z])(?=[A-Za-z0-9]*\d)[A-Za-z0-9]+$", "", text)
-
-    # 3) Remove '*suffix' with letters+digits, e.g. '*NI3HV3DJ1'
-    text = re.sub(
-        r"\*(?=[A-Za-z0-9]*[A-Za-z])(?=[A-Za-z0-9]*\d)[A-Za-z0-9]+$", "", text
-    )
-
-    # 4) Remove '******1234' (card numbers)
-    text = re.sub(r"\*{2,}\d+$", "", text)
-    text = re.sub(r"\*{2,}", "", text)
+from .dates import DATE_FORMATS, formats_to_try, parse_date_column
+from .normalizer import normalize_description, normalize_many
 
-    # 5) Remove '*digits', e.g. 'UPS*123456...'
-    text = re.sub(r"\*\d+$", "", text)
+# Longer values are converted through Decimal to stay inside int64
+_MAX_FAST_LEN = 16
 
-    # 6) Remove trailing pure digits
-    text = re.sub(r"\s+\d+$", "", text)
 
-    # 7) Remove common transaction network / suffix identifiers
-    text = re.sub(
-        r"\s*_(V|M|MC|AX|AMEX|DS|DISC|P|I|WD|DEP|TFR|BP|INT)$",
-        "",
-        text,
-        flags=re.IGNORECASE,
-    )
-
-    # 8)
-    text = re.sub(
-        r"\b(?:[A-Za-z]\d){3,}[A-Za-z]?\b|\b(?:\d[A-Za-z]){3,}\d?\b", "", text
-    )
-
-    # Convert to uppercase
-    return text.strip().upper()
-
-
-def parse_date(date_str: str) -> Optional[date]:
-    formats = ["%m/%d/%Y", "%Y-%m-%d"]  # Possible date format
+def parse_date(date_str: str, date_format: Optional[str] = None) -> Optional[date]:
+    """
+    Parse one date with date_format and the year-first formats, every format
+    when date_format is None. Prefer parse_date_column for columns.
+    """
+    formats = formats_to_try(date_format) if date_format else DATE_FORMATS
+    date_str = str(date_str).strip()
     for fmt in formats:
         try:
             return datetime.strptime(date_str, fmt).date()
@@ -70,3 +33,88 @@ def first_non_empty(item: dict, *keys: str) -> str:
         if v not in (None, ""):
             return str(v).strip()
     return ""
+
+
+def first_non_empty_column(df: pd.DataFrame, *keys: str) -> pd.Series:
+    """Column-wise first_non_empty: take the first column whose value is not ''."""
+    result = pd.Series("", index=df.index, dtype=object)
+    chosen = pd.Series(False, index=df.index)
+    for k in keys:
+        if k not in df.columns:
+            continue
+        col = df[k].astype(str)
+        take = ~chosen & (col != "")
+        result = result.mask(take, col.str.strip())
+        chosen |= take
+    return result
+
+
+def normalize_description_column(descs: pd.Series) -> pd.Series:
+    """Normalize a column, each distinct description only once."""
+    distinct = descs.unique()
+    return descs.map(dict(zip(distinct, normalize_many(distinct))))
+
+
+def _decimal_to_minor_units(raw: str) -> tuple:
+    try:
+        amount = Decimal(raw)
+        minor = int(
+            (amount * Decimal("100")).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+        )
+        sign = -1 if amount < 0 else (1 if amount > 0 else 0)
+        return minor, sign
+    except (InvalidOperation, ValueError):
+        return None, None
+
+
+def amount_column_to_minor_units(amounts: pd.Series) -> pd.DataFrame:
+    """
+    Convert a column of decimal strings (major units) to minor units.
+
+    Rounds with ROUND_HALF_UP exactly like the per-row Decimal path. Plain
+    '[+-]digits[.digits]' values are converted with NumPy array arithmetic, anything
+    else (exponents, very long numbers...) falls back to Decimal per value.
+    Unparseable values are returned as NA.
+
+    Returns a frame with:
+      - amount_minor: Int64, signed minor units
+      - amount_sign: Int8, sign of the exact amount (-1, 0, 1)
+    """
+    values = np.strings.strip(amounts.astype(str).to_numpy(dtype=str))
+
+    # '-12.345' -> digits=12345, frac_len=3
+    body = np.strings.lstrip(values, "+-")
+    body_len = np.strings.str_len(body)
+    no_dot = np.strings.replace(body, ".", "", 1)
+    fast = (
+        np.strings.isdigit(no_dot)
+        & (np.strings.str_len(values) - body_len <= 1)
+        & (np.strings.count(body, ".") <= 1)
+        & (body_len <= _MAX_FAST_LEN)
+    )
+    negative = np.strings.startswith(values, "-")
+    dot = np.strings.find(body, ".")
+    frac_len = np.where(dot >= 0, body_len - dot - 1, 0)
+    digits = np.where(fast, no_dot, "0").astype(np.int64)
+
+    # Scale to 2 decimals, rounding half up on the dropped digits
+    scaled = digits * np.power(10, np.maximum(2 - frac_len, 0), dtype=np.int64)
+    divisor = np.power(10, np.maximum(frac_len - 2, 0), dtype=np.int64)
+    magnitude = scaled // divisor + (scaled % divisor * 2 >= divisor)
+
+    minor = pd.Series(
+        np.where(negative, -magnitude, magnitude), index=amounts.index, dtype="Int64"
+    )
+    sign = pd.Series(
+        np.where(digits != 0, np.where(negative, -1, 1), 0),
+        index=amounts.index,
+        dtype="Int8",
+    )
+
+    slow = ~fast
+    if slow.any():
+        converted = [_decimal_to_minor_units(v) for v in values[slow]]
+        minor[slow] = pd.array([c[0] for c in converted], dtype="Int64")
+        sign[slow] = pd.array([c[1] for c in converted], dtype="Int8")
+
+    return pd.DataFrame({"amount_minor": minor, "amount_sign": sign})
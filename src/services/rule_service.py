@@ -0,0 +1,96 @@
+import logging
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import config
+from src.crud import global_rule_crud, system_category_crud, transaction_crud
+from src.schemas.global_rule import (
+    GlobalRuleChange,
+    GlobalRuleCreate,
+    RecategorizeResult,
+)
+from src.services.category_service import MAX_SYS_CAT_ID
+
+
+class RuleService:
+    async def recategorize(
+        self, db: AsyncSession, changes: List[GlobalRuleChange]
+    ) -> RecategorizeResult:
+        """
+        Change the category of global rules (creating missing ones) and apply it
+        to the existing transactions with these descriptions.
+        """
+        categories = {c.norm_desc: c.category_id for c in changes}
+        names = await self.get_system_category_names(db, set(categories.values()))
+
+        rules_updated, rules_created = (
+            await global_rule_crud.upsert_global_rule_categories_async(
+                db,
+                [
+                    GlobalRuleCreate(
+                        norm_desc=desc,
+                        category_id=category_id,
+                        category_name=names[category_id],
+                        note="set by admin",
+                    )
+                    for desc, category_id in categories.items()
+                ],
+            )
+        )
+        transactions_updated, chunks = await self.apply_categories(db, categories)
+
+        return RecategorizeResult(
+            rules_updated=rules_updated,
+            rules_created=rules_created,
+            transactions_updated=transactions_updated,
+            chunks=chunks,
+        )
+
+    async def apply_categories(
+        self, db: AsyncSession, categories: Dict[str, int]
+    ) -> Tuple[int, int]:
+        """
+        Set the category of every transaction whose description is in
+        categories (norm_desc -> category_id), rule batch by rule batch, in
+        keyset chunks of RECATEGORIZE_CHUNK_SIZE transactions. Transactions
+        the user categorized themselves keep their category.
+        Return (transactions updated, chunks).
+        """
+        items = list(categories.items())
+        batch_size = config.RECATEGORIZE_RULE_BATCH_SIZE
+        total = chunks = 0
+        for i in range(0, len(items), batch_size):
+            batch = dict(items[i : i + batch_size])
+            after_id = 0
+            while after_id is not None:
+                updated, after_id = (
+                    await transaction_crud.recategorize_chunk_by_description(
+                        db, batch, after_id, config.RECATEGORIZE_CHUNK_SIZE
+                    )
+                )
+                total += updated
+                chunks += 1
+            logging.info(
+                f"[{self.__class__.__name__}] applied {min(i + batch_size, len(items))}"
+                f"/{len(items)} rules, {total} transactions updated in {chunks} chunks"
+            )
+        return total, chunks
+
+    @staticmethod
+    async def get_system_category_names(
+        db: AsyncSession, category_ids: set
+    ) -> Dict[int, str]:
+        """Names of the given system categories, 400 if one can't be used by rules."""
+        categories = await system_category_crud.get_system_category_by_ids(
+            db, [c for c in category_ids if c <= MAX_SYS_CAT_ID]
+        )
+        names = {c.id: c.name for c in categories if not c.is_archived}
+        missing = sorted(category_ids - names.keys())
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Global rules need system categories, invalid: {missing}",
+            )
+        return names
@@ -3,13 +3,15 @@ import logging
 import asyncio
 from pathlib import Path
 from fastapi import UploadFile
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.schemas.common import PaginatedResponse
 from src.schemas.enums import BankEnum
 from src.schemas.statement import StatementCreate, StatementRead, StatementDeleteResult
-from src.crud import transaction_crud, statement_crud
+from src.schemas.statement_job import StatementJobCreate
+from src.crud import transaction_crud, statement_crud, statement_job_crud
+from src.core import config
 import os
 import uuid
 
@@ -56,13 +58,24 @@ class StatementService:
         return str(save_path)
 
     @staticmethod
-    async def create_statement_record(
+    async def is_parse_queue_full(db: AsyncSession) -> bool:
+        open_jobs = await statement_job_crud.count_open_jobs(db)
+        return open_jobs >= config.STATEMENT_QUEUE_MAX_DEPTH
+
+    @staticmethod
+    async def create_statement_with_job(
         db: AsyncSession,
+        *,
         user_id: uuid.UUID,
         bank: BankEnum,
         currency: str,
         file_path: str,
-    ):
+    ) -> Tuple[int, int]:
+        """
+        Save the statement record and queue its parse for
+        jobs/statement_worker.py in one transaction, so a statement never
+        exists without its job. Return (statement id, job id).
+        """
         stmt_data = StatementCreate(
             user_id=user_id,
             s3_key=file_path,
@@ -74,9 +87,34 @@ class StatementService:
         )
         try:
             stmt_id = await statement_crud.create_statement(db, stmt_data)
-            return stmt_id
-        except Exception as e:
-            logging.error(f"DB error: {e}")
+            job = await statement_job_crud.create_statement_job(
+                db,
+                StatementJobCreate(
+                    statement_id=stmt_id,
+                    user_id=user_id,
+                    bank=bank.value,
+                    currency=currency,
+                    file_path=file_path,
+                    max_attempts=config.STATEMENT_JOB_MAX_ATTEMPTS,
+                ),
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logging.exception(
+                "[create_statement_with_job] Failed: user_id=%s file_path=%s",
+                str(user_id),
+                file_path,
+            )
+            raise
+
+        logging.info(
+            "[create_statement_with_job] user_id=%s statement_id=%s job_id=%s",
+            str(user_id),
+            str(stmt_id),
+            str(job.id),
+        )
+        return stmt_id, job.id
 
     @staticmethod
     async def get_user_statements(
@@ -121,9 +159,9 @@ class StatementService:
         if stmt is None or stmt.user_id != user_id:
             raise self.NotFoundOrNoAccess()
 
-        # TODO: if statement is under processing, it cannot be deleted
-        # if stmt.status == SOME_PROCESSING_STATUS:
-        #     raise self.Conflict()
+        # If statement is under processing, it cannot be deleted
+        if await statement_job_crud.get_open_job_by_statement_id(db, statement_id):
+            raise self.Conflict()
 
         file_path = getattr(stmt, "s3_key", None)
         current_status = getattr(stmt, "status", None)
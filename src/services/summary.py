@@ -1,9 +1,10 @@
 import logging
 import uuid
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import date
 from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.core import config
 from src.services.category_service import CategoryService
 from src.services.exchange_rate_service import ExchangeRateService
 from src.schemas.summary import (
@@ -37,46 +38,50 @@ class SummaryService:
             to_minor_units(max_amount_out) if max_amount_out is not None else None
         )
 
-        # Get the transactions by filters
-        items, total = await tx_crud.get_transactions_by_user(
-            db=db,
-            user_id=user_id,
-            start_date=start_date,
-            end_date=end_date,
-            min_amount_out=min_amount_out_minor,
-            max_amount_out=max_amount_out_minor,
-            status=status,
-            limit=None,
-        )
-
-        # Convert amounts from original currency to display_currency
-        if display_currency:
-            ex_rate_service = ExchangeRateService()
-            display_amounts, _ = await ex_rate_service.convert_transaction_amounts(
-                db=db, transactions=items, display_currency=display_currency
+        if config.SUMMARY_AGGREGATE_IN_DB:
+            # Converted and summed in SQL, only the totals are fetched
+            totals = await tx_crud.get_transaction_totals(
+                db=db,
+                user_id=user_id,
+                base_currency=ExchangeRateService.BASE_CURRENCY,
+                source=ExchangeRateService.SOURCE,
+                display_currency=display_currency,
+                start_date=start_date,
+                end_date=end_date,
+                min_amount_out=min_amount_out_minor,
+                max_amount_out=max_amount_out_minor,
+                status=status,
             )
         else:
-            display_amounts = [tx.amount for tx in items]
+            totals = await SummaryService._sum_transactions(
+                db=db,
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                min_amount_out=min_amount_out_minor,
+                max_amount_out=max_amount_out_minor,
+                display_currency=display_currency,
+                status=status,
+            )
 
         # Total expenses
-        total_expenses: Decimal = sum(display_amounts, Decimal(0))
+        total_expenses: Decimal = sum((amt for _, _, amt in totals), Decimal(0))
 
         # Get category names: category_id => category_name
         cat_service = CategoryService()
         cat_id_name_map = await cat_service.get_category_id_name_map(
-            db=db, category_ids=[tx.category_id for tx in items]
+            db=db, category_ids=list({category_id for category_id, _, _ in totals})
         )
 
         # Build dicts by category and month
         category_totals = defaultdict(int)
         monthly_totals = defaultdict(int)
 
-        for i, tx in enumerate(items):
+        for category_id, month_str, amount in totals:
             # Category -> amount
-            category_totals[cat_id_name_map[tx.category_id]] += display_amounts[i]
+            category_totals[cat_id_name_map[category_id]] += amount
             # Month -> amount
-            month_str = tx.tx_date.strftime("%Y-%m")
-            monthly_totals[month_str] += display_amounts[i]
+            monthly_totals[month_str] += amount
 
         # Build category expense list
         category_expenses = [
@@ -108,3 +113,49 @@ class SummaryService:
             incomes=None,
             display_currency=display_currency,
         )
+
+    @staticmethod
+    async def _sum_transactions(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        min_amount_out: Optional[int],
+        max_amount_out: Optional[int],
+        display_currency: Optional[str],
+        status: Optional[int],
+    ) -> List[Tuple[int, str, int]]:
+        """
+        get_transaction_totals in Python (SUMMARY_AGGREGATE_IN_DB=0): load the
+        transactions, convert them with ExchangeRateService and sum by
+        (category_id, month).
+        """
+        # Get the transactions by filters
+        items, total = await tx_crud.get_transactions_by_user(
+            db=db,
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            min_amount_out=min_amount_out,
+            max_amount_out=max_amount_out,
+            status=status,
+            limit=None,
+        )
+
+        # Convert amounts from original currency to display_currency
+        if display_currency:
+            ex_rate_service = ExchangeRateService()
+            display_amounts, _ = await ex_rate_service.convert_transaction_amounts(
+                db=db, transactions=items, display_currency=display_currency
+            )
+        else:
+            display_amounts = [tx.amount for tx in items]
+
+        # (category_id, month) -> amount
+        totals = defaultdict(int)
+        for tx, amount in zip(items, display_amounts):
+            totals[(tx.category_id, tx.tx_date.strftime("%Y-%m"))] += amount
+        return [
+            (category_id, month, amount)
+            for (category_id, month), amount in totals.items()
+        ]
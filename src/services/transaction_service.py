@@ -6,7 +6,7 @@ from src.schemas.transaction import TransactionRead, TransactionUpdate
 from src.services.category_service import CategoryService
 from src.services.exchange_rate_service import ExchangeRateService
 from src.helpers.money import to_minor_units
-from src.crud import transaction_crud
+from src.crud import transaction_crud, user_rule_crud
 from datetime import date
 from typing import Optional, List
 
@@ -110,10 +110,33 @@ class TransactionService:
                 status_code=403, detail="Not authorized to update this transaction"
             )
 
-        # Verify category
-        category_service = CategoryService(str(user_id))
-        await category_service.check_user_category(
-            db=db, category_id=db_obj.category_id
-        )
+        # Verify the new category
+        old_category_id = db_obj.category_id
+        new_category_id = tx_update.category_id
+        if new_category_id is not None:
+            category_service = CategoryService(str(user_id))
+            await category_service.check_user_category(
+                db=db, category_id=new_category_id
+            )
+
+        # The update and the rule it teaches commit together
+        try:
+            db_obj = await transaction_crud.update_transaction(db, db_obj, tx_update)
+
+            # Learn the correction, the next statements of this user get it at ingest
+            if (
+                new_category_id is not None
+                and new_category_id != old_category_id
+                and db_obj.description
+            ):
+                await user_rule_crud.upsert_user_rule(
+                    db, user_id, db_obj.description, new_category_id
+                )
+
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
 
-        return await transaction_crud.update_transaction(db, db_obj, tx_update)
+        await db.refresh(db_obj)
+        return db_obj
@@ -1,7 +1,9 @@
+import asyncio
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from src.core.config import DATABASE_URL
+from src.core.db import DATABASE_URL, DATABASE_URL_ASYNC
 import uuid
 
 
@@ -32,6 +34,37 @@ def db_session():
         connection.close()
 
 
+@pytest.fixture(scope="function")
+def run_async_db():
+    """
+    Run an async test body on an AsyncSession and roll back all its changes.
+    Commits inside async crud functions only release a savepoint.
+    """
+
+    def run(test_body):
+        async def main():
+            async_engine = create_async_engine(DATABASE_URL_ASYNC)
+            try:
+                async with async_engine.connect() as connection:
+                    transaction = await connection.begin()
+                    db = AsyncSession(
+                        bind=connection,
+                        expire_on_commit=False,
+                        join_transaction_mode="create_savepoint",
+                    )
+                    try:
+                        return await test_body(db)
+                    finally:
+                        await db.close()
+                        await transaction.rollback()
+            finally:
+                await async_engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
 @pytest.fixture(scope="session")
 def test_user_id():
-    return uuid.UUID("804659e9-6351-4723-b829-19a20f210bc6")
\ No newline at end of file
+    return uuid.UUID("804659e9-6351-4723-b829-19a20f210bc6")
@@ -0,0 +1,151 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import select, update
+
+from src.crud.exchange_rates_crud import (
+    get_best_rate_date,
+    get_best_rates_for_dates,
+    get_rates_by_date,
+    get_rates_updated_since,
+    upsert_rates,
+)
+from src.models.exchange_rate import ExchangeRate
+
+EPSILON = Decimal("0.000001")
+DAY = date(2025, 1, 15)
+SOURCE_TS = datetime(2025, 1, 15, tzinfo=timezone.utc)
+OLD = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+# Made-up quotes (XCA, XCB, XCC), clear of the rates already in the table
+def _row(quote: str, rate: str, day: date = DAY):
+    return (day, "USD", quote, Decimal(rate), "test", SOURCE_TS)
+
+
+async def _rates(db) -> dict:
+    result = await db.execute(
+        select(ExchangeRate.quote_currency, ExchangeRate.rate).where(
+            ExchangeRate.quote_currency.in_(["XCA", "XCB", "XCC"])
+        )
+    )
+    return dict(result.all())
+
+
+def test_upsert_counts_inserted_and_updated(run_async_db):
+    async def body(db):
+        first = await upsert_rates(
+            db, [_row("XCA", "1.5"), _row("XCB", "2")], epsilon=EPSILON
+        )
+        second = await upsert_rates(
+            db,
+            # XCA changed, XCB the same, XCC new
+            [_row("XCA", "1.6"), _row("XCB", "2"), _row("XCC", "3")],
+            epsilon=EPSILON,
+        )
+        return first, second, await _rates(db)
+
+    first, second, rates = run_async_db(body)
+    assert first == (2, 0)
+    assert second == (1, 1)
+    assert rates == {"XCA": Decimal("1.6"), "XCB": Decimal("2"), "XCC": Decimal("3")}
+
+
+def test_rerun_within_epsilon_is_a_noop(run_async_db):
+    async def body(db):
+        await upsert_rates(db, [_row("XCA", "1.5")], epsilon=EPSILON)
+        # Backdate the row, a no-op must leave its updated_at (the watermark) alone
+        await db.execute(
+            update(ExchangeRate)
+            .where(ExchangeRate.quote_currency == "XCA")
+            .values(updated_at=OLD)
+        )
+        counts = await upsert_rates(db, [_row("XCA", "1.5000001")], epsilon=EPSILON)
+        changed = [
+            row
+            for row in await get_rates_updated_since(
+                db, datetime(2000, 1, 2, tzinfo=timezone.utc)
+            )
+            if row[2] == "XCA"
+        ]
+        return counts, changed, await _rates(db)
+
+    counts, changed, rates = run_async_db(body)
+    assert counts == (0, 0)
+    assert changed == []
+    assert rates == {"XCA": Decimal("1.5")}
+
+
+def test_last_row_of_a_day_and_pair_wins(run_async_db):
+    async def body(db):
+        counts = await upsert_rates(
+            db,
+            [_row("XCA", "1.5"), _row("XCB", "2"), _row("XCA", "1.7")],
+            epsilon=EPSILON,
+        )
+        return counts, await _rates(db)
+
+    counts, rates = run_async_db(body)
+    assert counts == (2, 0)
+    assert rates == {"XCA": Decimal("1.7"), "XCB": Decimal("2")}
+
+
+# Rate days with gaps: XCB is missing on 01-20
+GAPPED_ROWS = [
+    _row("XCA", "1.1", date(2025, 1, 10)),
+    _row("XCB", "2.1", date(2025, 1, 10)),
+    _row("XCA", "1.2", date(2025, 1, 20)),
+    _row("XCA", "1.3", date(2025, 1, 30)),
+    _row("XCB", "2.3", date(2025, 1, 30)),
+]
+
+# (tx_date, quotes) -> the rate day expected
+BEST_DAYS = {
+    # Exact day
+    (date(2025, 1, 10), frozenset({"XCA", "XCB"})): date(2025, 1, 10),
+    (date(2025, 1, 20), frozenset({"XCA"})): date(2025, 1, 20),
+    # Earlier day: 01-20 doesn't cover XCB
+    (date(2025, 1, 20), frozenset({"XCA", "XCB"})): date(2025, 1, 10),
+    (date(2025, 1, 25), frozenset({"XCA", "XCB"})): date(2025, 1, 10),
+    (date(2025, 2, 5), frozenset({"XCB"})): date(2025, 1, 30),
+    # Before every rate day: the latest day overall
+    (date(2024, 12, 31), frozenset({"XCA"})): date(2025, 1, 30),
+    (date(2024, 12, 31), frozenset({"XCA", "XCB"})): date(2025, 1, 30),
+}
+
+
+def test_best_rates_for_dates_match_the_single_day_lookup(run_async_db):
+    async def body(db):
+        await upsert_rates(db, GAPPED_ROWS, epsilon=EPSILON)
+        batched = await get_best_rates_for_dates(
+            db, requests=BEST_DAYS, base_currency="USD", source="test"
+        )
+        single = {}
+        for tx_date, quotes in BEST_DAYS:
+            rate_date = await get_best_rate_date(
+                db,
+                tx_date=tx_date,
+                base_currency="USD",
+                source="test",
+                required_quotes=quotes,
+            )
+            rates = await get_rates_by_date(
+                db,
+                as_of_date=rate_date,
+                base_currency="USD",
+                source="test",
+                quote_currencies=quotes,
+            )
+            single[(tx_date, quotes)] = (
+                rate_date,
+                {quote: r.rate for quote, r in rates.items()},
+            )
+        return batched, single
+
+    batched, single = run_async_db(body)
+    assert batched == single
+    assert {key: rate_date for key, (rate_date, _) in batched.items()} == BEST_DAYS
+    assert batched[(date(2025, 1, 25), frozenset({"XCA", "XCB"}))][1] == {
+        "XCA": Decimal("1.1"),
+        "XCB": Decimal("2.1"),
+    }
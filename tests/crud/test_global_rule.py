@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from sqlalchemy import func, update
+
+from src.core import config
+from src.crud import global_rule_crud
+from src.crud.global_rule_crud import (
+    create_global_rules_batch,
+    create_global_rules_batch_async,
+    get_global_rules_by_norm_descs,
+    get_global_rules_by_norm_descs_async,
+    global_rule_cache,
+    upsert_global_rule_categories_async,
+    _rule_rows,
+)
+from src.models import GlobalRule
+from src.schemas.global_rule import GlobalRuleCreate
+
+
+def _rule(norm_desc: str, category_id: int, name: str = "x") -> GlobalRuleCreate:
+    return GlobalRuleCreate(
+        norm_desc=norm_desc, category_id=category_id, category_name=name, note=""
+    )
+
+
+def test_lookup_sees_rules_changed_by_other_processes(db_session, monkeypatch):
+    monkeypatch.setattr(config, "GLOBAL_RULE_CACHE_SYNC_SECONDS", 0)
+    create_global_rules_batch(db_session, [_rule("CACHETEST SHOP", 4)])
+    assert (
+        get_global_rules_by_norm_descs(db_session, ["CACHETEST SHOP"])[
+            "CACHETEST SHOP"
+        ].category_id
+        == 4
+    )
+
+    # Recategorized elsewhere (the rule is older than this test's transaction),
+    # this process's cache was not invalidated
+    db_session.execute(
+        update(GlobalRule)
+        .where(GlobalRule.norm_desc == "CACHETEST SHOP")
+        .values(
+            category_id=3,
+            created_at=func.now() - timedelta(minutes=5),
+            updated_at=func.now(),
+        )
+    )
+    assert (
+        get_global_rules_by_norm_descs(db_session, ["CACHETEST SHOP"])[
+            "CACHETEST SHOP"
+        ].category_id
+        == 3
+    )
+
+
+def test_sync_keeps_new_rules_cached(db_session, monkeypatch):
+    monkeypatch.setattr(config, "GLOBAL_RULE_CACHE_SYNC_SECONDS", 0)
+    create_global_rules_batch(db_session, [_rule("CACHETEST NEW", 4)])
+    get_global_rules_by_norm_descs(db_session, ["CACHETEST NEW"])
+
+    # Created, never changed: another lookup's sync leaves it cached
+    get_global_rules_by_norm_descs(db_session, ["CACHETEST OTHER"])
+    assert "CACHETEST NEW" in global_rule_cache
+
+
+def test_sync_is_throttled(db_session, monkeypatch):
+    monkeypatch.setattr(config, "GLOBAL_RULE_CACHE_SYNC_SECONDS", 3600)
+    syncs = []
+    monkeypatch.setattr(
+        global_rule_crud, "_sync_cache", lambda since, rows: syncs.append(since)
+    )
+    monkeypatch.setattr(global_rule_crud, "_cache_synced_at", None)
+
+    for _ in range(3):
+        get_global_rules_by_norm_descs(db_session, ["CACHETEST SHOP"])
+    assert len(syncs) == 1
+
+
+def test_create_batch_counts_inserted_rules(db_session):
+    rules = [
+        _rule("BATCHTEST B", 4),
+        _rule("BATCHTEST A", 5),
+        # Same description twice in one batch: the first one is kept
+        _rule("BATCHTEST B", 9),
+    ]
+    assert create_global_rules_batch(db_session, rules, chunk_size=1) == 2
+
+    # Existing rules are left alone and not counted
+    rules.append(_rule("BATCHTEST C", 6))
+    assert create_global_rules_batch(db_session, rules) == 1
+
+    found = get_global_rules_by_norm_descs(
+        db_session, ["BATCHTEST A", "BATCHTEST B", "BATCHTEST C"], use_cache=False
+    )
+    assert {d: hit.category_id for d, hit in found.items()} == {
+        "BATCHTEST A": 5,
+        "BATCHTEST B": 4,
+        "BATCHTEST C": 6,
+    }
+
+
+def test_upsert_categories_counts_updated_and_created(run_async_db):
+    async def body(db):
+        await create_global_rules_batch_async(db, [_rule("UPSERTTEST A", 4)])
+        first = await upsert_global_rule_categories_async(
+            db,
+            [
+                _rule("UPSERTTEST B", 3),
+                _rule("UPSERTTEST A", 3),
+                _rule("UPSERTTEST B", 7),
+            ],
+        )
+        found = await get_global_rules_by_norm_descs_async(
+            db, ["UPSERTTEST A", "UPSERTTEST B"], use_cache=False
+        )
+        return first, {d: hit.category_id for d, hit in found.items()}
+
+    (updated, created), categories = run_async_db(body)
+    assert (updated, created) == (1, 1)
+    assert categories == {"UPSERTTEST A": 3, "UPSERTTEST B": 3}
+
+
+def test_rule_rows_are_deduplicated_and_sorted():
+    rows = _rule_rows([_rule("C", 1), _rule("A", 2), _rule("B", 3), _rule("A", 4)])
+    assert [(r["norm_desc"], r["category_id"]) for r in rows] == [
+        ("A", 2),
+        ("B", 3),
+        ("C", 1),
+    ]
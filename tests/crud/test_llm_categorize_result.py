@@ -0,0 +1,53 @@
+from src.crud.llm_categorize_result_crud import (
+    mark_llm_results_skipped,
+    record_llm_results,
+)
+from src.schemas.global_rule import GlobalRuleCreate
+
+
+class RecordingSession:
+    """Collects what is executed, in order."""
+
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+
+    def commit(self):
+        pass
+
+
+def _rule(norm_desc: str) -> GlobalRuleCreate:
+    return GlobalRuleCreate(
+        norm_desc=norm_desc, category_id=4, category_name="x", note=""
+    )
+
+
+def test_results_are_upserted_in_norm_desc_order():
+    db = RecordingSession()
+    record_llm_results(
+        db,
+        succeeded=[_rule("ZETA"), _rule("ALPHA")],
+        failed={"MIKE", "BRAVO", "ALPHA"},
+        chunk_size=2,
+    )
+    descs = [
+        value
+        for stmt, _ in db.executed
+        for key, value in stmt.compile().params.items()
+        if key.startswith("norm_desc")
+    ]
+    # ALPHA once, as a success
+    assert descs == ["ALPHA", "BRAVO", "MIKE", "ZETA"]
+
+
+def test_skipped_results_are_updated_in_norm_desc_order():
+    db = RecordingSession()
+    mark_llm_results_skipped(db, {"ZETA": 3, "ALPHA": 1, "MIKE": 2})
+    [(_, params)] = db.executed
+    assert params == [
+        {"desc": "ALPHA", "tokens": 1},
+        {"desc": "MIKE", "tokens": 2},
+        {"desc": "ZETA", "tokens": 3},
+    ]
@@ -0,0 +1,139 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from src.crud.statement_job_crud import (
+    claim_jobs_async,
+    create_statement_job,
+    mark_job_failed_async,
+    mark_job_succeeded_async,
+)
+from src.models import Statement, StatementJob
+from src.schemas.enums import BankEnum, StatementJobStatus
+from src.schemas.statement_job import StatementJobCreate
+from src.services.statement_service import StatementService
+
+
+async def _queued_job(db, test_user_id) -> StatementJob:
+    job = await create_statement_job(
+        db,
+        StatementJobCreate(
+            statement_id=1,
+            user_id=test_user_id,
+            bank="TD",
+            currency="CAD",
+            file_path="/tmp/statement.csv",
+        ),
+    )
+    # Ahead of any other runnable job
+    await db.execute(
+        update(StatementJob)
+        .where(StatementJob.id == job.id)
+        .values(run_after=datetime(2000, 1, 1, tzinfo=timezone.utc))
+    )
+    return job
+
+
+def test_async_claim_and_finish(run_async_db, test_user_id):
+    async def body(db):
+        job = await _queued_job(db, test_user_id)
+
+        claimed = await claim_jobs_async(db, worker_id="w1", limit=1, lease_seconds=60)
+        assert [j.id for j in claimed] == [job.id]
+        assert claimed[0].attempts == 1
+        # Claimed and leased: not claimable by another worker
+        assert not [
+            j
+            for j in await claim_jobs_async(
+                db, worker_id="w2", limit=10, lease_seconds=60
+            )
+            if j.id == job.id
+        ]
+
+        # Only the worker holding the lease can finish it
+        assert await mark_job_succeeded_async(db, job_id=job.id, worker_id="w2") == 0
+        assert await mark_job_succeeded_async(db, job_id=job.id, worker_id="w1") == 1
+        return await db.scalar(
+            select(StatementJob.status).where(StatementJob.id == job.id)
+        )
+
+    assert run_async_db(body) == StatementJobStatus.SUCCEEDED
+
+
+def test_async_failure_requeues_with_delay(run_async_db, test_user_id):
+    async def body(db):
+        job = await _queued_job(db, test_user_id)
+        await claim_jobs_async(db, worker_id="w1", limit=1, lease_seconds=60)
+
+        assert (
+            await mark_job_failed_async(
+                db,
+                job_id=job.id,
+                worker_id="w1",
+                error="boom",
+                retry_delay_seconds=3600,
+            )
+            == 1
+        )
+        # Back to pending, but not runnable before the retry delay
+        requeued = await claim_jobs_async(
+            db, worker_id="w1", limit=10, lease_seconds=60
+        )
+        row = (
+            await db.execute(
+                select(StatementJob.status, StatementJob.last_error).where(
+                    StatementJob.id == job.id
+                )
+            )
+        ).one()
+        return job.id, [j.id for j in requeued], tuple(row)
+
+    job_id, claimed, row = run_async_db(body)
+    assert job_id not in claimed
+    assert row == (StatementJobStatus.PENDING, "boom")
+
+
+def _create_statement_with_job(db, test_user_id, file_path):
+    return StatementService.create_statement_with_job(
+        db,
+        user_id=test_user_id,
+        bank=BankEnum.TD,
+        currency="CAD",
+        file_path=file_path,
+    )
+
+
+async def _count_statements(db, file_path) -> int:
+    return await db.scalar(
+        select(func.count()).select_from(Statement).where(Statement.s3_key == file_path)
+    )
+
+
+def test_statement_is_created_with_its_job(run_async_db, test_user_id):
+    async def body(db):
+        stmt_id, job_id = await _create_statement_with_job(
+            db, test_user_id, "/tmp/with_job.csv"
+        )
+        job = await db.get(StatementJob, job_id)
+        return stmt_id, job.statement_id, job.status
+
+    stmt_id, job_statement_id, status = run_async_db(body)
+    assert job_statement_id == stmt_id
+    assert status == StatementJobStatus.PENDING
+
+
+def test_no_statement_without_its_job(run_async_db, test_user_id, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise RuntimeError("statement_jobs unavailable")
+
+    monkeypatch.setattr(
+        "src.services.statement_service.statement_job_crud.create_statement_job", fail
+    )
+
+    async def body(db):
+        with pytest.raises(RuntimeError):
+            await _create_statement_with_job(db, test_user_id, "/tmp/orphan.csv")
+        return await _count_statements(db, "/tmp/orphan.csv")
+
+    assert run_async_db(body) == 0
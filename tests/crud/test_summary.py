@@ -0,0 +1,137 @@
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from src.crud.exchange_rates_crud import FxRateNotFound
+from src.crud.transaction_crud import (
+    bulk_insert_transactions_async,
+    get_transaction_totals,
+)
+from src.models import User
+from src.models.exchange_rate import ExchangeRate
+from src.services.exchange_rate_service import ExchangeRateService
+from src.services.fx_rate_store import fx_rate_store
+from src.services.summary import SummaryService
+
+# Made-up quotes, so the rates already in the table don't cover them
+RATES = {
+    date(2025, 1, 10): {"XAA": "2", "XBB": "0.8"},
+    # XAA alone: XAA <-> USD use it, XAA <-> XBB fall back to 01-10
+    date(2025, 1, 20): {"XAA": "4"},
+    date(2025, 1, 30): {"XAA": "1.5", "XBB": "0.25"},
+}
+
+# (tx_date, currency, amount, category_id)
+TRANSACTIONS = [
+    # Ties: 3 / 2 = 1.5 and -3 / 2 = -1.5 round away from zero
+    (date(2025, 1, 10), "XAA", 3, 1),
+    (date(2025, 1, 10), "XAA", -3, 1),
+    (date(2025, 1, 20), "XAA", 2, 1),
+    (date(2025, 1, 20), "XBB", -7, 2),
+    (date(2025, 1, 25), "USD", 1001, 2),
+    (date(2025, 1, 31), "XBB", 333, 1),
+    # Before every rate day: the latest day overall
+    (date(2024, 12, 31), "XAA", 10, 2),
+    (date(2024, 12, 31), "USD", -5, 1),
+]
+
+
+async def _seed(db, transactions) -> uuid.UUID:
+    user = User(email=f"{uuid.uuid4()}@summary.test")
+    db.add(user)
+    db.add_all(
+        ExchangeRate(
+            as_of_date=day,
+            base_currency=ExchangeRateService.BASE_CURRENCY,
+            quote_currency=quote,
+            rate=Decimal(rate),
+            source=ExchangeRateService.SOURCE,
+            source_ts=datetime.now(timezone.utc),
+        )
+        for day, rates in RATES.items()
+        for quote, rate in rates.items()
+    )
+    await db.flush()
+    await bulk_insert_transactions_async(
+        db,
+        [
+            (user.id, tx_date, amount, currency, category_id, "SUMMARY", None)
+            for tx_date, currency, amount, category_id in transactions
+        ],
+        use_copy=False,
+    )
+    return user.id
+
+
+async def _totals_in_db(db, user_id, display_currency):
+    return await get_transaction_totals(
+        db,
+        user_id,
+        base_currency=ExchangeRateService.BASE_CURRENCY,
+        source=ExchangeRateService.SOURCE,
+        display_currency=display_currency,
+        status=1,
+    )
+
+
+async def _totals_in_python(db, user_id, display_currency):
+    return await SummaryService._sum_transactions(
+        db=db,
+        user_id=user_id,
+        start_date=None,
+        end_date=None,
+        min_amount_out=None,
+        max_amount_out=None,
+        display_currency=display_currency,
+        status=1,
+    )
+
+
+@pytest.mark.parametrize("display_currency", [None, "USD", "XAA", "XBB"])
+def test_totals_in_db_match_python(run_async_db, display_currency):
+    # The Python path must query the rates too
+    assert not fx_rate_store.loaded
+
+    async def body(db):
+        user_id = await _seed(db, TRANSACTIONS)
+        return (
+            await _totals_in_db(db, user_id, display_currency),
+            await _totals_in_python(db, user_id, display_currency),
+        )
+
+    in_db, in_python = run_async_db(body)
+    assert sorted(in_db) == sorted(in_python)
+    assert len(in_db) == 4
+
+
+def test_totals_in_usd(run_async_db):
+    async def body(db):
+        user_id = await _seed(db, TRANSACTIONS)
+        return await _totals_in_db(db, user_id, "USD")
+
+    assert sorted(run_async_db(body)) == [
+        # -5 USD
+        (1, "2024-12", -5),
+        # 2 - 2 + 2/4 -> 1, 333/0.25
+        (1, "2025-01", 2 - 2 + 1 + 1332),
+        # 10/1.5 on 01-30
+        (2, "2024-12", 7),
+        # -7/0.8 on 01-10 -> -9, 1001 USD
+        (2, "2025-01", -9 + 1001),
+    ]
+
+
+def test_totals_without_rate_day_raise_on_both_paths(run_async_db):
+    async def body(db):
+        user_id = await _seed(db, TRANSACTIONS + [(date(2025, 1, 10), "XCC", 1, 1)])
+        errors = []
+        for totals in (_totals_in_db, _totals_in_python):
+            try:
+                await totals(db, user_id, "USD")
+            except FxRateNotFound:
+                errors.append(totals.__name__)
+        return errors
+
+    assert run_async_db(body) == ["_totals_in_db", "_totals_in_python"]
@@ -0,0 +1,65 @@
+import asyncio
+
+from src.services.categorizers.coalescer import CategorizationCoalescer
+from src.services.categorizers.llm_categorizer import CategorizeReport
+
+
+class RecordingCategorizer:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def categorize_report_async(self, transaction_descriptions):
+        self.batches.append(list(transaction_descriptions))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return CategorizeReport(
+            [
+                {
+                    "norm_desc": d,
+                    "category_id": 12,
+                    "category_name": "Other",
+                    "note": "",
+                }
+                for d in transaction_descriptions
+                if d != "SKIPPED"
+            ],
+            ["SKIPPED"] if "SKIPPED" in transaction_descriptions else [],
+            [],
+        )
+
+
+def test_concurrent_requests_share_one_batch():
+    categorizer = RecordingCategorizer()
+
+    async def run():
+        coalescer = CategorizationCoalescer(categorizer, window_ms=20, max_batch=100)
+        return await asyncio.gather(
+            coalescer.categorize_report(["A", "B"]),
+            coalescer.categorize_report(["B", "C", "SKIPPED"]),
+            coalescer.categorize_report(["A"]),
+        )
+
+    first, second, third = asyncio.run(run())
+    assert len(categorizer.batches) == 1
+    assert sorted(categorizer.batches[0]) == ["A", "B", "C", "SKIPPED"]
+    assert [d["norm_desc"] for d in first.categorized] == ["A", "B"]
+    assert [d["norm_desc"] for d in second.categorized] == ["B", "C"]
+    assert second.unanswered == ["SKIPPED"]
+    assert [d["norm_desc"] for d in third.categorized] == ["A"]
+
+
+def test_batch_failure_reaches_every_caller():
+    async def run():
+        coalescer = CategorizationCoalescer(
+            RecordingCategorizer(fail=True), window_ms=5, max_batch=100
+        )
+        return await asyncio.gather(
+            coalescer.categorize_report(["A"]),
+            coalescer.categorize_report(["B"]),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from src.services.categorizers.fake_provider import FakeInferenceClient, fake_category
+from src.services.categorizers.llm_categorizer import HFTransactionCategorizer
+from src.services.categorizers.provider_pool import ProviderPool, ProviderUnavailable
+
+
+@pytest.fixture
+def fake_config(monkeypatch):
+    def set_config(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(f"src.core.config.FAKE_LLM_{name}", value)
+
+    set_config(LATENCY_MS=0, MS_PER_ITEM=0, ERROR_RATE=0, DROP_RATE=0)
+    return set_config
+
+
+def test_fake_provider_answers_with_the_categorizer_schema(fake_config):
+    pool = ProviderPool(["fake"], max_workers=2)
+    categorizer = HFTransactionCategorizer(providers=["fake"], pool=pool)
+    descs = ["TIM HORTONS", "UBER TRIP", "NETFLIX.COM"]
+
+    report = categorizer.categorize_report(descs)
+
+    assert sorted(d["norm_desc"] for d in report.categorized) == sorted(descs)
+    for item in report.categorized:
+        assert (item["category_id"], item["category_name"]) == fake_category(
+            item["norm_desc"]
+        )
+    assert report.unanswered == [] and report.errored == []
+
+
+def test_fake_provider_failures_are_retryable(fake_config):
+    fake_config(ERROR_RATE=1.0)
+    pool = ProviderPool(["fake"], max_workers=2)
+
+    assert isinstance(pool.clients["fake"], FakeInferenceClient)
+    with pytest.raises(ProviderUnavailable):
+        asyncio.run(pool.request("fake", messages=[{"role": "user", "content": "X"}]))
+
+
+def test_fake_provider_drops_descriptions(fake_config):
+    fake_config(DROP_RATE=1.0)
+    pool = ProviderPool(["fake"], max_workers=2)
+    categorizer = HFTransactionCategorizer(providers=["fake"], pool=pool)
+
+    report = categorizer.categorize_report(["TIM HORTONS"])
+
+    assert report.categorized == []
+    assert report.unanswered == ["TIM HORTONS"]
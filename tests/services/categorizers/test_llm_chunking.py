@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from src.services.categorizers.llm_categorizer import (
+    ITEM_TOKEN_OVERHEAD,
+    HFTransactionCategorizer,
+    chunk_descriptions,
+    estimate_tokens,
+)
+
+
+def test_chunk_descriptions_bounds():
+    descs = [f"MERCHANT {i}" for i in range(250)]
+    chunks = chunk_descriptions(descs, max_tokens=10**6, max_items=100)
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    assert [d for c in chunks for d in c] == descs
+
+    chunks = chunk_descriptions(descs, max_tokens=500, max_items=100)
+    assert len(chunks) > 3
+    for chunk in chunks:
+        assert sum(estimate_tokens(d) + ITEM_TOKEN_OVERHEAD for d in chunk) <= 500
+    assert chunk_descriptions([]) == []
+
+
+class FlakyCategorizer(HFTransactionCategorizer):
+    def __init__(self, fail_on: str):
+        super().__init__(max_concurrency=2)
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def categorize_chunk_async(self, transaction_descriptions):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.fail_on in transaction_descriptions:
+            raise RuntimeError("provider down")
+        return [
+            {"norm_desc": d, "category_id": 12, "category_name": "Other", "note": ""}
+            for d in transaction_descriptions
+        ]
+
+
+def test_categorize_keeps_successful_chunks(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.categorizers.llm_categorizer.config.LLM_CHUNK_MAX_ITEMS", 10
+    )
+    descs = [f"MERCHANT {i}" for i in range(100)]
+    categorizer = FlakyCategorizer(fail_on="MERCHANT 15")
+    result = categorizer.categorize(descs)
+
+    # Only the chunk MERCHANT 10..19 is lost
+    assert [d["norm_desc"] for d in result] == descs[:10] + descs[20:]
+    assert categorizer.max_in_flight == 2
+
+
+def test_categorize_raises_when_every_chunk_fails():
+    with pytest.raises(RuntimeError):
+        FlakyCategorizer(fail_on="MERCHANT 1").categorize(["MERCHANT 1"])
+
+
+def test_categorize_report_splits_unanswered_and_errored(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.categorizers.llm_categorizer.config.LLM_CHUNK_MAX_ITEMS", 2
+    )
+
+    class SkippingCategorizer(FlakyCategorizer):
+        async def categorize_chunk_async(self, transaction_descriptions):
+            result = await super().categorize_chunk_async(transaction_descriptions)
+            return [d for d in result if d["norm_desc"] != "B"]
+
+    report = SkippingCategorizer(fail_on="C").categorize_report(["A", "B", "C", "D"])
+    assert [d["norm_desc"] for d in report.categorized] == ["A"]
+    assert report.unanswered == ["B"]
+    assert report.errored == ["C", "D"]
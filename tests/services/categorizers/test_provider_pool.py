@@ -0,0 +1,103 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+from huggingface_hub.utils import HfHubHTTPError
+
+from src.services.categorizers.provider_pool import ProviderPool, ProviderUnavailable
+
+
+class FakeClient:
+    def __init__(self, delay: float = 0.0, status: int = 200):
+        self.delay = delay
+        self.status = status
+        self.calls = 0
+
+    def chat_completion(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.status != 200:
+            response = requests.Response()
+            response.status_code = self.status
+            raise HfHubHTTPError(f"{self.status}", response=response)
+        message = SimpleNamespace(content=f"ok after {self.delay}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _pool(**clients) -> ProviderPool:
+    pool = ProviderPool(list(clients), max_workers=4)
+    pool.clients.update(clients)
+    return pool
+
+
+def test_hedged_request_takes_the_faster_provider(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.categorizers.provider_pool.config.LLM_HEDGE_DELAY_SECONDS", 0.05
+    )
+    slow, fast = FakeClient(delay=0.5), FakeClient(delay=0.01)
+    pool = _pool(slow=slow, fast=fast)
+    monkeypatch.setattr(pool, "pick_any", lambda exclude=(): "slow")
+
+    started = time.monotonic()
+    provider, content = asyncio.run(pool.hedged_request(messages=[]))
+    assert provider == "fast"
+    assert time.monotonic() - started < 0.4
+    assert slow.calls == fast.calls == 1
+
+
+def test_circuit_breaker_skips_failing_provider(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.categorizers.provider_pool.config.LLM_BREAKER_FAILURE_THRESHOLD",
+        2,
+    )
+    pool = _pool(down=FakeClient(status=503), up=FakeClient())
+
+    for _ in range(2):
+        with pytest.raises(ProviderUnavailable):
+            asyncio.run(pool.request("down", messages=[]))
+
+    assert pool.stats["down"].is_open(time.monotonic())
+    assert all(pool.pick() == "up" for _ in range(10))
+    assert pool.pick(exclude=("up",)) is None
+    assert pool.pick_any(exclude=("up",)) == "up"
+
+
+def test_client_error_leaves_breaker_and_latencies_alone():
+    pool = _pool(bad_request=FakeClient(status=400))
+    stats = pool.stats["bad_request"]
+    stats.consecutive_failures = 1
+
+    with pytest.raises(HfHubHTTPError):
+        asyncio.run(pool.request("bad_request", messages=[]))
+
+    assert stats.consecutive_failures == 1
+    assert not stats.latencies
+
+
+def test_timeout_marks_provider_unavailable(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.categorizers.provider_pool.config.LLM_REQUEST_TIMEOUT_SECONDS",
+        0.05,
+    )
+    pool = _pool(hung=FakeClient(delay=0.3))
+
+    with pytest.raises(ProviderUnavailable):
+        asyncio.run(pool.request("hung", messages=[]))
+    assert pool.stats["hung"].consecutive_failures == 1
+
+
+def test_no_hedge_without_a_free_thread(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.categorizers.provider_pool.config.LLM_HEDGE_DELAY_SECONDS", 0.05
+    )
+    slow, fast = FakeClient(delay=0.3), FakeClient(delay=0.01)
+    pool = ProviderPool(["slow", "fast"], max_workers=1)
+    pool.clients.update(slow=slow, fast=fast)
+    monkeypatch.setattr(pool, "pick_any", lambda exclude=(): "slow")
+
+    provider, _ = asyncio.run(pool.hedged_request(messages=[]))
+    assert provider == "slow"
+    assert fast.calls == 0
+    assert pool.has_free_worker()
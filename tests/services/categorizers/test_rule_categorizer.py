@@ -0,0 +1,74 @@
+import pytest
+
+from src.services.categorizers.rule_categorizer import (
+    AhoCorasick,
+    RuleCategorizer,
+    get_rule_categorizer,
+)
+
+RULES = [
+    {
+        "category_id": 4,
+        "category_name": "Food & Dining",
+        "keywords": ["UBER EATS", "TIM HORTONS", "美团"],
+    },
+    {
+        "category_id": 5,
+        "category_name": "Transportation",
+        "keywords": ["UBER"],
+        "patterns": [],
+    },
+    {
+        "category_id": 12,
+        "category_name": "Other",
+        "keywords": ["TFR-TO C/C"],
+        "patterns": [r"^ATM W/D"],
+    },
+]
+
+
+def test_aho_corasick_overlapping_matches():
+    ac = AhoCorasick(["HE", "SHE", "HIS", "HERS"])
+    found = sorted(
+        (start, ac.keywords[idx]) for start, idx in ac.iter_matches("USHERS")
+    )
+    assert found == [(1, "SHE"), (2, "HE"), (2, "HERS")]
+
+
+@pytest.mark.parametrize(
+    "desc, category_id",
+    [
+        ("UBER* TRIP", 5),
+        ("UBER EATS TORONTO", 4),
+        ("uber eats", 4),
+        ("TIM HORTONS", 4),
+        ("TFR-TO C/C", 12),
+        ("快捷支付 美团外卖", 4),
+        ("ATM W/D 1234", 12),
+        ("SUBERB CAFE", None),
+        ("UBERX", None),
+        ("", None),
+    ],
+)
+def test_match(desc, category_id):
+    rule = RuleCategorizer(RULES).match(desc)
+    assert (rule.category_id if rule else None) == category_id
+
+
+def test_categorize_shape():
+    result = RuleCategorizer(RULES).categorize(["TIM HORTONS", "UNKNOWN SHOP"])
+    assert result == [
+        {
+            "norm_desc": "TIM HORTONS",
+            "category_id": 4,
+            "category_name": "Food & Dining",
+            "note": "rule: TIM HORTONS",
+        }
+    ]
+
+
+def test_bundled_rules_load():
+    categorizer = get_rule_categorizer()
+    assert len(categorizer) > 0
+    assert categorizer.match("TIM HORTONS").category_id == 4
+    assert categorizer.match("SEND E-TFR").category_id == 12
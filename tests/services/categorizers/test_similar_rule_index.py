@@ -0,0 +1,90 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from src.core import config
+from src.crud.global_rule_crud import GlobalRuleHit
+from src.services.categorizers import similar_rule_index as similar_rule_index_module
+from src.services.categorizers.similar_rule_index import (
+    SimilarRuleIndex,
+    char_ngrams,
+)
+
+
+def _jaccard(a: str, b: str) -> float:
+    ga, gb = char_ngrams(a), char_ngrams(b)
+    return len(ga & gb) / len(ga | gb)
+
+
+def test_lookup_near_duplicate():
+    index = SimilarRuleIndex()
+    index.add("STARBUCKS TORONTO", GlobalRuleHit(4, "Food & Dining"))
+    index.add("PRESTO FARE", GlobalRuleHit(5, "Transportation"))
+
+    similar = index.lookup("STARBUCKS TORONTO ON", threshold=0.8)
+    assert similar.norm_desc == "STARBUCKS TORONTO"
+    assert similar.hit.category_id == 4
+    assert index.lookup("NETFLIX.COM", threshold=0.8) is None
+    assert index.lookup("PRESTO FARE", threshold=0.8).score == 1.0
+
+
+def test_lookup_matches_brute_force():
+    rng = random.Random(7)
+    words = ["TIM", "HORTONS", "STARBUCKS", "UBER", "TRIP", "COSTCO", "CA", "ON"]
+    descs = sorted(
+        {
+            " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+            for _ in range(300)
+        }
+    )
+    index = SimilarRuleIndex()
+    index.add_many((d, GlobalRuleHit(i, "x")) for i, d in enumerate(descs))
+
+    queries = ["TIM HORTONS CA", "UBER TRIP TRIP", "COSTCO ON CA", "TIMS", "UBE"]
+    for threshold in (0.3, 0.6, 0.9):
+        for query in queries:
+            best = max(_jaccard(query, d) for d in descs)
+            similar = index.lookup(query, threshold=threshold)
+            if best >= threshold:
+                assert abs(similar.score - best) < 1e-9
+            else:
+                assert similar is None
+
+
+def test_explicit_zero_threshold():
+    index = SimilarRuleIndex()
+    index.add("STARBUCKS TORONTO", GlobalRuleHit(4, "Food & Dining"))
+
+    similar = index.lookup("STARBUCKS MONTREAL", threshold=0.0)
+    assert similar.norm_desc == "STARBUCKS TORONTO"
+    assert index.lookup("STARBUCKS MONTREAL", threshold=0.9) is None
+
+
+def test_refresh_picks_up_changed_categories(monkeypatch):
+    t0 = datetime(2025, 9, 1, tzinfo=timezone.utc)
+    table = {
+        "STARBUCKS TORONTO": (4, "Food & Dining", t0),
+        "PRESTO FARE": (5, "Transportation", t0 - timedelta(hours=1)),
+    }
+    reads = []
+
+    def changed_since(db, since):
+        reads.append(since)
+        return [
+            (desc, category_id, name, updated_at)
+            for desc, (category_id, name, updated_at) in table.items()
+            if since is None or updated_at >= since
+        ]
+
+    monkeypatch.setattr(
+        similar_rule_index_module, "get_global_rules_changed_since", changed_since
+    )
+    index = SimilarRuleIndex()
+    assert index.refresh(None) == 2
+
+    # Recategorized by an admin: same description, new category
+    table["STARBUCKS TORONTO"] = (3, "Groceries", t0 + timedelta(hours=1))
+    assert index.refresh(None) == 1
+    assert index.lookup("STARBUCKS TORONTO ON", threshold=0.8).hit.category_id == 3
+    assert len(index) == 2
+    assert reads[0] is None
+    assert reads[1] == t0 - timedelta(seconds=config.GLOBAL_RULE_SYNC_OVERLAP_SECONDS)
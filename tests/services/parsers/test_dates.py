@@ -0,0 +1,46 @@
+from datetime import date
+
+import pandas as pd
+
+from src.services.parsers.dates import parse_date_column, sniff_date_format
+from src.services.parsers.utils import parse_date
+
+
+def test_sniff_prefers_month_first_when_ambiguous():
+    assert sniff_date_format(["01/05/2025", "02/06/2025"]) == "%m/%d/%Y"
+
+
+def test_sniff_day_first():
+    assert sniff_date_format(["01/05/2025", "25/06/2025"]) == "%d/%m/%Y"
+
+
+def test_sniff_other_formats():
+    assert sniff_date_format(["20250301", "20250315"]) == "%Y%m%d"
+    assert sniff_date_format(["2025年3月1日", "2025年03月15日"]) == "%Y年%m月%d日"
+    assert sniff_date_format(["", "n/a"]) is None
+
+
+def test_parse_date_column_mixed_and_invalid():
+    dates = pd.Series(["25/06/2025", "2025-01-07", "13/13/2025", "", "25/06/2025"])
+    parsed = parse_date_column(dates, "%d/%m/%Y")
+    assert parsed.tolist() == [
+        date(2025, 6, 25),
+        date(2025, 1, 7),
+        None,
+        None,
+        date(2025, 6, 25),
+    ]
+
+
+def test_parse_date_column_matches_parse_date():
+    values = ["1/5/2025", "2025-01-07", "20250301", "2025年3月1日", "bad"]
+    parsed = parse_date_column(pd.Series(values), "%m/%d/%Y")
+    assert parsed.tolist() == [parse_date(v, "%m/%d/%Y") for v in values]
+
+
+def test_parse_date_column_keeps_the_file_format():
+    # 13/06/2025 is not a %m/%d/%Y date, it must not be read day-first
+    dates = pd.Series(["06/12/2025", "13/06/2025", "2025-06-14"])
+    parsed = parse_date_column(dates, "%m/%d/%Y")
+    assert parsed.tolist() == [date(2025, 6, 12), None, date(2025, 6, 14)]
+    assert [parse_date(v, "%m/%d/%Y") for v in dates] == parsed.tolist()
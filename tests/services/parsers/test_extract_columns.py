@@ -0,0 +1,80 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src.services.parsers.cmb_parser import CMBBankParser
+from src.services.parsers.rogers_parser import RogersBankParser
+from src.services.parsers.td_parser import TDBankParser
+from src.services.parsers.utils import amount_column_to_minor_units
+
+
+TD_CSV = """01/05/2025,TIM HORTONS #1234,4.565,,100.00
+01/06/2025,SEND E-TFR ***abc,"1,250.00",,90.00
+2025-01-07,PAYROLL DEP,,2000.00,2090.00
+01/08/2025,UBER* TRIP 123456,0.005,,85.00
+01/09/2025,AMZN MKTP CA*AB12CD3,abc,,85.00
+"""
+
+ROGERS_CSV = """Date,Merchant Name,Amount
+2025-02-01,COSTCO WHOLESALE W123,$1.234
+2025-02-02,PAYMENT - THANK YOU,($500.00)
+2025-02-03,NETFLIX.COM,"$1,016.99"
+2025-02-04,REFUND STORE,-12.50
+2025-02-05,ZERO CHARGE,$0.00
+"""
+
+CMB_CSV = """Date,Currency,Amount,Balance,Type,Counterparty
+2025-03-01,CNY,-35.505,1000.00,快捷支付,美团
+2025-03-02,CNY,"¥(1,200.00)",1000.00,转账,张三
+2025-03-03,CNY,5000.00,6000.00,工资,公司
+2025-03-04,CNY,--,6000.00,其他,
+2025-03-05,CNY,-0.004,6000.00,消费,便利店
+"""
+
+
+def _read(parser, text: str) -> pd.DataFrame:
+    return parser.read_csv(io.StringIO(text))
+
+
+def _expenses(frame: pd.DataFrame) -> list:
+    frame = frame[
+        frame["amount_minor"].notna() & (frame["amount_sign"].fillna(-1) >= 0)
+    ]
+    return list(
+        zip(
+            frame["tx_date"].tolist(),
+            frame["norm_desc"].tolist(),
+            frame["amount_minor"].astype("int64").tolist(),
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "parser, text",
+    [
+        (TDBankParser(), TD_CSV),
+        (RogersBankParser(), ROGERS_CSV),
+        (CMBBankParser(), CMB_CSV),
+    ],
+)
+def test_columns_match_per_row_extraction(parser, text):
+    """
+    Vectorized extraction must return exactly the rows of the per-row path
+    """
+    df = _read(parser, text)
+
+    vectorized = _expenses(parser.extract_transaction_columns(df))
+    by_row = _expenses(parser._extract_frame_by_row(df))
+
+    assert vectorized == by_row
+    assert len(vectorized) > 0
+
+
+def test_amount_column_to_minor_units_rounds_half_up():
+    amounts = pd.Series(["1.005", "-1.005", "0.004", "12", ".5", "1e2", "", "x"])
+    result = amount_column_to_minor_units(amounts)
+
+    assert result["amount_minor"].tolist()[:6] == [101, -101, 0, 1200, 50, 10000]
+    assert result["amount_sign"].tolist()[:6] == [1, -1, 1, 1, 1, 1]
+    assert result["amount_minor"].isna().tolist()[6:] == [True, True]
@@ -0,0 +1,27 @@
+from src.services.parsers.normalizer import DescriptionNormalizer
+
+
+def test_normalize_removes_noise():
+    normalizer = DescriptionNormalizer()
+
+    assert normalizer.normalize("  tim   hortons #1234 ") == "TIM HORTONS"
+    assert normalizer.normalize("PAYPAL *NI3HV3DJ1") == "PAYPAL"
+    assert normalizer.normalize("CARD ******1234") == "CARD"
+    assert normalizer.normalize("uber eats_V") == "UBER EATS"
+    assert normalizer.normalize("SEND E-TFR ***abc") == "SEND E-TFR"
+    assert normalizer.normalize(None) == ""
+
+
+def test_normalize_many_dedupes_and_keeps_order():
+    normalizer = DescriptionNormalizer()
+    descs = ["UBER* TRIP 123", "netflix.com", "UBER* TRIP 123", "netflix.com"]
+
+    assert normalizer.normalize_many(descs) == [
+        "UBER* TRIP",
+        "NETFLIX.COM",
+        "UBER* TRIP",
+        "NETFLIX.COM",
+    ]
+    # Only the 2 distinct descriptions were normalized and cached
+    assert len(normalizer.cache) == 2
+    assert normalizer.normalize_many(descs) == [normalizer.normalize(d) for d in descs]
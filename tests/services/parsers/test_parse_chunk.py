@@ -0,0 +1,93 @@
+import asyncio
+import io
+import uuid
+
+import pytest
+
+from src.crud.global_rule_crud import GlobalRuleHit
+from src.services.parsers import base
+from src.services.parsers.td_parser import TDBankParser
+
+TD_CSV = """01/05/2025,ROGERS WIRELESS,85.00,,100.00
+01/06/2025,RENT-A-CAR TORONTO,120.00,,90.00
+01/07/2025,TIM HORTONS #1234,4.50,,85.00
+"""
+
+# Admin-corrected global rules, both would also match a bundled keyword
+# (ROGERS: Utilities, RENT: Housing)
+GLOBAL_RULES = {
+    "ROGERS WIRELESS": GlobalRuleHit(9, "Entertainment"),
+    "RENT-A-CAR TORONTO": GlobalRuleHit(5, "Transportation"),
+}
+
+
+@pytest.fixture
+def saved_rows(monkeypatch):
+    saved = []
+
+    def get_global_rules_by_norm_descs(db, descs):
+        return {d: GLOBAL_RULES[d] for d in descs if d in GLOBAL_RULES}
+
+    def bulk_insert_transactions(db, rows):
+        rows = list(rows)
+        saved.extend(rows)
+        return len(rows)
+
+    async def get_global_rules_by_norm_descs_async(db, descs):
+        return get_global_rules_by_norm_descs(db, descs)
+
+    async def bulk_insert_transactions_async(db, rows):
+        return bulk_insert_transactions(db, rows)
+
+    for function in (
+        get_global_rules_by_norm_descs,
+        bulk_insert_transactions,
+        get_global_rules_by_norm_descs_async,
+        bulk_insert_transactions_async,
+    ):
+        monkeypatch.setattr(base, function.__name__, function)
+    return saved
+
+
+@pytest.fixture(params=["sync", "async"])
+def parse_chunk(request):
+    def parse(user_rules=None):
+        parser = TDBankParser()
+        df = parser.read_csv(io.StringIO(TD_CSV))
+        kwargs = dict(
+            user_id=uuid.uuid4(),
+            stmt_id=1,
+            currency="CAD",
+            date_format="%m/%d/%Y",
+            user_rules=user_rules,
+        )
+        if request.param == "sync":
+            parser.parse_chunk(None, df, **kwargs)
+        else:
+            asyncio.run(parser.parse_chunk_async(None, df, **kwargs))
+
+    return parse
+
+
+def _categories(rows) -> dict:
+    # Rows are in TRANSACTION_INSERT_COLUMNS order
+    return {row[5]: row[4] for row in rows}
+
+
+def test_global_rule_wins_over_keyword_rule(saved_rows, parse_chunk):
+    parse_chunk()
+    assert _categories(saved_rows) == {
+        "ROGERS WIRELESS": 9,
+        "RENT-A-CAR TORONTO": 5,
+        # No global rule, the keyword rule applies
+        "TIM HORTONS": 4,
+    }
+
+
+def test_user_rule_wins_over_global_and_keyword_rules(saved_rows, parse_chunk):
+    parse_chunk(user_rules={"ROGERS WIRELESS": 12, "TIM HORTONS": 11})
+    assert _categories(saved_rows) == {
+        "ROGERS WIRELESS": 12,
+        "RENT-A-CAR TORONTO": 5,
+        "TIM HORTONS": 11,
+    }
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from hypothesis import assume, given, settings
+from hypothesis import strategies as st
+
+from src.services.exchange_rate_service import ExchangeRateService
+from src.services.fx_rate_store import FxRateStore
+
+SOURCE = ExchangeRateService.SOURCE
+TS = datetime(2025, 9, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(monkeypatch) -> FxRateStore:
+    store = FxRateStore()
+    store.apply(
+        [
+            (date(2025, 9, 1), "USD", "CAD", SOURCE, Decimal("1.37000000"), TS),
+            (date(2025, 9, 1), "USD", "CNY", SOURCE, Decimal("7.13000000"), TS),
+            (date(2025, 9, 3), "USD", "CAD", SOURCE, Decimal("1.38000000"), TS),
+        ]
+    )
+    store.loaded = True
+    monkeypatch.setattr("src.services.exchange_rate_service.fx_rate_store", store)
+    return store
+
+
+def _tx(currency: str, day: int, amount: int):
+    return SimpleNamespace(currency=currency, tx_date=date(2025, 9, day), amount=amount)
+
+
+def test_convert_transaction_amounts_matches_convert(store):
+    transactions = [
+        _tx("CAD", 3, 1000),
+        _tx("CNY", 3, 7130),
+        _tx("usd", 2, 1),
+        _tx("CAD", 1, 0),
+        _tx("CNY", 1, 12345),
+    ]
+
+    amounts, rate_dates = asyncio.run(
+        ExchangeRateService.convert_transaction_amounts(
+            None, transactions=transactions, display_currency="cny"
+        )
+    )
+
+    expected = [
+        asyncio.run(
+            ExchangeRateService.convert(
+                None,
+                from_currency=tx.currency,
+                to_currency="CNY",
+                tx_date=tx.tx_date,
+                amounts=[tx.amount],
+            )
+        )
+        for tx in transactions
+    ]
+    assert amounts == [converted[0] for converted, _ in expected]
+    assert rate_dates == [rate_date for _, rate_date in expected]
+    # CAD and CNY are both quoted on 09-01 only
+    assert rate_dates[0] == date(2025, 9, 1)
+    assert amounts[2] == 7
+
+
+# Minor units up to 10 trillion major units, the Decimal path's range
+AMOUNTS = st.integers(-(10**15), 10**15)
+# DECIMAL(18,8): realistic rates, and the whole column range
+RATES = st.one_of(st.integers(10**6, 10**12), st.integers(1, 10**18 - 1)).map(
+    lambda n: Decimal(n).scaleb(-8)
+)
+PAIRS = st.sampled_from([("USD", "CAD"), ("CAD", "USD"), ("CAD", "CNY")])
+
+
+@settings(max_examples=500)
+@given(
+    amounts=st.lists(AMOUNTS, max_size=50),
+    pair=PAIRS,
+    rate_cad=RATES,
+    rate_cny=RATES,
+)
+def test_vectorized_conversion_matches_decimal(amounts, pair, rate_cad, rate_cny):
+    rates = {"CAD": rate_cad, "CNY": rate_cny}
+    # Results of 28 digits and more are out of the Decimal path's range
+    ratio = {"USD": 1, **rates}[pair[1]] / {"USD": 1, **rates}[pair[0]]
+    assume(all(abs(amount) * ratio < 10**26 for amount in amounts))
+
+    assert ExchangeRateService.convert_amounts(
+        amounts, *pair, rates
+    ) == ExchangeRateService.convert_amounts_decimal(amounts, *pair, rates)
+
+
+@settings(max_examples=500)
+@given(
+    odd=st.integers(-(10**6), 10**6).map(lambda n: 2 * n + 1),
+    n=st.integers(0, 10**6),
+)
+def test_vectorized_conversion_rounds_ties_like_decimal(odd, n):
+    # USD -> CAD at n.5: odd * n.5 is a tie. CAD -> USD at 2n: odd * n / 2n too.
+    cases = [
+        ([odd], "USD", "CAD", {"CAD": Decimal(2 * n + 1) / 2}),
+        ([odd * (n + 1)], "CAD", "USD", {"CAD": Decimal(2 * (n + 1))}),
+    ]
+    for amounts, from_cur, to_cur, rates in cases:
+        assert ExchangeRateService.convert_amounts(
+            amounts, from_cur, to_cur, rates
+        ) == ExchangeRateService.convert_amounts_decimal(
+            amounts, from_cur, to_cur, rates
+        )
+
+
+def test_vectorized_conversion_rounds_half_away_from_zero():
+    rates = {"CAD": Decimal("1.50000000")}
+
+    assert ExchangeRateService.convert_amounts(
+        [1, -1, 3, 0, 7], "USD", "CAD", rates
+    ) == [2, -2, 5, 0, 11]
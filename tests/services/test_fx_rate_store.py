@@ -0,0 +1,85 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from src.core import config
+from src.crud.exchange_rates_crud import FxRateNotFound
+from src.services import fx_rate_store
+from src.services.fx_rate_store import FxRateStore
+
+SOURCE = "openexchangerates"
+TS = datetime(2025, 9, 1, tzinfo=timezone.utc)
+
+
+def _row(day: date, quote: str, rate: str, ts: datetime = TS) -> tuple:
+    return (day, "USD", quote, SOURCE, Decimal(rate), ts)
+
+
+@pytest.fixture
+def store() -> FxRateStore:
+    store = FxRateStore()
+    store.apply(
+        [
+            _row(date(2025, 9, 1), "CAD", "1.37"),
+            _row(date(2025, 9, 1), "CNY", "7.13"),
+            _row(date(2025, 9, 3), "CAD", "1.38"),
+            _row(date(2025, 9, 5), "CAD", "1.39"),
+            _row(date(2025, 9, 5), "CNY", "7.15"),
+        ]
+    )
+    return store
+
+
+def _best(store: FxRateStore, day: date, quotes) -> date:
+    return store.best_rate_date(
+        day, base_currency="USD", source=SOURCE, quotes=set(quotes)
+    )
+
+
+def test_best_rate_date_follows_get_best_rate_date_rules(store):
+    # Exact day, latest day before, latest day overall
+    assert _best(store, date(2025, 9, 3), {"CAD"}) == date(2025, 9, 3)
+    assert _best(store, date(2025, 9, 4), {"CAD", "CNY"}) == date(2025, 9, 1)
+    assert _best(store, date(2025, 8, 1), {"CAD", "CNY"}) == date(2025, 9, 5)
+    assert _best(store, date(2025, 8, 1), set()) == date(2025, 8, 1)
+    with pytest.raises(FxRateNotFound):
+        _best(store, date(2025, 9, 4), {"EUR"})
+
+
+def test_apply_adds_and_replaces_rates(store):
+    later = datetime(2025, 9, 6, tzinfo=timezone.utc)
+    store.apply(
+        [
+            _row(date(2025, 9, 3), "CNY", "7.14", later),
+            _row(date(2025, 9, 5), "CAD", "1.4", later),
+        ]
+    )
+
+    assert _best(store, date(2025, 9, 4), {"CAD", "CNY"}) == date(2025, 9, 3)
+    rates = store.get_rates(
+        date(2025, 9, 5), base_currency="USD", source=SOURCE, quotes={"CAD", "CNY"}
+    )
+    assert rates == {"CAD": Decimal("1.4"), "CNY": Decimal("7.15")}
+    assert store.watermark.last_updated_at == later
+
+
+def test_refresh_rereads_the_overlap(store, monkeypatch):
+    # Written before TS but committed after the last refresh
+    late = _row(date(2025, 9, 3), "CNY", "7.14", TS - timedelta(seconds=10))
+    reads = []
+
+    async def get_rates_updated_since(db, since):
+        reads.append(since)
+        return [_row(date(2025, 9, 5), "CAD", "1.39"), late]
+
+    monkeypatch.setattr(
+        fx_rate_store, "get_rates_updated_since", get_rates_updated_since
+    )
+
+    # The row read again is not counted
+    assert asyncio.run(store.refresh(None)) == 1
+    assert reads == [TS - timedelta(seconds=config.FX_RATE_SYNC_OVERLAP_SECONDS)]
+    assert _best(store, date(2025, 9, 4), {"CAD", "CNY"}) == date(2025, 9, 3)
+    assert store.watermark.last_updated_at == TS
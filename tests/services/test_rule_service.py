@@ -0,0 +1,68 @@
+from datetime import date
+
+from sqlalchemy import select, update
+
+from src.core import config
+from src.crud.transaction_crud import bulk_insert_transactions_async
+from src.crud.user_rule_crud import upsert_user_rule
+from src.models import Transaction
+from src.services.rule_service import RuleService
+
+
+def test_recategorize_in_chunks(run_async_db, test_user_id, monkeypatch):
+    monkeypatch.setattr(config, "RECATEGORIZE_CHUNK_SIZE", 2)
+    descs = ["RECAT A"] * 5 + ["RECAT B"] * 3 + ["RECAT C"] * 2
+
+    async def body(db):
+        await bulk_insert_transactions_async(
+            db,
+            [
+                # One RECAT B row already has the new category
+                (
+                    test_user_id,
+                    date(2025, 7, 1),
+                    100 + i,
+                    "CAD",
+                    4 if i == 5 else 12,
+                    d,
+                    None,
+                )
+                for i, d in enumerate(descs)
+            ],
+            use_copy=False,
+        )
+        # The user filed RECAT C themselves
+        await upsert_user_rule(db, test_user_id, "RECAT C", 12)
+        # RECAT D was deleted
+        await bulk_insert_transactions_async(
+            db,
+            [(test_user_id, date(2025, 7, 1), 100, "CAD", 12, "RECAT D", None)],
+            use_copy=False,
+        )
+        await db.execute(
+            update(Transaction)
+            .where(Transaction.description == "RECAT D")
+            .values(status=2)
+        )
+
+        categories = {"RECAT A": 4, "RECAT B": 4, "RECAT C": 4, "RECAT D": 4}
+        first = await RuleService().apply_categories(db, categories)
+        second = await RuleService().apply_categories(db, categories)
+        result = await db.execute(
+            select(Transaction.description, Transaction.category_id).where(
+                Transaction.description.in_(categories)
+            )
+        )
+        return first, second, sorted(set(result.all()))
+
+    first, second, rows = run_async_db(body)
+    # 7 rows to update: chunks of 2, 2, 2 and 1
+    assert first == (7, 4)
+    # Nothing left, one empty chunk
+    assert second == (0, 1)
+    assert rows == [
+        ("RECAT A", 4),
+        ("RECAT B", 4),
+        ("RECAT C", 12),
+        ("RECAT D", 12),
+    ]
@@ -0,0 +1,82 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from src.crud.transaction_crud import bulk_insert_transactions_async
+from src.crud.user_rule_crud import get_user_rules_async
+from src.models import Transaction
+from src.schemas.transaction import TransactionUpdate
+from src.services.transaction_service import TransactionService
+
+
+def test_update_learns_only_changed_categories(run_async_db, test_user_id):
+    async def body(db):
+        await bulk_insert_transactions_async(
+            db,
+            [
+                (test_user_id, date(2025, 7, 1), 100, "CAD", 4, "LEARN A", None),
+                (test_user_id, date(2025, 7, 2), 200, "CAD", 4, "LEARN B", None),
+            ],
+            use_copy=False,
+        )
+        ids = dict(
+            (
+                await db.execute(
+                    select(Transaction.description, Transaction.id).where(
+                        Transaction.description.in_(["LEARN A", "LEARN B"])
+                    )
+                )
+            ).all()
+        )
+
+        # Recategorized: learned, in the commit of the update
+        updated = await TransactionService.update_transaction(
+            db, ids["LEARN A"], test_user_id, TransactionUpdate(category_id=9)
+        )
+        # Same category, or another field only: nothing to learn
+        await TransactionService.update_transaction(
+            db, ids["LEARN B"], test_user_id, TransactionUpdate(category_id=4)
+        )
+        await TransactionService.update_transaction(
+            db, ids["LEARN B"], test_user_id, TransactionUpdate(amount=250)
+        )
+
+        rules = await get_user_rules_async(db, test_user_id)
+        return updated.category_id, {
+            d: c for d, c in rules.items() if d.startswith("LEARN")
+        }
+
+    category_id, rules = run_async_db(body)
+    assert category_id == 9
+    assert rules == {"LEARN A": 9}
+
+
+def test_update_rolls_back_when_the_rule_fails(run_async_db, test_user_id, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise RuntimeError("user_rules unavailable")
+
+    monkeypatch.setattr(
+        "src.services.transaction_service.user_rule_crud.upsert_user_rule", fail
+    )
+
+    async def body(db):
+        await bulk_insert_transactions_async(
+            db,
+            [(test_user_id, date(2025, 7, 1), 100, "CAD", 4, "LEARN C", None)],
+            use_copy=False,
+        )
+        tx_id = await db.scalar(
+            select(Transaction.id).where(Transaction.description == "LEARN C")
+        )
+        try:
+            await TransactionService.update_transaction(
+                db, tx_id, test_user_id, TransactionUpdate(category_id=9)
+            )
+        except RuntimeError:
+            pass
+        return await db.scalar(
+            select(Transaction.category_id).where(Transaction.id == tx_id)
+        )
+
+    # Neither the new category nor the rule
+    assert run_async_db(body) == 4